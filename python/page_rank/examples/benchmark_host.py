@@ -0,0 +1,300 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from page_rank.examples.utils import add_generator_argument, mk_graph, \
+    mk_path, setup_cli_and_run
+
+EDGE_COUNTS = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+DAMPING = .85
+N_TICKS = 20  # rows of ranks extracted, as recorded by a short run
+BASELINE_PATH = 'baselines/benchmark_host.json'
+
+# Timings this short are too noisy to be flagged as regressions
+MIN_FLAGGED_TIME = 1e-3
+
+# Inputs of the benchmarks of one graph size
+_Case = namedtuple('_Case', 'node_count edge_count generator seed edges graph')
+
+
+#
+# Benchmarks: each prepares its inputs from the case, outside of the timings,
+#   and returns the function to time
+#
+
+def _bench_generate(case):
+    return lambda: mk_graph(case.node_count, case.edge_count, case.generator,
+                            seed=case.seed)
+
+
+def _bench_validate(case):
+    return lambda: (case.graph.duplicate_edges(),
+                    case.graph.dangling_vertices())
+
+
+def _bench_map_labels(case):
+    from page_rank.model.tools.graph import PageRankGraph
+
+    label_edges = [('n%d' % src, 'n%d' % dst) for src, dst in case.edges]
+    return lambda: PageRankGraph.from_input(label_edges)
+
+
+def _bench_map_edges(case):
+    from page_rank.model.tools.graph import PageRankGraph
+
+    def map_edges():
+        graph = PageRankGraph.from_input(case.edges)
+        return graph.in_degrees, graph.out_degrees, graph.edge_list()
+    return map_edges
+
+
+def _mk_recordings(n_vertices):
+    """Ranks recorded by each core over N_TICKS ticks, as read from the
+    machine."""
+    from page_rank.model.tools.recording import encode_ranks_record
+    from page_rank.model.tools.spinnaker_emulator import MAX_ATOMS_PER_CORE
+
+    rng = np.random.RandomState(0)
+    recordings = []
+    for lo in range(0, n_vertices, MAX_ATOMS_PER_CORE):
+        n = min(MAX_ATOMS_PER_CORE, n_vertices - lo)
+        states = rng.randint(0, 2 ** 32, size=(N_TICKS, n)).astype(np.uint32)
+        recordings.append((lo, n, b''.join(
+            encode_ranks_record(time, row) for time, row in enumerate(states))))
+    return recordings
+
+
+def _bench_extract_ranks(case):
+    from page_rank.model.tools.utils import ranks_from_recordings
+
+    recordings = _mk_recordings(case.graph.n_vertices)
+    return lambda: ranks_from_recordings(recordings)
+
+
+def _mk_converging_ranks(n_vertices):
+    """Ranks halving their distance to the final ones at each tick."""
+    rng = np.random.RandomState(0)
+    final = rng.dirichlet(np.ones(n_vertices))
+    start = np.full(n_vertices, 1. / n_vertices)
+    decay = .5 ** np.arange(N_TICKS)[:, None]
+    return final + (start - final) * decay
+
+
+def _bench_run(case):
+    # Host side of a run: mapping the graph, then extracting and checking the
+    #   convergence of the ranks recorded
+    from page_rank.model.tools.simulation import PageRankSimulation
+    from page_rank.tests.model.tools.utils import SpiNNakerTestAdapter
+
+    sim = PageRankSimulation(
+        N_TICKS * .1, case.graph, damping=DAMPING, use_cache=False,
+        spinnaker_adapter=SpiNNakerTestAdapter(
+            ranks=_mk_converging_ranks(case.graph.n_vertices)))
+    return lambda: sim.run(balance_load=True)
+
+
+def _bench_compute_page_rank(case):
+    from page_rank.model.tools.page_rank_engine import compute_page_rank
+    from page_rank.model.tools.simulation import TOL
+    from page_rank.model.tools.utils import to_fp
+
+    d = float(to_fp(DAMPING))
+    d_sum = float(to_fp((1. - DAMPING) / case.graph.n_vertices))
+    return lambda: compute_page_rank(case.graph, d, d_sum, TOL)
+
+
+def _bench_format_ranks_string(case):
+    from page_rank.model.tools.utils import format_ranks_string
+
+    # Verification report of a failed run, 10% of the ranks being off
+    computed = _mk_converging_ranks(case.graph.n_vertices)[-1]
+    expected = computed.copy()
+    expected[::10] += .1
+    return lambda: format_ranks_string(case.graph.labels, OrderedDict([
+        ('Computed', computed), ('Expected', expected)]), diff_only=True)
+
+
+BENCHMARKS = OrderedDict([
+    ('generate', _bench_generate),
+    ('validate', _bench_validate),
+    ('map_labels', _bench_map_labels),
+    ('map_edges', _bench_map_edges),
+    ('extract_ranks', _bench_extract_ranks),
+    ('run', _bench_run),
+    ('compute_page_rank', _bench_compute_page_rank),
+    ('format_ranks_string', _bench_format_ranks_string),
+])
+
+
+#
+# Timings and baselines
+#
+
+def mk_case(edge_count, edges_scale, generator, seed=None):
+    """Inputs of the benchmarks of a graph of `edge_count' edges."""
+    from page_rank.model.tools.graph import PageRankGraph
+
+    node_count = max(edge_count // edges_scale, 2)
+    if seed is None:
+        seed = random.randint(0, 2 ** 32 - 1)
+    edges, labels = mk_graph(node_count, edge_count, generator, seed=seed)
+    return _Case(node_count, edge_count, generator, seed, edges,
+                 PageRankGraph.from_input(edges, labels))
+
+
+def _best_time(fn, repeat):
+    """Best wall time of `repeat' calls, the least disturbed by the host."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = timeit.default_timer()
+        fn()
+        best = min(best, timeit.default_timer() - start)
+    return best
+
+
+def _environment():
+    return dict(python=platform.python_version(), numpy=np.__version__,
+                machine=platform.machine(), processor=platform.processor(),
+                node=platform.node())
+
+
+def load_baseline(path):
+    """Baseline timings saved by `save_baseline', or None if missing.
+
+    :return: <dict> with the `timings' of each benchmark, indexed by edge
+             count, and the `environment' and graph parameters they were
+             measured with
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path, timings, **params):
+    """Saves timings as the new baseline, keeping the previous timings of the
+    benchmarks and sizes not measured again.
+
+    :param timings: <dict> seconds of each benchmark, indexed by edge count
+    :param params: parameters of the graphs, e.g. `generator'
+    """
+    baseline = load_baseline(path) or {}
+    merged = baseline.get('timings', {})
+    for name, by_size in timings.items():
+        merged.setdefault(name, {}).update(by_size)
+
+    baseline.update(params, environment=_environment(), timings=merged)
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+
+
+def find_regressions(timings, baseline, threshold):
+    """Timings slower than their baseline by more than `threshold'.
+
+    :param threshold: tolerated slowdown, e.g. .2 for 20%
+    :return: [(<str> benchmark, <str> edge count, <float> baseline seconds,
+              <float> seconds)]
+    """
+    regressions = []
+    base_timings = (baseline or {}).get('timings', {})
+    for name, by_size in timings.items():
+        for size, seconds in sorted(by_size.items(), key=lambda i: int(i[0])):
+            base = base_timings.get(name, {}).get(size)
+            if base is None or max(seconds, base) < MIN_FLAGGED_TIME:
+                continue
+            if seconds > base * (1 + threshold):
+                regressions.append((name, size, base, seconds))
+    return regressions
+
+
+def run(edge_counts=None, edges_scale=None, generator=None, repeat=None,
+        only=None, baseline=None, save=False, threshold=None):
+    from prettytable import PrettyTable
+
+    names = only or list(BENCHMARKS)
+    unknown = sorted(set(names) - set(BENCHMARKS))
+    if unknown:
+        raise ValueError('Unknown benchmarks: %s, expected some of %s.' % (
+            ', '.join(unknown), ', '.join(BENCHMARKS)))
+
+    baseline_path = mk_path(baseline)
+    reference = load_baseline(baseline_path)
+    params = dict(edges_scale=edges_scale, generator=generator)
+    if reference is not None and any(reference.get(k) != v
+                                     for k, v in params.items()):
+        print('Baseline measured on other graphs (%s), not compared.' %
+              ', '.join('%s=%s' % (k, reference.get(k))
+                        for k in sorted(params)))
+        reference = None
+
+    timings = OrderedDict((name, OrderedDict()) for name in names)
+    for edge_count in edge_counts:
+        case = mk_case(edge_count, edges_scale, generator)
+        for name in names:
+            seconds = _best_time(BENCHMARKS[name](case), repeat)
+            timings[name][str(edge_count)] = seconds
+            print('%s |E|=%d: %.4f s' % (name, edge_count, seconds))
+            sys.stdout.flush()
+
+    regressions = find_regressions(timings, reference, threshold)
+    flagged = {(name, size) for name, size, _, _ in regressions}
+
+    table = PrettyTable(['benchmark', '|E|', 'time (s)', 'baseline (s)',
+                         'change'])
+    base_timings = (reference or {}).get('timings', {})
+    for name, by_size in timings.items():
+        for size, seconds in by_size.items():
+            base = base_timings.get(name, {}).get(size)
+            change = '-' if not base else '%+.0f%%' % (
+                100. * (seconds / base - 1))
+            if (name, size) in flagged:
+                change += ' REGRESSION'
+            table.add_row([name, size, '%.4f' % seconds,
+                           '%.4f' % base if base else '-', change])
+    print('\nHost-side hot paths, best of %d\n%s' % (repeat, table))
+
+    if save:
+        save_baseline(baseline_path, timings, **params)
+        print('\n>>> Baseline saved at %s' % baseline_path)
+
+    if regressions:
+        print('\n%d regression(s) beyond %.0f%% of the baseline.' % (
+            len(regressions), 100 * threshold))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmarks the host-side hot paths of the simulation, '
+                    'against the timings of a stored baseline.')
+    parser.add_argument('edge_counts', metavar='EDGES', nargs='*', type=int,
+                        default=EDGE_COUNTS,
+                        help='Graph sizes. Default is 10^3 to 10^7 edges.')
+    parser.add_argument('--edges-scale', type=int, default=10,
+                        help='(# edges / # nodes) ratio. Default is 10.')
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+                        help='Runs of each benchmark, the best one is kept. '
+                             'Default is 3.')
+    parser.add_argument('-o', '--only', nargs='+', choices=list(BENCHMARKS),
+                        help='Benchmarks to run. Default is all.')
+    parser.add_argument('-b', '--baseline', default=BASELINE_PATH,
+                        help='JSON baseline to compare to, relative to the '
+                             'examples. Default is %s.' % BASELINE_PATH)
+    parser.add_argument('-s', '--save', action='store_true',
+                        help='Save the timings as the new baseline.')
+    parser.add_argument('--threshold', type=float, default=.2,
+                        help='Slowdown flagged as a regression. Default is '
+                             '.2, i.e. 20%%.')
+    add_generator_argument(parser)
+
+    # Recreate the same graphs for the same arguments
+    random.seed(42)
+    setup_cli_and_run(parser, run)
@@ -0,0 +1,76 @@
+import argparse
+import random
+import time
+
+from page_rank.examples.utils import add_generator_argument, mk_graph, \
+    setup_cli_and_run
+
+N_ITER = 25
+DAMPING = .85
+
+
+def _time_engine(fn, *args):
+    from page_rank.model.tools.utils import PageRankNoConvergence
+
+    start = time.time()
+    try:
+        # Ensure all iterations will be completed with a unrealistic tol
+        fn(*args, tol=1e-100, max_iter=N_ITER)
+        raise RuntimeError('Did not complete all iterations')
+    except PageRankNoConvergence:
+        pass
+    return time.time() - start
+
+
+def _bench(node_count, edge_count, generator, skip_scalar):
+    import networkx as nx
+    from page_rank.model.tools.graph import PageRankGraph
+    from page_rank.model.tools.page_rank_engine import compute_page_rank
+    from page_rank.model.tools.utils import compute_page_rank as \
+        compute_page_rank_scalar, to_fp
+
+    edges, labels = mk_graph(node_count, edge_count, generator)
+    d = float(to_fp(DAMPING))
+    d_sum = float(to_fp((1. - DAMPING) / node_count))
+
+    graph = PageRankGraph.from_input(edges, labels)
+    vectorized = _time_engine(compute_page_rank, graph, d, d_sum)
+    if skip_scalar:
+        return vectorized, 0.
+
+    g = nx.DiGraph()
+    g.add_edges_from(edges.tolist())
+    scalar = _time_engine(compute_page_rank_scalar, g, labels, d, d_sum)
+    return vectorized, scalar
+
+
+def run(node_counts=None, edges_scale=None, skip_scalar_from=None,
+        generator=None):
+    from prettytable import PrettyTable
+
+    table = PrettyTable(['|V|', '|E|', 'scalar (s)', 'vectorized (s)',
+                         'speed-up'])
+    for node_count in node_counts:
+        edge_count = edges_scale * node_count
+        vectorized, scalar = _bench(node_count, edge_count, generator,
+                                    node_count >= skip_scalar_from)
+        speedup = 'x%.0f' % (scalar / vectorized) if scalar else '-'
+        table.add_row([node_count, edge_count, '%.3f' % scalar,
+                       '%.4f' % vectorized, speedup])
+
+    print('\nPython Page Rank, %d iterations\n%s' % (N_ITER, table))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmarks the scalar vs. vectorized Python Page Rank.')
+    parser.add_argument('node_counts', metavar='NODES', nargs='+', type=int)
+    parser.add_argument('--edges-scale', type=int, default=10,
+                        help='(# edges / # nodes) ratio. Default is 10.')
+    parser.add_argument('-s', '--skip-scalar-from', type=int, default=50000,
+                        help='# nodes to skip the scalar engine from')
+    add_generator_argument(parser)
+
+    # Recreate the same graphs for the same arguments
+    random.seed(42)
+    setup_cli_and_run(parser, run)
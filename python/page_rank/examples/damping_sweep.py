@@ -0,0 +1,75 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+from page_rank.examples.utils import add_generator_argument, mk_graph, \
+    setup_cli_and_run
+
+N_ITER = 25
+RUN_TIME = N_ITER * .1  # multiplied by timestep in ms
+PARAMETERS = {'time_scale_factor': 100}
+N_TOP = 5
+
+
+def _separate_runs(edges, labels, dampings, **kwargs):
+    from page_rank.model.tools.simulation import PageRankSimulation
+
+    ranks = []
+    for damping in dampings:
+        with PageRankSimulation(RUN_TIME, edges, labels, PARAMETERS,
+                                damping=damping) as s:
+            s.run(**kwargs)
+            ranks.append(s._extract_sim_ranks()[0][-1])
+    return np.array(ranks)
+
+
+def run(node_count=None, edge_count=None, dampings=None, compare=False,
+        verify=False, generator=None):
+    from page_rank.model.tools.simulation import PageRankSimulation
+
+    edges, labels = mk_graph(node_count, edge_count, generator)
+
+    start = time.time()
+    with PageRankSimulation(RUN_TIME, edges, labels, PARAMETERS) as s:
+        ranks, correct = s.run_damping_sweep(dampings, verify=verify,
+                                             diff_only=True)
+    sweep_time = time.time() - start
+
+    for damping, r in zip(dampings, ranks):
+        print('d=%.3f top %d: %s' % (damping, N_TOP, np.argsort(r)[::-1][
+            :N_TOP].tolist()))
+    print('Sweep of %d damping factors: %.2f sec' % (len(dampings),
+                                                     sweep_time))
+
+    if compare:
+        start = time.time()
+        expected = _separate_runs(edges, labels, dampings)
+        separate_time = time.time() - start
+        print('Separate runs: %.2f sec (x%.2f), same ranks: %s' % (
+            separate_time, separate_time / sweep_time,
+            np.array_equal(ranks, expected)))
+
+    return int(not correct.all())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Ranks of a random graph for several damping factors, '
+                    'mapped once.')
+    parser.add_argument('node_count', metavar='NODES', type=int,
+                        help='# nodes per graph')
+    parser.add_argument('edge_count', metavar='EDGES', type=int,
+                        help='# edges per graph')
+    parser.add_argument('dampings', metavar='DAMPING', type=float, nargs='+',
+                        help='damping factors, in [0, 1)')
+    parser.add_argument('-c', '--compare', action='store_true',
+                        help='Time separate runs of each damping factor.')
+    parser.add_argument('-v', '--verify', action='store_true',
+                        help='Verify sim w/ Python PR impl')
+    add_generator_argument(parser)
+
+    # Recreate the same graphs for the same arguments
+    random.seed(42)
+    setup_cli_and_run(parser, run)
@@ -5,7 +5,8 @@ import random
 import numpy as np
 
 from page_rank.examples.tune_time_scale_factor import sim_worker
-from page_rank.examples.utils import runner, save_plot_data, setup_cli_and_run
+from page_rank.examples.utils import add_generator_argument, runner, \
+    save_plot_data, setup_cli_and_run
 from page_rank.model.tools.utils import graph_visualiser
 
 N_ITER = 25
@@ -15,7 +16,7 @@ TSF_RES = 10
 TSF_MAX = 300
 
 
-def run(node_count=None, cores=None, show_out=None):
+def run(node_count=None, cores=None, show_out=None, generator=None):
     import tqdm
 
     # Fit the same graph size onto 1, 2, ... 15 cores
@@ -26,7 +27,8 @@ def run(node_count=None, cores=None, show_out=None):
     tsfs = []
     for atoms_per_core in tqdm.tqdm(atoms_per_core_list):
         tsf = runner(sim_worker, node_count=node_count,
-                     edge_count=10 * node_count, atoms_per_core=atoms_per_core,
+                     edge_count=10 * node_count, generator=generator,
+                     atoms_per_core=atoms_per_core,
                      tsf_min=TSF_MIN, tsf_res=TSF_RES, tsf_max=TSF_MAX)
         tsfs.append(tsf)
 
@@ -69,6 +71,7 @@ if __name__ == '__main__':
     parser.add_argument('node_count', metavar='NODES', type=int)
     parser.add_argument('cores', nargs='+', type=int)
     parser.add_argument('-o', '--show-out', action='store_true')
+    add_generator_argument(parser)
 
     # Recreate the same graphs for the same arguments
     random.seed(42)
@@ -5,7 +5,8 @@ import time
 
 import numpy as np
 
-from page_rank.examples.utils import runner, save_plot_data, setup_cli_and_run
+from page_rank.examples.utils import add_generator_argument, runner, \
+    save_plot_data, setup_cli_and_run
 from page_rank.model.tools.utils import graph_visualiser, LOG_IMPORTANT, \
     PageRankNoConvergence, getLogger
 
@@ -45,7 +46,8 @@ def _sim_worker(edges=None, labels=None, skip_python=False, **tsf_kwargs):
     return tsf, pyt
 
 
-def run(cores=None, edges_scale=None, show_out=None, skip_python_from=None):
+def run(cores=None, edges_scale=None, show_out=None, skip_python_from=None,
+        generator=None):
     import tqdm
 
     n_sizes = []
@@ -60,7 +62,8 @@ def run(cores=None, edges_scale=None, show_out=None, skip_python_from=None):
 
         tsf, pyt = runner(
             _sim_worker, node_count=node_count, edge_count=edge_count,
-            tsf_min=tsf, tsf_res=TSF_RES, skip_python=skip_python)
+            generator=generator, tsf_min=tsf, tsf_res=TSF_RES,
+            skip_python=skip_python)
 
         n_sizes.append(n_core)
         tsfs.append(tsf)
@@ -147,6 +150,7 @@ if __name__ == '__main__':
     parser.add_argument('-s', '--skip-python-from', type=int,
                         default=sys.maxsize, help='# Core to skip python from')
     parser.add_argument('-o', '--show-out', action='store_true')
+    add_generator_argument(parser)
 
     # Recreate the same graphs for the same arguments
     random.seed(42)
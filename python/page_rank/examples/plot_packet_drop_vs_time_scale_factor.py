@@ -3,9 +3,9 @@ import random
 
 import numpy as np
 
-from page_rank.examples.utils import runner, save_plot_data, setup_cli_and_run
-from page_rank.model.tools.utils import graph_visualiser, \
-    extract_router_provenance
+from page_rank.examples.utils import add_generator_argument, runner, \
+    save_plot_data, setup_cli_and_run
+from page_rank.model.tools.utils import graph_visualiser
 
 N_ITER = 25
 RUN_TIME = N_ITER * .1  # multiplied by timestep in ms
@@ -22,19 +22,20 @@ def _sim_wrkr(edges=None, labels=None, tsf=None):
     params = dict(time_scale_factor=tsf)
     with PageRankSimulation(RUN_TIME, edges, labels, params, log_level=25) as s:
         s.run()
-        prov = extract_router_provenance(PROVENANCE_ITEMS)
+        prov = s.extract_router_provenance(PROVENANCE_ITEMS)
 
     return [prov[name] for name in PROVENANCE_ITEMS]
 
 
 def run(node_count=None, tsf_min=None, tsf_step=None, tsf_max=None,
-        show_out=None):
+        show_out=None, generator=None):
     import tqdm
 
     edge_count = node_count * 10
     tsfs = list(range(tsf_min, tsf_max + 1, tsf_step))
     prov_list = [
-        runner(_sim_wrkr, node_count=node_count, edge_count=edge_count, tsf=tsf)
+        runner(_sim_wrkr, node_count=node_count, edge_count=edge_count,
+               generator=generator, tsf=tsf)
         for tsf in tqdm.tqdm(tsfs)
     ]
 
@@ -82,6 +83,7 @@ if __name__ == '__main__':
     parser.add_argument('tsf_step', metavar='TSF_STEP', type=int)
     parser.add_argument('tsf_max', metavar='TSF_MAX', type=int)
     parser.add_argument('-o', '--show-out', action='store_true')
+    add_generator_argument(parser)
 
     # Recreate the same graphs for the same arguments
     random.seed(42)
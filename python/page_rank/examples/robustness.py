@@ -1,7 +1,9 @@
 import argparse
 import random
+import time
 
-from page_rank.examples.utils import runner, setup_cli_and_run
+from page_rank.examples.utils import MAX_SEED, add_generator_argument, \
+    imap_processes, runner, setup_cli_and_run
 
 N_ITER = 25
 RUN_TIME = N_ITER * .1  # multiplied by timestep in ms
@@ -16,6 +18,8 @@ PARAMETERS = {
     # 400 for 30 cores / 20,000
     'time_scale_factor': 400,
 }
+PERCENTILES = [50, 90, 99, 100]
+PERCENTILE_NAMES = ['p50', 'p90', 'p99', 'max']
 
 
 def _mk_sim_run(edges=None, labels=None, verify=None, pause=None,
@@ -30,13 +34,61 @@ def _mk_sim_run(edges=None, labels=None, verify=None, pause=None,
         return is_correct
 
 
-def run(runs=None, **kwargs):
+def _print_summary(times, n_passed, runs):
+    import numpy as np
+
+    print('Finished robustness test with %d/%d passed (%.1f%%).' % (
+        n_passed, runs, 100. * n_passed / runs))
+    if times:
+        print('Run times (sec): ' + ', '.join(
+            '%s=%.1f' % (name, np.percentile(times, q))
+            for name, q in zip(PERCENTILE_NAMES, PERCENTILES)))
+
+
+def run(runs=None, workers=None, run_timeout=None, seed=None, **kwargs):
+    """Simulates `runs' random graphs, the i-th generated from `seed + i'.
+
+    Runs are sequential by default. With `workers', each run is done in its
+    own process, `workers' at once, e.g. on the emulator or separate boards.
+
+    :param workers: # of concurrent runs, in a process pool
+    :param run_timeout: timeout of each run in seconds, with `workers'
+    """
     import tqdm
 
-    results = [runner(_mk_sim_run, **kwargs)
-               for _ in tqdm.tqdm(range(runs), total=runs)]
-    correct = sum(map(int, results))
-    print('Finished robustness test with %d/%d passed.' % (correct, runs))
+    if seed is None:
+        seed = random.randint(0, MAX_SEED - runs)
+    runs_kwargs = [dict(kwargs, fn=_mk_sim_run, seed=seed + i)
+                   for i in range(runs)]
+
+    if workers is None:
+        def results():
+            for i, run_kwargs in enumerate(runs_kwargs):
+                start = time.time()
+                yield i, runner(**run_kwargs), time.time() - start, None
+    else:
+        def results():
+            return imap_processes(runner, runs_kwargs, workers=workers,
+                                  timeout=run_timeout)
+
+    times = []
+    n_passed = 0
+    with tqdm.tqdm(total=runs) as progress:
+        for i, is_correct, elapsed, error in results():
+            if error is None:
+                times.append(elapsed)
+            n_passed += int(bool(is_correct))
+
+            # Streams results as runs finish
+            progress.write('[run=%d seed=%d] %s in %.1f sec' % (
+                i, seed + i, error or ('passed' if is_correct else 'FAILED'),
+                elapsed))
+            progress.update()
+
+    _print_summary(times, n_passed, runs)
+
+    # Exit status, non-zero on failures
+    return int(n_passed < runs)
 
 
 if __name__ == '__main__':
@@ -55,6 +107,16 @@ if __name__ == '__main__':
                         help='Display ranks curves output')
     parser.add_argument('-l', '--log-level', type=int, default=25,
                         help='The integer log level to set')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='# concurrent runs, each in its own process. '
+                             'Default is sequential runs.')
+    parser.add_argument('--run-timeout', type=int, default=None,
+                        help='Timeout of each run in seconds, with --workers.'
+                             ' Default is no timeout.')
+    parser.add_argument('-s', '--seed', type=int, default=None,
+                        help='Seed of the first graph, the next ones use the '
+                             'following seeds.')
+    add_generator_argument(parser)
 
     # Recreate the same graphs for the same arguments
     random.seed(42)
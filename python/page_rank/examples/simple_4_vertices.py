@@ -6,7 +6,7 @@ from page_rank.examples.utils import setup_cli_and_run
 RUN_TIME = 2.1
 
 
-def run(show_in=False, show_out=False):
+def run(show_in=False, show_out=False, to_convergence=False):
     from page_rank.model.tools.simulation import PageRankSimulation
 
     ############################################################################
@@ -29,7 +29,10 @@ def run(show_in=False, show_out=False):
     with PageRankSimulation(RUN_TIME, edges, damping=1 - 10e-10,
                             log_level=logging.INFO) as sim:
         sim.draw_input_graph(show_graph=show_in, save_graph=True)
-        sim.run(verify=True)
+        if to_convergence:
+            sim.run_to_convergence(verify=True)
+        else:
+            sim.run(verify=True)
         sim.draw_output_graph(show_graph=show_out, save_graph=True)
 
 
@@ -39,5 +42,7 @@ if __name__ == '__main__':
                         help='Display directed graph input.')
     parser.add_argument('--show-out', action='store_true',
                         help='Display ranks curves output.')
+    parser.add_argument('-c', '--to-convergence', action='store_true',
+                        help='Stop once the ranks converge, within RUN_TIME.')
 
     setup_cli_and_run(parser, run)
@@ -1,7 +1,14 @@
 import argparse
+import json
+import os
 import random
 
+import numpy as np
+
 from page_rank.examples.utils import setup_cli_and_run
+from page_rank.model.tools.partitioning import VERTEX_ORDERS
+from page_rank.model.tools.result_cache import ResultCache, cache_key, \
+    graph_fingerprint
 from page_rank.model.tools.utils import getLogger, FailedOnWarningError, \
     LOG_IMPORTANT
 
@@ -9,74 +16,234 @@ N_ITER = 25
 RUN_TIME = N_ITER * .1  # multiplied by time step in ms
 LOG_LEVEL = 20  # LOG_IMPORTANT
 MAX_ITER = 15
+DAMPING = .85  # PageRankSimulation default
+
+# Quantitative signals recorded for each probe
+PROBE_PROVENANCE_NAMES = [
+    'total_multi_cast_sent_packets',
+    'total_dropped_packets',
+    'iteration_resets',  # only available on the emulator
+]
 
 _logger = getLogger()
 
 
-def _run(tsf, edges, labels, pause, verify):
+def _probe(tsf, edges, labels, pause, verify, atoms_per_core, balance_load,
+           vertex_order, spinnaker_adapter_factory):
+    """Runs the simulation with `tsf', recording its provenance.
+
+    :return: <dict> tsf, whether it passed and PROBE_PROVENANCE_NAMES counts
+    """
     from page_rank.model.tools.simulation import PageRankSimulation
 
     # Run simulation / report
     _logger.important('|> Running w/ time_scale_factor=%d\n' % tsf)
+    probe = dict(tsf=tsf, passed=True)
     params = dict(time_scale_factor=tsf)
-    with PageRankSimulation(
-            RUN_TIME, edges, labels, params, fail_on_warning=True,
-            pause=pause, log_level=LOG_LEVEL) as s:
-        s.run(verify=verify, diff_only=True)
+    adapter = spinnaker_adapter_factory and spinnaker_adapter_factory()
+    try:
+        with PageRankSimulation(
+                RUN_TIME, edges, labels, params, fail_on_warning=True,
+                pause=pause, log_level=LOG_LEVEL,
+                spinnaker_adapter=adapter, vertex_order=vertex_order) as s:
+            s.run(verify=verify, atoms_per_core=atoms_per_core,
+                  balance_load=balance_load, diff_only=True)
+            probe.update(s.extract_router_provenance(PROBE_PROVENANCE_NAMES))
+    except FailedOnWarningError:
+        probe['passed'] = False
+
+    _logger.important('Probe tsf=%d: %s, drop rate %.3f%%, %d resets\n' % (
+        tsf, 'passed' if probe['passed'] else 'FAILED',
+        100 * _drop_rate(probe), probe.get('iteration_resets', 0)))
+    return probe
+
+
+def _drop_rate(probe):
+    return probe.get('total_dropped_packets', 0) / float(
+        max(probe.get('total_multi_cast_sent_packets', 0), 1))
 
 
-def _find_tsf_range(tsf_min_in, *run_args):
-    tsf_min = tsf_min_in
-    tsf_max = tsf_min_in
+def _estimate_tsf(probes):
+    """Estimates the lowest tsf without dropped packets.
 
-    for i in range(MAX_ITER):
-        tsf_max = tsf_min_in + (2 ** i) * 100
-        _logger.important('Check tsf_max=%d\n' % tsf_max)
-        try:
-            _run(tsf_max, *run_args)
-            return tsf_min, tsf_max
-        # Raised warnings, update lower bound tsf_min on execution time
-        except FailedOnWarningError:
-            tsf_min = tsf_max
+    A core receives its packets at a fixed rate, within a tick lasting
+    `timestep * tsf' ms, so the drop rate is modelled as `max(0, a - b * tsf)'
+    and fitted on the 2 highest failed probes that dropped packets. With a
+    single one, the model goes through `a = 1'.
 
-    raise RuntimeError('Could not find tsf_max in range ({},{}). Consider '
-                       'increasing max_iter.'.format(tsf_min, tsf_max))
+    :return: <float> estimated tsf, or None without any dropped packet
+    """
+    failed = sorted((p['tsf'], _drop_rate(p)) for p in probes
+                    if not p['passed'] and _drop_rate(p) > 0)[-2:]
+    if not failed:
+        return None
 
+    tsf, rate = np.array(failed, dtype=float).T
+    if len(failed) == 2 and rate[0] > rate[1]:
+        slope, intercept = np.polyfit(tsf, rate, 1)
+        return -intercept / slope
+    return tsf[-1] / max(1. - rate[-1], 1e-3)
 
-def _find_tsf(tsf_min, tsf_res, tsf_max, *run_args):
+
+def _next_tsf(probes, lower, upper, resolution, use_model=True):
+    """Next tsf to probe in the (lower, upper) range: just above the model
+    estimate, or just below the lowest passing tsf if already close to it.
+    Falls back to a bisection or a doubling search without usable estimate,
+    or if not `use_model'.
+    """
+    estimate = _estimate_tsf(probes) if use_model else None
+    if estimate is not None and lower < estimate and \
+            (upper is None or estimate < upper):
+        res = resolution(estimate)
+        if upper is None or upper > estimate + res:
+            tsf = estimate + res / 2.
+        else:
+            tsf = upper - res
+    elif upper is None:
+        tsf = max(2 * lower, lower + 100)
+    else:
+        tsf = (lower + upper) / 2.
+
+    tsf = int(round(tsf))
+    if upper is None:
+        tsf = max(tsf, lower + 1)
+    elif tsf <= lower or tsf >= upper:
+        tsf = (lower + upper) // 2
+    return tsf
+
+
+def _find_tsf(tsf_min, tsf_res, tsf_max, probes, probe):
     # If resolution expressed as a percentage relative to tsf
     # Example: if we return tsf=50 w/ tsf_res=.1, it means the true value of tsf
     #          is in the range [45-50]
     if tsf_res < 1:
-        condition = lambda t, tsf_diff: tsf_diff > t * tsf_res
+        resolution = lambda t: t * tsf_res
     # Otherwise, resolution expressed as absolute difference
     else:
-        condition = lambda t, tsf_diff: tsf_diff > tsf_res
+        resolution = lambda t: tsf_res
+
+    # Probes searching for a passing tsf are limited to MAX_ITER. Within a
+    #   known range, the model picks MAX_ITER probes at most, then falls back
+    #   to a bisection, which always terminates
+    n_unbounded = n_bounded = 0
+    while n_unbounded < MAX_ITER:
+        # Known range, from the previous probes
+        lower = max([tsf_min - 1] + [p['tsf'] for p in probes
+                                     if not p['passed']])
+        upper = min([p['tsf'] for p in probes if p['passed']] +
+                    ([tsf_max] if tsf_max is not None else []) or [None])
+        if upper is not None and (
+                upper - lower <= max(resolution(upper), 1)):
+            _logger.important('==> RESULT: time_scale_factor=%d after %d '
+                              'probes\n' % (upper, len(probes)))
+            return upper
 
-    tsf = 0
-    while condition(tsf, abs(tsf_max - tsf_min)):
-        tsf = tsf_min + (tsf_max - tsf_min) // 2
-        try:
-            _run(tsf, *run_args)
-            # No error, reduce upper bound
-            tsf_max = tsf
-        except FailedOnWarningError:
-            # Error, increase lower bound
-            tsf_min = tsf
+        # Starts from tsf_min, which gives the steepest point of the model
+        if not probes:
+            tsf = tsf_min
+        else:
+            tsf = _next_tsf(probes, lower, upper, resolution,
+                            use_model=n_bounded < MAX_ITER)
+        probes.append(probe(tsf))
+        if upper is None:
+            n_unbounded += 1
+        else:
+            n_bounded += 1
 
-    _logger.important('==> RESULT: time_scale_factor=%d\n' % tsf_max)
-    return tsf_max
+    raise RuntimeError('Could not find a passing tsf above {}. Consider '
+                       'increasing MAX_ITER.'.format(lower))
+
+
+def load_probes(history):
+    """Probes logged by previous tunings, one JSON object per line.
+
+    :param history: path of the probe history file
+    :return: [<dict>] probes, empty if the file does not exist
+    """
+    if history is None or not os.path.exists(history):
+        return []
+    with open(history) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _cache_key(edges, labels, atoms_per_core, balance_load, vertex_order,
+               tsf_res, machine):
+    from page_rank.model.tools.graph import PageRankGraph
+    from page_rank.model.tools.simulation import BACKEND_ENV_VAR, \
+        DEFAULT_SPYNNAKER_PARAMS
+
+    graph = PageRankGraph.from_input(edges, labels)
+    return cache_key(
+        graph_fingerprint(graph), result='time_scale_factor', damping=DAMPING,
+        atoms_per_core=atoms_per_core, balance_load=balance_load,
+        vertex_order=vertex_order,
+        run_time=RUN_TIME, tsf_res=tsf_res,
+        timestep=DEFAULT_SPYNNAKER_PARAMS['timestep'],
+        machine=machine or os.environ.get(BACKEND_ENV_VAR, 'spinnaker'))
 
 
 def sim_worker(edges=None, labels=None, verify=None, pause=None,
-               tsf_min=None, tsf_res=None, tsf_max=None):
-    run_args = (edges, labels, pause, verify)
+               tsf_min=None, tsf_res=None, tsf_max=None, history=None,
+               atoms_per_core=None, balance_load=False, vertex_order=None,
+               spinnaker_adapter_factory=None, use_cache=True, machine=None):
+    """Finds the lowest time_scale_factor without provenance warnings, up to
+    `tsf_res'.
+
+    Each probe records the dropped packets, from which a drop rate vs. tsf
+    model picks the next probe, so a handful of runs are needed instead of a
+    doubling search followed by a bisection.
+
+    :param tsf_min: lower bound of the tsf, probed first
+    :param tsf_max: tsf known to pass, default is unknown
+    :param history: JSON lines file of the probes, reused and appended to.
+                    Only to be shared between tunings of the same graph!
+    :param atoms_per_core: number of vertices to set per core
+    :param balance_load: balance the incoming edges of the cores, see
+                         PageRankSimulation.run
+    :param vertex_order: name of the vertex renumbering before mapping, see
+                         partitioning.VERTEX_ORDERS
+    :param spinnaker_adapter_factory: function returning the adapter of each
+                                      probe, default is given by the simulation
+    :param use_cache: reuse the tsf tuned for an identical graph and setup,
+                      see result_cache.ResultCache
+    :param machine: name of the machine configuration in the cache key,
+                    default is $PAGE_RANK_BACKEND
+    :return: <int> time_scale_factor
+    """
+    if use_cache:
+        cache = ResultCache()
+        key = _cache_key(edges, labels, atoms_per_core, balance_load,
+                         vertex_order, tsf_res, machine)
+        cached = cache.get(key)
+        if cached is not None:
+            _logger.important('==> CACHED RESULT: time_scale_factor=%d\n' %
+                              cached['tsf'])
+            return cached['tsf']
+
+    probes = load_probes(history)
+    if probes:
+        _logger.important('Reusing %d probes from %s\n' % (len(probes),
+                                                            history))
+
+    def probe(tsf):
+        p = _probe(tsf, edges, labels, pause, verify, atoms_per_core,
+                   balance_load, vertex_order, spinnaker_adapter_factory)
+        if history is not None:
+            with open(history, 'a') as f:
+                f.write(json.dumps(p, sort_keys=True) + '\n')
+        return p
+
+    tsf = _find_tsf(tsf_min, tsf_res, tsf_max, probes, probe)
+    if use_cache:
+        cache.put(key, tsf=tsf, n_probes=len(probes))
+    return tsf
+
 
-    if tsf_max is None:
-        tsf_min, tsf_max = _find_tsf_range(tsf_min, *run_args)
-        _logger.important('Found range (%d,%d)\n' % (tsf_min, tsf_max))
+def _run_cli(node_count=None, edge_count=None, **kwargs):
+    from page_rank.examples.utils import mk_graph
 
-    return _find_tsf(tsf_min, tsf_res, tsf_max, *run_args)
+    edges, labels = mk_graph(node_count, edge_count)
+    return sim_worker(edges, labels, **kwargs)
 
 
 if __name__ == '__main__':
@@ -95,7 +262,17 @@ if __name__ == '__main__':
                         help='Verify sim w/ Python PR impl')
     parser.add_argument('-p', '--pause', action='store_true',
                         help='Pause after each runs')
+    parser.add_argument('-b', '--balance-load', action='store_true',
+                        help='Balance the incoming edges of the cores, '
+                             'rather than their number of vertices.')
+    parser.add_argument('--vertex-order', choices=sorted(VERTEX_ORDERS),
+                        default=None,
+                        help='Renumbering of the vertices before mapping. '
+                             'Default is the input order.')
+    parser.add_argument('--history', default=None,
+                        help='JSON lines file logging the probes, reused if '
+                             'existing. Default is no logging.')
 
     # Recreate the same graphs for the same arguments
     random.seed(42)
-    setup_cli_and_run(parser, sim_worker)
+    setup_cli_and_run(parser, _run_cli)
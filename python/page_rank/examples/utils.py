@@ -1,49 +1,16 @@
 import fnmatch
 import os
 import random
-from multiprocessing import Process
-from time import sleep
+import time
+from multiprocessing import Pipe, Process, cpu_count
 
 import numpy as np
 
+from page_rank.model.tools.graph_generators import GENERATORS
 from page_rank.model.tools.utils import install_requirements, \
     PageRankNoConvergence, getLogger
 
-
-def _mk_label(n):
-    return '#%d' % n
-
-
-def _mk_edges(node_count, edge_count):
-    import tqdm
-
-    # Under these constraints we can comply with the requirements below
-    assert node_count <= edge_count <= node_count ** 2, \
-        "Need node_count=%d < edge_count=%d < %d " % (node_count,
-        edge_count, node_count ** 2)
-
-    def _mk_node():
-        return random.randint(0, node_count - 1)
-
-    # Ensures no double edges
-    edges = set([])
-
-    # Ensures no dangling nodes
-    for i in range(node_count):
-        edges.add((i, _mk_node()))
-
-    for _ in tqdm.tqdm(range(node_count, edge_count), desc="Generating edges",
-                       initial=node_count, total=edge_count):
-        while True:
-            prev_len = len(edges)
-            edges.add((_mk_node(), _mk_node()))
-            if len(edges) > prev_len:
-                break
-            # else, continue because we've added an already existing edge
-
-    # Map node ids to formatted strings
-    return [(_mk_label(src), _mk_label(tgt))
-            for src, tgt in tqdm.tqdm(edges, desc="Formatting edges")]
+MAX_SEED = 2 ** 32 - 1
 
 
 def mk_path(path):
@@ -78,16 +45,30 @@ def save_plot_data(path, data):
     print('\n>>> Results saved at %s/run-%d.*' % (save_dir, i))
 
 
-def mk_graph(node_count, edge_count):
-    labels = map(_mk_label, list(range(node_count)))
-    edges = _mk_edges(node_count, edge_count)
+def mk_graph(node_count, edge_count, generator='uniform', seed=None):
+    """Generates a random graph, without duplicate edges nor dangling nodes.
+
+    :param generator: name of the model, see graph_generators.GENERATORS
+    :param seed: random seed, default is drawn from `random', seeded by the
+                 examples for reproducible graphs
+    :return: (<np.array> (edge_count, 2) vertex ids, None labels)
+    """
+    if seed is None:
+        seed = random.randint(0, MAX_SEED)
+    return GENERATORS[generator](node_count, edge_count, seed=seed), None
 
-    return edges, labels
 
+def runner(fn, node_count=None, edge_count=None, generator='uniform',
+           seed=None, **kwargs):
+    """Calls `fn' on a random graph, drawing a new one while Page Rank does not
+    converge on it.
 
-def runner(fn, node_count=None, edge_count=None, **kwargs):
+    :param seed: seed of the graphs, default is drawn from `random'
+    """
+    rng = random if seed is None else random.Random(seed)
     while True:
-        edges, labels = mk_graph(node_count, edge_count)
+        edges, labels = mk_graph(node_count, edge_count, generator,
+                                 seed=rng.randint(0, MAX_SEED))
         try:
             return fn(edges=edges, labels=labels, **kwargs)
         # Redo iteration because generated graph did not converge
@@ -95,15 +76,98 @@ def runner(fn, node_count=None, edge_count=None, **kwargs):
             print('Skipping PageRankNoConvergence graph...')
 
 
+def _process_worker(conn, fn, kwargs):
+    try:
+        conn.send((fn(**kwargs), None))
+    except BaseException as e:
+        conn.send((None, '{}: {}'.format(type(e).__name__, e)))
+    finally:
+        conn.close()
+
+
+def imap_processes(fn, kwargs_list, workers=None, timeout=None,
+                   poll_interval=.05):
+    """Calls `fn(**kwargs)' for each of `kwargs_list', each in a fresh process
+    so that runs do not share any simulator state, at most `workers' at once.
+
+    Results are yielded as soon as each run finishes, in completion order.
+    Runs exceeding `timeout' are killed and reported as failures.
+
+    :param fn: picklable function, i.e. defined at module level
+    :param workers: max # of concurrent processes, default is # CPUs
+    :param timeout: per-run timeout in seconds, default is none
+    :return: iterator of (<int> index in `kwargs_list', result, <float> run
+             time in seconds, <str> error message or None)
+    """
+    workers = workers or cpu_count()
+    pending = list(enumerate(kwargs_list))[::-1]
+    running = []
+
+    while pending or running:
+        # Start runs up to the number of workers
+        while pending and len(running) < workers:
+            i, kwargs = pending.pop()
+            parent_conn, child_conn = Pipe(duplex=False)
+            p = Process(target=_process_worker, args=(child_conn, fn, kwargs))
+            p.start()
+            child_conn.close()
+            running.append((i, p, parent_conn, time.time()))
+
+        finished = []
+        for run in running:
+            i, p, conn, start = run
+            elapsed = time.time() - start
+
+            # Checked before polling, so that a dead process has sent all
+            alive = p.is_alive()
+            if conn.poll():
+                try:
+                    result, error = conn.recv()
+                except EOFError:
+                    p.join()
+                    result, error = None, 'Exited with code {}'.format(
+                        p.exitcode)
+            elif not alive:
+                p.join()
+                result, error = None, 'Exited with code {}'.format(p.exitcode)
+            elif timeout is not None and elapsed > timeout:
+                p.terminate()
+                result, error = None, 'Timed out after {} sec'.format(timeout)
+            else:
+                continue
+
+            p.join()
+            conn.close()
+            finished.append(run)
+            yield i, result, elapsed, error
+
+        running = [run for run in running if run not in finished]
+        if not finished:
+            time.sleep(poll_interval)
+
+
+def add_generator_argument(parser):
+    parser.add_argument('-g', '--generator', choices=sorted(GENERATORS),
+                        default='uniform',
+                        help='Random graph model. Default is uniform.')
+
+
 def setup_cli_and_run(parser, fn):
     parser.add_argument('-t', '--timeout', type=int, default=None,
                         help='Simulation timeout. Default is no timeout.')
     parser.add_argument('--hbp', action='store_true', help='Is running on HBP.')
+    parser.add_argument('--emulate', action='store_true',
+                        help='Run on the software SpiNNaker emulator.')
     kwargs = dict(vars(parser.parse_args()))
 
     timeout = kwargs.pop('timeout')
     hbp = kwargs.pop('hbp')
 
+    # Exported, so also picked up by child processes
+    if kwargs.pop('emulate'):
+        from page_rank.model.tools.simulation import BACKEND_ENV_VAR
+        os.environ[BACKEND_ENV_VAR] = 'emulator'
+
     # Install requirements missing on HBP
     if hbp:
         import matplotlib
@@ -115,7 +179,7 @@ def setup_cli_and_run(parser, fn):
     if timeout is not None:
         def worker(pid):
             getLogger().important('Will time out in {} sec...'.format(timeout))
-            sleep(timeout)
+            time.sleep(timeout)
 
             getLogger().error('Timing out after {} sec!'.format(timeout))
             os.system('kill -TERM %d' % pid)
@@ -1,11 +1,11 @@
 import argparse
-import gzip
 import os
 import site
-import tempfile
 
 from page_rank.examples.tune_time_scale_factor import sim_worker
 from page_rank.examples.utils import setup_cli_and_run
+from page_rank.model.tools.edge_list import load_edge_list
+from page_rank.model.tools.utils import get_cache_dir
 
 # Info here: https://snap.stanford.edu/data/web-Google.html
 DATA_SET_URL = "https://snap.stanford.edu/data/web-Google.txt.gz"
@@ -14,21 +14,28 @@ TSF_RES = .1  # % of tsf.
 RUN_TIME = 250 * .1  # time step
 
 
-def _get_edges():
+def _download(url):
+    file_name = os.path.join(get_cache_dir(), os.path.basename(url))
+    if os.path.exists(file_name):
+        return file_name
+
     # Install and import requests, not in project requirements.txt
     os.system('pip install --user requests')
     reload(site)
     import requests
 
-    file_name = tempfile.mktemp()
-    with open(file_name, "wb") as f:
-        r = requests.get(DATA_SET_URL)
-        f.write(r.content)
+    # Streamed to a temporary file, renamed once complete
+    r = requests.get(url, stream=True)
+    r.raise_for_status()
+    with open(file_name + '.part', "wb") as f:
+        for block in r.iter_content(chunk_size=1 << 20):
+            f.write(block)
+    os.rename(file_name + '.part', file_name)
+    return file_name
 
-    with gzip.open(file_name, 'rb') as f:
-        lines = f.readlines()
-        lines = [str(l).strip() for l in lines]
-        return [tuple(l.split('\t')) for l in lines if not l.startswith('#')]
+
+def _get_edges():
+    return load_edge_list(_download(DATA_SET_URL))
 
 
 def run():
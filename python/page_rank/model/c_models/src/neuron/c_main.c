@@ -227,7 +227,8 @@ void timer_callback(uint timer_count, uint unused) {
     }
 
     // do synapse and vertex time step updates
-    vertex_do_timestep_update(time);
+    vertex_do_timestep_update(
+        time, infinite_run != TRUE && time + 1 >= simulation_ticks);
 
     // trigger buffering_out_mechanism
     if (recording_flags > 0) {
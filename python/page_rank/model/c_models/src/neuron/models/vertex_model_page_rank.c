@@ -131,7 +131,7 @@ inline void vertex_model_will_send_pkt(neuron_pointer_t neuron) {
 }
 
 void vertex_model_iteration_did_finish(neuron_pointer_t neuron) {
-    neuron->rank = global_params->damping_sum
+    neuron->rank = neuron->teleport
                  + global_params->damping_factor * neuron->curr_rank_acc;
     vertex_model_iteration_did_reset(neuron);
 }
@@ -152,4 +152,5 @@ void vertex_model_print_state_variables(restrict neuron_pointer_t neuron) {
 void vertex_model_print_parameters(restrict neuron_pointer_t neuron) {
     log_debug("incoming_edges_count = %d", neuron->incoming_edges_count);
     log_debug("outgoing_edges_count = %d", neuron->outgoing_edges_count);
+    log_debug("teleport             = %k", K(neuron->teleport));
 }
@@ -12,6 +12,10 @@ typedef struct neuron_t {
     uint32_t incoming_edges_count;
     uint32_t outgoing_edges_count;
 
+    // Rank from probability user teleports to that page: (1-d) * t_i, with
+    //   t_i the teleport probability of the page, 1/N by default
+    UFRACT teleport;
+
     // The current rank of the neuron
     UFRACT rank;
 
@@ -26,12 +30,14 @@ typedef struct global_neuron_params_t {
     // Probability user click to the next page: d
     UFRACT damping_factor;
 
-    // Rank from probability user stays on the page: (1-d) / N
-    UFRACT damping_sum;
-
     // Time steps since beginning of simulation
     uint32_t machine_time_step;
 
+    // Ticks the ranks are recorded at, see recording_modes in vertex.c, and
+    //   the number of iterations between two records of RECORD_INTERVAL
+    uint32_t recording_mode;
+    uint32_t recording_interval;
+
 } global_neuron_params_t;
 
 void vertex_model_set_global_neuron_params(global_neuron_params_pointer_t p);
@@ -20,6 +20,18 @@
 #define SPIKE_RECORDING_CHANNEL 0
 #define RANK_RECORDING_CHANNEL  1
 
+//! Ticks the ranks are recorded at, on top of the last tick of each run:
+//!   every tick, ticks starting an iteration, ticks starting every
+//!   `recording_interval'-th iteration, none, or the ticks some rank changed
+//!   at, recording only the changed ones.
+typedef enum recording_modes {
+    RECORD_ALL,
+    RECORD_ITERATIONS,
+    RECORD_INTERVAL,
+    RECORD_FINAL,
+    RECORD_CHANGED,
+} recording_modes;
+
 // declare spin1_wfi
 void spin1_wfi();
 
@@ -46,6 +58,12 @@ static uint32_t recording_flags;
 static timed_state_t *ranks;
 uint32_t ranks_size;
 
+//! storage for the ranks changed since the last record (RECORD_CHANGED):
+//!   timestamp, bitmap of the vertices changed, then their ranks
+static uint32_t *changed_ranks;
+static uint32_t n_bitmap_words;
+static bool ranks_recorded = false;
+
 //! Keep track of communication deadlocks to timeout
 static uint32_t last_sema_value;
 static uint32_t last_progressing_iteration_age;
@@ -135,6 +153,9 @@ bool vertex_reload_neuron_parameters(address_t address) {
         return false;
     }
 
+    // The simulation restarts: the first record holds all the ranks again
+    ranks_recorded = false;
+
     // for debug purposes, print the vertex parameters
     _print_vertex_parameters();
     return true;
@@ -218,6 +239,14 @@ bool vertex_initialise(address_t address, uint32_t recording_flags_param,
     ranks_size = sizeof(uint32_t) + sizeof(state_t) * n_vertices;
     ranks = (timed_state_t *) spin1_malloc(ranks_size);
 
+    n_bitmap_words = (n_vertices + 31) >> 5;
+    changed_ranks = (uint32_t *) spin1_malloc(
+        sizeof(uint32_t) * (1 + n_bitmap_words + n_vertices));
+    if (ranks == NULL || changed_ranks == NULL) {
+        log_error("Unable to allocate the rank recordings - Out of DTCM");
+        return false;
+    }
+
     _print_vertex_parameters();
 
     return true;
@@ -242,13 +271,40 @@ void recording_done_callback() {
     n_recordings_outstanding -= 1;
 }
 
+//! \brief whether the ranks are recorded at this tick, see recording_modes
+static inline bool _should_record_ranks(bool iteration_started,
+        uint32_t iter_no, bool is_last_tick) {
+    switch (global_parameters->recording_mode) {
+    case RECORD_ITERATIONS:
+        return iteration_started || is_last_tick;
+    case RECORD_INTERVAL:
+        return (iteration_started &&
+                iter_no % global_parameters->recording_interval == 0) ||
+            is_last_tick;
+    case RECORD_FINAL:
+        return is_last_tick;
+    default:
+        return true;
+    }
+}
+
 //! \brief executes all the updates to neural parameters when a given timer
 //!        period has occurred.
 //! \param[in] time the timer tick  value currently being executed
-void vertex_do_timestep_update(timer_t time) {
+void vertex_do_timestep_update(timer_t time, bool is_last_tick) {
 
     log_info("\n\n===== TIME STEP = %u =====", time);
 
+    // The first tick starts iteration #0
+    bool iteration_started = time == 0;
+
+    // Restarted from tick 0, e.g. after a reset: nothing recorded to compare
+    //   the ranks with
+    if (time == 0) {
+        ranks_recorded = false;
+    }
+    uint32_t iter_no = 0;
+
     // Keep track of progress to
     uint32_t curr_sema_value = sark_app_sema();
     if (0 < curr_sema_value && curr_sema_value == last_sema_value) {
@@ -269,7 +325,8 @@ void vertex_do_timestep_update(timer_t time) {
         uint cpsr = spin1_int_disable();
 
         // Buffer for incoming packets
-        uint32_t iter_no = message_processing_increment_iteration_number();
+        iter_no = message_processing_increment_iteration_number();
+        iteration_started = true;
 
         // Apply _reset or _finish function depending on timeout
         void (*vertex_model_fn_ptr)(neuron_pointer_t);
@@ -324,13 +381,30 @@ void vertex_do_timestep_update(timer_t time) {
     out_spikes_reset();
 #endif
 
+    bool record_changed =
+        global_parameters->recording_mode == RECORD_CHANGED;
+    uint32_t *changed_bitmap = &changed_ranks[1];
+    uint32_t *changed_states = &changed_ranks[1 + n_bitmap_words];
+    uint32_t n_changed = 0;
+    if (record_changed) {
+        memset(changed_bitmap, 0, n_bitmap_words * sizeof(uint32_t));
+    }
+
     // update each vertex individually
     for (index_t vertex_idx = 0; vertex_idx < n_vertices; vertex_idx++) {
         // Get the parameters for this vertex
         neuron_pointer_t vertex = &vertex_array[vertex_idx];
 
-        // Record the rank at the beginning of the iteration
-        ranks->states[vertex_idx] = vertex_model_get_rank_as_real(vertex);
+        // Record the rank at the beginning of the iteration, keeping the
+        //   last recorded one to compare with if only changes are recorded
+        state_t rank = vertex_model_get_rank_as_real(vertex);
+        if (record_changed) {
+            if (!ranks_recorded || rank != ranks->states[vertex_idx]) {
+                changed_bitmap[vertex_idx >> 5] |= 1 << (vertex_idx & 31);
+                memcpy(&changed_states[n_changed++], &rank, sizeof(state_t));
+            }
+        }
+        ranks->states[vertex_idx] = rank;
 
         if (vertex_model_should_send_pkt(vertex)) {
             // Tell the vertex model
@@ -376,10 +450,24 @@ void vertex_do_timestep_update(timer_t time) {
 
     // record vertex state (membrane potential) if needed
     if (recording_is_channel_enabled(recording_flags, RANK_RECORDING_CHANNEL)) {
-        n_recordings_outstanding += 1;
-        ranks->time = time;
-        recording_record_and_notify(
-            RANK_RECORDING_CHANNEL, ranks, ranks_size, recording_done_callback);
+        if (record_changed) {
+            if (n_changed > 0 || is_last_tick) {
+                n_recordings_outstanding += 1;
+                ranks_recorded = true;
+                changed_ranks[0] = time;
+                recording_record_and_notify(
+                    RANK_RECORDING_CHANNEL, changed_ranks,
+                    sizeof(uint32_t) * (1 + n_bitmap_words + n_changed),
+                    recording_done_callback);
+            }
+        } else if (_should_record_ranks(iteration_started, iter_no,
+                                        is_last_tick)) {
+            n_recordings_outstanding += 1;
+            ranks->time = time;
+            recording_record_and_notify(
+                RANK_RECORDING_CHANNEL, ranks, ranks_size,
+                recording_done_callback);
+        }
     }
 
 #ifdef OUT_SPIKES_ENABLED
@@ -8,7 +8,7 @@
  *         and converts it into c based objects for use.
  *    - vertex_set_input_buffers(input_buffers_value):
  *         setter for the internal input buffers
- *    - vertex_do_timestep_update(time):
+ *    - vertex_do_timestep_update(time, is_last_tick):
  *         executes all the updates to neural parameters when a given timer
  *         period has occurred.
  */
@@ -34,8 +34,9 @@ bool vertex_initialise(address_t address, uint32_t recording_flags,
 //! \brief executes all the updates to neural parameters when a given timer
 //!        period has occurred.
 //! \param[in] time the timer tick value currently being executed
+//! \param[in] is_last_tick whether it is the last tick of the run
 //! \return nothing
-void vertex_do_timestep_update(uint32_t time);
+void vertex_do_timestep_update(uint32_t time, bool is_last_tick);
 
 //! \brief interface for reloading vertex parameters as needed
 //! \param[in] address: the address where the vertex parameters are stored
@@ -28,9 +28,13 @@ class PageRankDataHolder(DataHolder):
 
             # PageRankBase
             damping_factor=None,        # required
-            damping_sum=None,           # required
+            recording_mode=PageRankBase.none_pynn_default_parameters[
+                'recording_mode'],
+            recording_interval=PageRankBase.none_pynn_default_parameters[
+                'recording_interval'],
             incoming_edges_count=None,  # required
             outgoing_edges_count=None,  # required
+            teleport=None,              # required
             rank_init=None,             # required
             curr_rank_acc_init=PageRankBase.none_pynn_default_parameters[
                 'curr_rank_acc_init'],
@@ -46,9 +50,11 @@ class PageRankDataHolder(DataHolder):
                 'constraints': constraints,
                 'label': label,
                 'damping_factor': damping_factor,
-                'damping_sum': damping_sum,
+                'recording_mode': recording_mode,
+                'recording_interval': recording_interval,
                 'incoming_edges_count': incoming_edges_count,
                 'outgoing_edges_count': outgoing_edges_count,
+                'teleport': teleport,
                 'rank_init': rank_init,
                 'curr_rank_acc_init': curr_rank_acc_init,
                 'curr_rank_count_init': curr_rank_count_init,
@@ -22,6 +22,8 @@ class PageRankBase(AbstractPopulationVertex):
 
     # Default parameters for this build, used when end user has not entered any
     none_pynn_default_parameters = {
+        'recording_mode': 0,  # RECORD_ALL, see recording.RECORDING_MODES
+        'recording_interval': 1,
         'curr_rank_acc_init': 0,
         'curr_rank_count_init': 0,
         'iter_state_init': 0,
@@ -41,11 +43,14 @@ class PageRankBase(AbstractPopulationVertex):
 
             # [default] Global model parameters
             damping_factor=None,  # required
-            damping_sum=None,  # required
+            recording_mode=none_pynn_default_parameters['recording_mode'],
+            recording_interval=none_pynn_default_parameters[
+                'recording_interval'],
 
             # [default] Model parameters
             incoming_edges_count=None,  # required
             outgoing_edges_count=None,  # required
+            teleport=None,  # required
 
             # [none pynn] Initial values for the state variables
             rank_init=None,  # required
@@ -56,8 +61,8 @@ class PageRankBase(AbstractPopulationVertex):
             iter_state_init=none_pynn_default_parameters['iter_state_init']):
         neuron_model = NeuronModelPageRank(
             n_neurons,
-            damping_factor, damping_sum,
-            incoming_edges_count, outgoing_edges_count,
+            damping_factor, recording_mode, recording_interval,
+            incoming_edges_count, outgoing_edges_count, teleport,
             rank_init, curr_rank_acc_init, curr_rank_count_init, iter_state_init
         )
 
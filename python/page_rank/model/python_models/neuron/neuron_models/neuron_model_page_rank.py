@@ -31,8 +31,9 @@ class _GlobalParameters(_Parameters):
     Needs to match the C code `global_neuron_params_t' in neuron/models/*.h
     """
     DAMPING_FACTOR = (1, DataType.U032, 'proba')
-    DAMPING_SUM = (2, DataType.U032, 'rk')
-    MACHINE_TIME_STEP = (3, DataType.UINT32, 'steps')
+    MACHINE_TIME_STEP = (2, DataType.UINT32, 'steps')
+    RECORDING_MODE = (3, DataType.UINT32, 'mode')
+    RECORDING_INTERVAL = (4, DataType.UINT32, 'iterations')
 
 
 class _NeuralParameters(_Parameters):
@@ -41,17 +42,18 @@ class _NeuralParameters(_Parameters):
     """
     INCOMING_EDGES_COUNT = (1, DataType.UINT32, 'count')
     OUTGOING_EDGES_COUNT = (2, DataType.UINT32, 'count')
-    RANK_INIT = (3, DataType.U032, 'rk')
-    CURR_RANK_ACC_INIT = (4, DataType.U032, 'rk')
-    CURR_RANK_COUNT_INIT = (5, DataType.UINT32, 'count')
-    ITER_STATE_INIT = (6, DataType.UINT32, 'state')
+    TELEPORT = (3, DataType.U032, 'rk')
+    RANK_INIT = (4, DataType.U032, 'rk')
+    CURR_RANK_ACC_INIT = (5, DataType.U032, 'rk')
+    CURR_RANK_COUNT_INIT = (6, DataType.UINT32, 'count')
+    ITER_STATE_INIT = (7, DataType.UINT32, 'state')
 
 
 class NeuronModelPageRank(AbstractNeuronModel, AbstractContainsUnits):
 
     def __init__(self, n_neurons,
-                 damping_factor, damping_sum,
-                 incoming_edges_count, outgoing_edges_count,
+                 damping_factor, recording_mode, recording_interval,
+                 incoming_edges_count, outgoing_edges_count, teleport,
                  rank_init, curr_rank_acc_init, curr_rank_count_init,
                  iter_state_init):
         AbstractNeuronModel.__init__(self)
@@ -61,11 +63,13 @@ class NeuronModelPageRank(AbstractNeuronModel, AbstractContainsUnits):
 
         # Global parameters (fixed value throughout simulation)
         self._damping_factor = damping_factor
-        self._damping_sum = damping_sum
+        self._recording_mode = recording_mode
+        self._recording_interval = recording_interval
 
         # Store any neural parameters (fixed value throughout simulation)
         self._incoming_edges_count = self._var_init(incoming_edges_count)
         self._outgoing_edges_count = self._var_init(outgoing_edges_count)
+        self._teleport = self._var_init(teleport)
 
         # Store any neural state variables (value is expected to change)
         self._initialise_state_vars([
@@ -91,8 +95,8 @@ class NeuronModelPageRank(AbstractNeuronModel, AbstractContainsUnits):
         :return:
         """
         def _mk_initialize(state_var):
-            def initialize(self, v):
-                self[state_var] = self._var_init(v)
+            def initialize(v):
+                setattr(self, state_var, self._var_init(v))
 
             return initialize
 
@@ -121,12 +125,20 @@ class NeuronModelPageRank(AbstractNeuronModel, AbstractContainsUnits):
         self._damping_factor = damping_factor
 
     @property
-    def damping_sum(self):
-        return self._damping_sum
+    def recording_mode(self):
+        return self._recording_mode
 
-    @damping_sum.setter
-    def damping_sum(self, damping_sum):
-        self._damping_sum = damping_sum
+    @recording_mode.setter
+    def recording_mode(self, recording_mode):
+        self._recording_mode = recording_mode
+
+    @property
+    def recording_interval(self):
+        return self._recording_interval
+
+    @recording_interval.setter
+    def recording_interval(self, recording_interval):
+        self._recording_interval = recording_interval
 
     @property
     def incoming_edges_count(self):
@@ -144,6 +156,14 @@ class NeuronModelPageRank(AbstractNeuronModel, AbstractContainsUnits):
     def outgoing_edges_count(self, outgoing_edges_count):
         self._outgoing_edges_count = self._var_init(outgoing_edges_count)
 
+    @property
+    def teleport(self):
+        return self._teleport
+
+    @teleport.setter
+    def teleport(self, teleport):
+        self._teleport = self._var_init(teleport)
+
     #
     # Mapping per-neuron parameters (`neuron_t' in C code)
     #
@@ -0,0 +1,185 @@
+import gzip
+import hashlib
+import os
+import re
+
+import numpy as np
+
+from page_rank.model.tools.graph import PageRankGraph, VERTEX_ID_DTYPE
+from page_rank.model.tools.graph_file import GRAPH_FILE_EXT, open_graph, \
+    save_graph
+from page_rank.model.tools.utils import getLogger, get_cache_dir
+
+# Bytes of text parsed at once, bounds the memory used by the parser
+CHUNK_SIZE = 1 << 24
+
+# Graph files of the parsed edge lists, in the cache directory
+CACHE_FILE_FORMAT = 'edges-{}' + GRAPH_FILE_EXT
+
+_logger = getLogger(__name__)
+
+
+#
+# Private functions, internal helpers
+#
+
+def _open(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def _iter_chunks(f, chunk_size):
+    """Reads `f' by chunks of about `chunk_size' bytes of whole lines."""
+    rest = b''
+    while True:
+        data = f.read(chunk_size)
+        if not data:
+            break
+
+        data = rest + data
+        end = data.rfind(b'\n') + 1
+        rest = data[end:]
+        if end:
+            yield data[:end]
+    if rest:
+        yield rest
+
+
+def _parse_chunk(chunk, delimiter, comment):
+    """Splits a chunk of lines into a (n_edges, 2) array of byte labels."""
+    if comment:
+        chunk = re.sub(b'(?m)^' + re.escape(comment) + b'.*$', b'', chunk)
+    if delimiter:
+        chunk = chunk.replace(delimiter, b' ')
+
+    tokens = np.array(chunk.split())
+    if len(tokens) % 2:
+        raise ValueError("Expected 2 labels per edge, got '%s'." %
+                         tokens[-1].decode())
+    return tokens.reshape(-1, 2)
+
+
+class _LabelInterner(object):
+    """Maps the labels of each chunk to ids, numerically if they all are
+    integers, through a table of the distinct labels otherwise.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._numeric = True
+        self._labels_to_ids = {}
+
+    def _intern(self, tokens):
+        uniques, inverse = np.unique(tokens, return_inverse=True)
+
+        # Only the distinct labels of the chunk go through the dict
+        ids = self._labels_to_ids
+        unique_ids = np.array([ids.setdefault(lbl, len(ids))
+                               for lbl in uniques.tolist()],
+                              dtype=VERTEX_ID_DTYPE)
+        return unique_ids[inverse].reshape(-1, 2)
+
+    def add(self, tokens):
+        if self._numeric:
+            try:
+                self._chunks.append(tokens.astype(np.int64))
+                return
+            except ValueError:
+                # Non-numeric labels, intern the previous chunks as text
+                self._numeric = False
+                self._chunks = [self._intern(c.astype(np.bytes_))
+                                for c in self._chunks]
+        self._chunks.append(self._intern(tokens))
+
+    def edges(self):
+        """:return: (<np.array> (n_edges, 2) ids, <list> sorted labels)"""
+        if not self._chunks:
+            return np.empty((0, 2), dtype=VERTEX_ID_DTYPE), []
+        edges = np.concatenate(self._chunks)
+        self._chunks = []
+
+        if self._numeric:
+            labels, inverse = np.unique(edges, return_inverse=True)
+            return inverse.astype(VERTEX_ID_DTYPE).reshape(-1, 2), \
+                labels.tolist()
+
+        # Relabel the ids so that labels are sorted, like `from_edges'
+        labels = np.empty(len(self._labels_to_ids), dtype=object)
+        for lbl, i in self._labels_to_ids.items():
+            labels[i] = lbl.decode()
+        order = np.argsort(labels)
+        new_ids = np.empty(len(order), dtype=VERTEX_ID_DTYPE)
+        new_ids[order] = np.arange(len(order), dtype=VERTEX_ID_DTYPE)
+        return new_ids[edges], labels[order].tolist()
+
+
+def _cache_path(path, delimiter, comment, cache_dir):
+    key = hashlib.sha1('{}:{!r}:{!r}'.format(
+        file_checksum(path), delimiter, comment).encode()).hexdigest()
+    return os.path.join(cache_dir or get_cache_dir(),
+                        CACHE_FILE_FORMAT.format(key))
+
+
+#
+# Exposed functions
+#
+
+def file_checksum(path, block_size=1 << 20):
+    """SHA-1 of the content of a file, read by blocks.
+
+    :return: <str> hex digest
+    """
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+def read_edge_list(path, delimiter=None, comment='#', chunk_size=CHUNK_SIZE):
+    """Parses a SNAP / TSV / CSV edge list, optionally gzip compressed.
+
+    The file is streamed by chunks of lines, each split into a NumPy array of
+    labels: no Python object is kept per line or per edge. Integer labels are
+    mapped to ids with NumPy, others through a table of the distinct labels.
+
+    :param path: file path, compressed if ending with '.gz'
+    :param delimiter: field delimiter, default is any whitespace
+    :param comment: prefix of the comment lines to skip
+    :param chunk_size: number of bytes parsed at once
+    :return: <PageRankGraph> graph, labels in sorted order
+    """
+    if isinstance(delimiter, str):
+        delimiter = delimiter.encode()
+    if isinstance(comment, str):
+        comment = comment.encode()
+
+    interner = _LabelInterner()
+    with _open(path) as f:
+        for chunk in _iter_chunks(f, chunk_size):
+            interner.add(_parse_chunk(chunk, delimiter, comment))
+
+    edges, labels = interner.edges()
+    return PageRankGraph(edges[:, 0], edges[:, 1], len(labels), labels)
+
+
+def load_edge_list(path, delimiter=None, comment='#', cache=True,
+                   cache_dir=None):
+    """`read_edge_list', through a cache of graph files keyed by the file
+    checksum. The graph is memory-mapped from the cached file.
+
+    :param cache: whether to use the binary cache
+    :param cache_dir: cache directory, default is given by `get_cache_dir'
+    :return: <PageRankGraph> graph
+    """
+    if not cache:
+        return read_edge_list(path, delimiter, comment)
+
+    cache_path = _cache_path(path, delimiter, comment, cache_dir)
+    if os.path.exists(cache_path):
+        _logger.debug('Loading cached edge list %s', cache_path)
+        return open_graph(cache_path)
+
+    save_graph(cache_path, read_edge_list(path, delimiter, comment))
+    return open_graph(cache_path)
@@ -82,6 +82,8 @@ SPFPM is provided as-is, with no warranty of any form.
 """
 
 
+import numpy as np
+
 SPFPM_VERSION = '1.4.4'
 
 
@@ -398,6 +400,8 @@ class FXnum(object):
     # Arithmetic combinations:
     def __add__(self, other):
         """Add another number"""
+        if isinstance(other, FXArray):
+            return NotImplemented
         other = self._CastOrFail_(other)
         return FXnum._rawbuild(self.family,
                                (self.scaledval + other.scaledval))
@@ -407,6 +411,8 @@ class FXnum(object):
 
     def __sub__(self, other):
         """Subtract another number"""
+        if isinstance(other, FXArray):
+            return NotImplemented
         other = self._CastOrFail_(other)
         return FXnum._rawbuild(self.family,
                                (self.scaledval - other.scaledval))
@@ -416,6 +422,8 @@ class FXnum(object):
 
     def __mul__(self, other):
         """Multiply by another number"""
+        if isinstance(other, FXArray):
+            return NotImplemented
         other = self._CastOrFail_(other)
         return FXnum._rawbuild(self.family,
                                ((self.scaledval * other.scaledval
@@ -435,6 +443,8 @@ class FXnum(object):
 
     def __truediv__(self, other):
         """Divide by another number (without truncation)"""
+        if isinstance(other, FXArray):
+            return NotImplemented
         other = self._CastOrFail_(other)
         return FXnum._rawbuild(self.family,
                                ((self.scaledval * self.family.scale
@@ -834,4 +844,355 @@ class FXnum(object):
             term *= x4
             idx += 1
             if delta.scaledval == 0: break
-        return self * atn
\ No newline at end of file
+        return self * atn
+# ^^^ class FXnum ^^^
+
+
+####
+# Arrays of fixed-point numbers
+#
+
+# Bound on the magnitude of scaled values held as int64, leaving one bit of
+#   headroom so that the sum or difference of two of them cannot overflow
+_INT64_SAFE = 1 << 62
+
+
+def _scaled_array(values):
+    """Scaled values as an int64 array, or as an array of Python integers
+    where some of them may overflow int64."""
+    values = np.asarray(values)
+    if values.dtype.kind in 'biu' and values.dtype != np.int64:
+        if values.dtype.kind == 'u' and values.dtype.itemsize == 8:
+            values = values.astype(object)
+        else:
+            values = values.astype(np.int64)
+
+    if values.dtype == np.int64:
+        if values.size and (values.max() >= _INT64_SAFE
+                            or values.min() < -_INT64_SAFE):
+            return values.astype(object)
+        return values
+    if _max_abs(values) < _INT64_SAFE:
+        return values.astype(np.int64)
+    return values
+
+
+def _max_abs(scaledval):
+    """Largest magnitude of the scaled values, as a Python integer"""
+    if not scaledval.size:
+        return 0
+    return int(np.max(np.abs(scaledval)))
+
+
+def _validate_array(family, scaledval):
+    """Vectorized equivalent of `FXfamily.validate'"""
+    if family.integer_bits is None or not scaledval.size:
+        return
+    thresh = 1 << (family.fraction_bits + family.integer_bits - 1)
+    if scaledval.dtype == np.int64 and thresh >= _INT64_SAFE:
+        return
+    if scaledval.max() >= thresh or scaledval.min() < -thresh:
+        raise FXoverflowError
+
+
+def _convert_array(family, other, scaledval):
+    """Vectorized equivalent of `FXfamily.convert'"""
+    bit_inc = family.fraction_bits - other.fraction_bits
+    if bit_inc == 0:
+        return scaledval.copy()
+    elif bit_inc > 0:
+        if _max_abs(scaledval) >= _INT64_SAFE >> bit_inc:
+            scaledval = scaledval.astype(object)
+        low = np.where(scaledval > 0, 1 << (bit_inc - 1),
+                       (1 << (bit_inc - 1)) - 1)
+        return _scaled_array((scaledval << bit_inc) | low)
+    else:
+        return scaledval >> -bit_inc
+
+
+def _scale_values(family, val):
+    """Scaled values of numbers, truncated like `int(val * family.scale)'"""
+    values = np.asarray(val)
+    kind = values.dtype.kind
+    if kind == 'f':
+        scaled = np.trunc(values.astype(np.float64) * float(family.scale))
+        if not np.isfinite(scaled).all():
+            raise ValueError('Cannot convert non-finite values to FXArray')
+        if scaled.size and np.abs(scaled).max() >= _INT64_SAFE:
+            return _scaled_array(np.array(
+                [int(v) for v in scaled.ravel()],
+                dtype=object).reshape(scaled.shape))
+        return scaled.astype(np.int64)
+    elif kind in 'biu':
+        values = _scaled_array(values)
+        if _max_abs(values) < _INT64_SAFE >> family.fraction_bits:
+            return values << family.fraction_bits
+        return _scaled_array(values.astype(object) * family.scale)
+    else:
+        # e.g. sequences of FXnum or of arbitrarily large integers
+        return _scaled_array(np.array(
+            [FXnum(v, family).scaledval for v in values.ravel()],
+            dtype=object).reshape(values.shape))
+
+
+class FXArray(object):
+    """Array of binary fixed-point real numbers sharing the same family.
+
+    Elementwise operations are computed on a numpy array of scaled values,
+    rounding and validating these like the equivalent operations of FXnum.
+    Scaled values are held as int64 unless they may overflow it, in which
+    case Python integers are used instead.
+
+    >>> fam = FXfamily(12)
+    >>> x = FXArray([0.5, 1.25, 3.2], fam)
+    >>> print(x.scaledval)
+    [ 2048  5120 13107]
+    >>> print((x * 3 / 7).to_float())
+    [0.21411133 0.53564453 1.37133789]
+    >>> print(x.sum())
+    4.9499
+    """
+
+    __slots__ = ('family', 'scaledval')
+
+    # Defer the arithmetic with numpy arrays to the reflected operators
+    __array_ufunc__ = None
+    __array_priority__ = 1000
+    __hash__ = None
+
+    def __init__(self, val=(), family=_defaultFamily, **kwargs):
+        self.family = family
+        try:
+            # Assume that val is similar to FXnum or FXArray:
+            self.scaledval = _convert_array(
+                family, val.family, _scaled_array(val.scaledval))
+        except AttributeError:
+            if 'scaled_value' in kwargs:
+                self.scaledval = _scaled_array(kwargs['scaled_value'])
+            else:
+                self.scaledval = _scale_values(family, val)
+        _validate_array(self.family, self.scaledval)
+
+    @classmethod
+    def _rawbuild(cls, fam, sv):
+        """Shortcut for creating new FXArray instance, for internal use only."""
+        arr = object.__new__(cls)
+        sv = _scaled_array(sv)
+        _validate_array(fam, sv)
+        arr.family = fam
+        arr.scaledval = sv
+        return arr
+
+    def _wrap(self, sv):
+        """FXnum for a single scaled value, FXArray otherwise"""
+        if np.ndim(sv) == 0:
+            return FXnum._rawbuild(self.family, int(sv))
+        return FXArray._rawbuild(self.family, sv)
+
+    def __repr__(self):
+        """Create unambiguous string representation of self"""
+        return 'FXArray(family={}, scaled_value={})'.format(
+            self.family, self.scaledval.tolist())
+
+    def __str__(self):
+        """Convert numbers (as decimal) into string"""
+        return '[{}]'.format(', '.join(str(x) for x in self.tolist()))
+
+    # Array protocol:
+    @property
+    def shape(self):
+        return self.scaledval.shape
+
+    @property
+    def ndim(self):
+        return self.scaledval.ndim
+
+    @property
+    def size(self):
+        return self.scaledval.size
+
+    def __len__(self):
+        return len(self.scaledval)
+
+    def __iter__(self):
+        for sv in self.scaledval:
+            yield self._wrap(sv)
+
+    def __getitem__(self, index):
+        return self._wrap(self.scaledval[index])
+
+    def __setitem__(self, index, value):
+        value = self._CastOrFail_(value)
+        if value.dtype == object and self.scaledval.dtype != object:
+            self.scaledval = self.scaledval.astype(object)
+        self.scaledval[index] = value
+
+    def copy(self):
+        return FXArray._rawbuild(self.family, self.scaledval.copy())
+
+    def reshape(self, *shape):
+        return FXArray._rawbuild(self.family, self.scaledval.reshape(*shape))
+
+    # Conversion operations:
+    def to_float(self):
+        """Cast to floating-point, as a numpy array of float64"""
+        return self.scaledval.astype(np.float64) / float(self.family.scale)
+
+    def tolist(self):
+        """Convert to (nested) list of FXnum"""
+        if self.ndim == 0:
+            return self._wrap(self.scaledval)
+        return [x.tolist() if isinstance(x, FXArray) else x for x in self]
+
+    def _CastOrFail_(self, other):
+        """Scaled values of numbers, checking that they are in same family"""
+        try:
+            # Binary operations must involve members of same family
+            if self.family != other.family:
+                raise FXfamilyError(1)
+        except AttributeError:
+            # Automatic casting from types other than FXnum is allowed:
+            other = FXArray(other, self.family)
+        return _scaled_array(other.scaledval)
+
+    # Unary arithmetic operations:
+    def __abs__(self):
+        """Modulus"""
+        return FXArray._rawbuild(self.family, abs(self.scaledval))
+
+    def __neg__(self):
+        """Change sign"""
+        return FXArray._rawbuild(self.family, -self.scaledval)
+
+    def __pos__(self):
+        """Identity operation"""
+        return self.copy()
+
+    # Arithmetic comparison tests, as numpy arrays of bool:
+    def __eq__(self, other):
+        """Equality test"""
+        return np.asarray(self.scaledval == self._CastOrFail_(other),
+                          dtype=bool)
+
+    def __ne__(self, other):
+        """Inequality test"""
+        return np.asarray(self.scaledval != self._CastOrFail_(other),
+                          dtype=bool)
+
+    def __ge__(self, other):
+        """Greater-or-equal test"""
+        return np.asarray(self.scaledval >= self._CastOrFail_(other),
+                          dtype=bool)
+
+    def __gt__(self, other):
+        """Greater-than test"""
+        return np.asarray(self.scaledval > self._CastOrFail_(other),
+                          dtype=bool)
+
+    def __le__(self, other):
+        """Less-or-equal test"""
+        return np.asarray(self.scaledval <= self._CastOrFail_(other),
+                          dtype=bool)
+
+    def __lt__(self, other):
+        """Less-than test"""
+        return np.asarray(self.scaledval < self._CastOrFail_(other),
+                          dtype=bool)
+
+    # Arithmetic combinations:
+    def __add__(self, other):
+        """Add other number(s)"""
+        other = self._CastOrFail_(other)
+        return FXArray._rawbuild(self.family, self.scaledval + other)
+
+    def __radd__(self, other):
+        return FXArray(other, self.family) + self
+
+    def __sub__(self, other):
+        """Subtract other number(s)"""
+        other = self._CastOrFail_(other)
+        return FXArray._rawbuild(self.family, self.scaledval - other)
+
+    def __rsub__(self, other):
+        return FXArray(other, self.family) - self
+
+    def __mul__(self, other):
+        """Multiply by other number(s)"""
+        other = self._CastOrFail_(other)
+        return FXArray._rawbuild(self.family, self._rawmul(other))
+
+    def __rmul__(self, other):
+        return FXArray(other, self.family) * self
+
+    def _rawmul(self, other):
+        """Scaled products `(a * b + roundup) // scale', in int64 whenever
+        they can be computed exactly, splitting `b' into two limbs if the
+        raw product may overflow."""
+        fam = self.family
+        n_bits = fam.fraction_bits
+        a, b = self.scaledval, other
+        if a.dtype == np.int64 and b.dtype == np.int64 and n_bits <= 60:
+            max_a, max_b = _max_abs(a), _max_abs(b)
+            if max_a * max_b < _INT64_SAFE:
+                return (a * b + fam._roundup) >> n_bits
+
+            limb = n_bits // 2
+            high = n_bits - limb
+            if (max_a << limb < _INT64_SAFE >> 1
+                    and max_a * ((max_b >> limb) + 1) < _INT64_SAFE):
+                hi = a * (b >> limb)
+                lo = a * (b & ((1 << limb) - 1))
+                return (hi >> high) + (
+                    (((hi & ((1 << high) - 1)) << limb) + lo + fam._roundup)
+                    >> n_bits)
+
+        a, b = a.astype(object), b.astype(object)
+        return (a * b + fam._roundup) // fam.scale
+
+    def __lshift__(self, shift):
+        sv = self.scaledval
+        if _max_abs(sv) >= _INT64_SAFE >> shift:
+            sv = sv.astype(object)
+        return FXArray._rawbuild(self.family, sv << shift)
+
+    def __rshift__(self, shift):
+        return FXArray._rawbuild(self.family, self.scaledval >> shift)
+
+    def __truediv__(self, other):
+        """Divide by other number(s) (without truncation)"""
+        other = self._CastOrFail_(other)
+        if not np.all(other):
+            raise ZeroDivisionError('FXArray division by zero')
+
+        fam = self.family
+        a = self.scaledval
+        if (a.dtype == np.int64 and other.dtype == np.int64
+                and _max_abs(a) < _INT64_SAFE >> fam.fraction_bits):
+            return FXArray._rawbuild(
+                fam, ((a << fam.fraction_bits) + fam._roundup) // other)
+        return FXArray._rawbuild(
+            fam, (a.astype(object) * fam.scale + fam._roundup)
+            // other.astype(object))
+    __div__ = __truediv__
+
+    def __rtruediv__(self, other):
+        return FXArray(other, self.family) / self
+    __rdiv__ = __rtruediv__
+
+    # Reductions:
+    def sum(self, axis=None):
+        """Sum of the numbers, exact like repeated FXnum additions"""
+        sv = self.scaledval
+        if _max_abs(sv) * max(sv.size, 1) >= _INT64_SAFE:
+            sv = sv.astype(object)
+        return self._wrap(sv.sum(axis=axis))
+
+    def min(self, axis=None):
+        """Smallest of the numbers"""
+        return self._wrap(self.scaledval.min(axis=axis))
+
+    def max(self, axis=None):
+        """Largest of the numbers"""
+        return self._wrap(self.scaledval.max(axis=axis))
+
+# ^^^ class FXArray ^^^
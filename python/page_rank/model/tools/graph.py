@@ -0,0 +1,451 @@
+import numpy as np
+
+VERTEX_ID_DTYPE = np.int32
+OFFSET_DTYPE = np.int64
+
+# Number of edges checked at once for duplicates, when already sorted
+VALIDATION_CHUNK_SIZE = 1 << 22
+
+
+def _as_ids(ids):
+    """Vertex ids as an int32 array, only copying if the input needs a cast."""
+    return np.asarray(ids, dtype=VERTEX_ID_DTYPE)
+
+
+def _offsets(degrees):
+    """CSR-like offsets from per-vertex degrees."""
+    offsets = np.zeros(len(degrees) + 1, dtype=OFFSET_DTYPE)
+    np.cumsum(degrees, out=offsets[1:])
+    return offsets
+
+
+def _is_sorted(a):
+    return len(a) < 2 or bool(np.all(a[1:] >= a[:-1]))
+
+
+def _edge_keys(src, dst):
+    """Edges packed as sortable int64 `src << 32 | dst' keys."""
+    return src.astype(np.int64) << 32 | dst
+
+
+def _label_array(edges):
+    """(n_edges, 2) array of the labels of the edges.
+
+    NumPy casts labels of mixed types to strings, e.g. (1, 'a') to ('1', 'a'),
+    so these are kept as Python objects instead.
+    """
+    label_edges = np.array(edges).reshape(-1, 2)
+    if label_edges.dtype.kind in 'SU' and \
+            len(set(type(lbl) for edge in edges for lbl in edge)) > 1:
+        label_edges = np.empty((len(edges), 2), dtype=object)
+        label_edges[:] = [tuple(edge) for edge in edges]
+    return label_edges
+
+
+def _intern_mixed_labels(label_edges, labels=None):
+    """`_intern_labels' for labels of mixed types, which NumPy cannot sort.
+
+    The default labels are sorted by type name, then value.
+    """
+    flat_labels = label_edges.ravel().tolist()
+    if labels is None:
+        labels = sorted(set(flat_labels),
+                        key=lambda lbl: (type(lbl).__name__, lbl))
+
+    labels_to_ids = dict(zip(labels, range(len(labels))))
+    try:
+        ids = np.array([labels_to_ids[lbl] for lbl in flat_labels],
+                       dtype=VERTEX_ID_DTYPE)
+    except KeyError as e:
+        raise ValueError("Edge label %r not found in 'labels'." % e.args[0])
+    return ids.reshape(-1, 2), list(labels)
+
+
+def _intern_labels(label_edges, labels=None):
+    """Maps label edges to vertex ids.
+
+    :param label_edges: (n_edges, 2) array of labels
+    :param labels: labels of the vertices, in vertex id order, or None to use
+                   the sorted set of labels found in the edges
+    :return: (<np.array> (n_edges, 2) vertex ids, <list> labels)
+    """
+    if label_edges.dtype == object:
+        return _intern_mixed_labels(label_edges, labels)
+
+    uniques, inverse = np.unique(label_edges, return_inverse=True)
+
+    if labels is None:
+        return inverse.reshape(-1, 2), uniques.tolist()
+
+    # Only the distinct labels go through a Python dict, not every edge
+    labels_to_ids = dict(zip(labels, range(len(labels))))
+    try:
+        unique_ids = np.array([labels_to_ids[lbl] for lbl in uniques.tolist()],
+                              dtype=VERTEX_ID_DTYPE)
+    except KeyError as e:
+        raise ValueError("Edge label %r not found in 'labels'." % e.args[0])
+    return unique_ids[inverse].reshape(-1, 2), list(labels)
+
+
+class PageRankGraph(object):
+    """Compact, array-backed representation of a Page Rank input graph.
+
+    Vertices are identified by their id in [0, n_vertices), mapped to their
+    label by the interned `labels' table. Edges are stored as two int32 arrays
+    of source and target ids, and the CSR (by source) / CSC (by target)
+    layouts and degrees are computed once, on first use.
+    """
+
+    def __init__(self, src, dst, n_vertices=None, labels=None,
+                 out_degrees=None, in_degrees=None, csr_offsets=None,
+                 csr_targets=None, csc_offsets=None, csc_sources=None):
+        """Creates a graph from edge arrays, without copying int32 inputs.
+
+        :param src: source vertex id of each edge
+        :param dst: target vertex id of each edge
+        :param n_vertices: number of vertices, inferred from labels or edges
+        :param labels: labels of the vertices, in vertex id order
+        :param out_degrees: [optional] precomputed per-vertex out-degrees
+        :param in_degrees: [optional] precomputed per-vertex in-degrees
+        :param csr_offsets: [optional] precomputed edge offsets by source
+        :param csr_targets: [optional] precomputed targets, sorted by source
+        :param csc_offsets: [optional] precomputed edge offsets by target
+        :param csc_sources: [optional] precomputed sources, sorted by target
+        """
+        self._src = _as_ids(src)
+        self._dst = _as_ids(dst)
+        if len(self._src) != len(self._dst):
+            raise ValueError("Got %d sources for %d targets." % (
+                len(self._src), len(self._dst)))
+
+        if n_vertices is None:
+            if labels is not None:
+                n_vertices = len(labels)
+            elif len(self._src):
+                n_vertices = int(max(self._src.max(), self._dst.max())) + 1
+            else:
+                n_vertices = 0
+        self._n_vertices = n_vertices
+
+        self._labels = labels
+        self._out_degrees = out_degrees
+        self._in_degrees = in_degrees
+        self._csr = (csr_offsets, csr_targets) \
+            if csr_offsets is not None else None
+        self._csc = (csc_offsets, csc_sources) \
+            if csc_offsets is not None else None
+
+    #
+    # Constructors
+    #
+
+    @classmethod
+    def from_edges(cls, edges, labels=None):
+        """Creates a graph from a list of (source label, target label) edges.
+
+        :param edges: list of edges
+        :param labels: labels of the vertices, default is the sorted set of
+                       labels used in `edges'
+        """
+        label_edges = _label_array(edges)
+        ids, labels = _intern_labels(label_edges, labels)
+        return cls(ids[:, 0], ids[:, 1], len(labels), labels)
+
+    @classmethod
+    def from_scipy(cls, matrix, labels=None):
+        """Creates a graph from the non-zero entries of a sparse adjacency
+        matrix, where entry (i, j) is the edge i -> j.
+
+        CSR matrices with int32 indices are used without copying their
+        `indptr' / `indices' arrays, only the sources are expanded.
+        """
+        n_vertices = matrix.shape[0]
+        if matrix.format == 'csr':
+            offsets = matrix.indptr
+            src = np.repeat(np.arange(n_vertices, dtype=VERTEX_ID_DTYPE),
+                            np.diff(offsets))
+            return cls(src, matrix.indices, n_vertices, labels,
+                       csr_offsets=offsets, csr_targets=matrix.indices)
+
+        coo = matrix.tocoo(copy=False)
+        return cls(coo.row, coo.col, n_vertices, labels)
+
+    @classmethod
+    def from_input(cls, edges, labels=None):
+        """Creates a graph from any of the supported inputs.
+
+        :param edges: PageRankGraph, (n_edges, 2) array of vertex ids,
+                      scipy.sparse adjacency matrix, list of label edges or
+                      path of a graph file, which is memory-mapped
+        :param labels: labels of the vertices
+        """
+        if isinstance(edges, (str, type(u''))):
+            from page_rank.model.tools.graph_file import open_graph
+            edges = open_graph(edges)
+        if isinstance(edges, PageRankGraph):
+            if labels is not None:
+                edges = edges.with_labels(labels)
+            return edges
+        if hasattr(edges, 'tocoo'):
+            return cls.from_scipy(edges, labels)
+        if isinstance(edges, np.ndarray) and edges.dtype.kind in 'iu':
+            return cls(edges[:, 0], edges[:, 1], labels=labels)
+        return cls.from_edges(edges, labels)
+
+    def with_labels(self, labels):
+        """Same graph with a new label table, sharing all arrays."""
+        if len(labels) != self._n_vertices:
+            raise ValueError("Got %d labels for %d vertices." % (
+                len(labels), self._n_vertices))
+        graph = PageRankGraph.__new__(PageRankGraph)
+        graph.__dict__.update(self.__dict__)
+        graph._labels = list(labels)
+        return graph
+
+    #
+    # Structure
+    #
+
+    @property
+    def n_vertices(self):
+        return self._n_vertices
+
+    @property
+    def n_edges(self):
+        return len(self._src)
+
+    @property
+    def src(self):
+        return self._src
+
+    @property
+    def dst(self):
+        return self._dst
+
+    @property
+    def labels(self):
+        """Labels of the vertices, in vertex id order (ids if unlabelled)."""
+        if self._labels is None:
+            self._labels = list(range(self._n_vertices))
+        return self._labels
+
+    @property
+    def out_degrees(self):
+        if self._out_degrees is None:
+            self._out_degrees = np.bincount(
+                self._src, minlength=self._n_vertices).astype(VERTEX_ID_DTYPE)
+        return self._out_degrees
+
+    @property
+    def in_degrees(self):
+        if self._in_degrees is None:
+            self._in_degrees = np.bincount(
+                self._dst, minlength=self._n_vertices).astype(VERTEX_ID_DTYPE)
+        return self._in_degrees
+
+    @staticmethod
+    def _group_by(keys, values, degrees):
+        """Offsets and `values' grouped by `keys' (stable, no copy if sorted).
+        """
+        if not _is_sorted(keys):
+            values = values[np.argsort(keys, kind='mergesort')]
+        return _offsets(degrees), values
+
+    def _get_csr(self):
+        if self._csr is None:
+            self._csr = self._group_by(self._src, self._dst, self.out_degrees)
+        return self._csr
+
+    def _get_csc(self):
+        if self._csc is None:
+            self._csc = self._group_by(self._dst, self._src, self.in_degrees)
+        return self._csc
+
+    @property
+    def csr_offsets(self):
+        """Offsets of the out-edges of each vertex in `csr_targets'."""
+        return self._get_csr()[0]
+
+    @property
+    def csr_targets(self):
+        """Edge targets, sorted by source vertex."""
+        return self._get_csr()[1]
+
+    @property
+    def csc_offsets(self):
+        """Offsets of the in-edges of each vertex in `csc_sources'."""
+        return self._get_csc()[0]
+
+    @property
+    def csc_sources(self):
+        """Edge sources, sorted by target vertex."""
+        return self._get_csc()[1]
+
+    #
+    # Validation
+    #
+
+    def _sorted_duplicate_edges(self, chunk_size):
+        """`duplicate_edges' for edges sorted by (source, target), checked by
+        chunks, or None if they are not sorted.
+        """
+        duplicates = []
+        for lo in range(0, self.n_edges, chunk_size):
+            # Overlap of one edge with the previous chunk
+            start = max(lo - 1, 0)
+            keys = _edge_keys(self._src[start:lo + chunk_size],
+                              self._dst[start:lo + chunk_size])
+            diffs = keys[1:] - keys[:-1]
+            if (diffs < 0).any():
+                return None
+            duplicates.append(np.flatnonzero(diffs == 0) + start + 1)
+
+        if not duplicates:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(duplicates)
+
+    def duplicate_edges(self, chunk_size=VALIDATION_CHUNK_SIZE):
+        """Indices of the edges repeating an earlier edge.
+
+        Sorted edges, e.g. from a graph file, are checked by chunks in bounded
+        memory. Others are sorted by their packed (source, target) key.
+
+        :return: <np.array> increasing edge indices
+        """
+        duplicates = self._sorted_duplicate_edges(chunk_size)
+        if duplicates is not None:
+            return duplicates
+
+        keys = _edge_keys(self._src, self._dst)
+        order = np.argsort(keys, kind='mergesort')  # first occurrence first
+        keys = keys[order]
+        return np.sort(order[1:][keys[1:] == keys[:-1]])
+
+    def dangling_vertices(self):
+        """Ids of the vertices with neither incoming nor outgoing edge.
+
+        :return: <np.array> increasing vertex ids
+        """
+        return np.flatnonzero((self.in_degrees == 0) &
+                              (self.out_degrees == 0))
+
+    def without_edges(self, edges):
+        """Same vertices and labels, without the given edges.
+
+        :param edges: indices of the edges to drop
+        """
+        keep = np.ones(self.n_edges, dtype=bool)
+        keep[edges] = False
+        return PageRankGraph(self._src[keep], self._dst[keep],
+                             self._n_vertices, self._labels)
+
+    def with_edges(self, added=None, removed=None):
+        """Same vertices and labels, with edges added and removed. Known
+        degrees are only updated for the vertices of these edges.
+
+        :param added: (n_added, 2) vertex ids of the new edges
+        :param removed: (n_removed, 2) vertex ids of existing edges
+        """
+        added, removed = [np.empty((0, 2), dtype=VERTEX_ID_DTYPE)
+                          if e is None else _as_ids(e).reshape(-1, 2)
+                          for e in (added, removed)]
+
+        keep = np.ones(self.n_edges, dtype=bool)
+        if len(removed):
+            removed = np.unique(removed, axis=0)
+            keys = _edge_keys(self._src, self._dst)
+            removed_keys = _edge_keys(removed[:, 0], removed[:, 1])
+            keep = ~np.isin(keys, removed_keys)
+            missing = np.setdiff1d(removed_keys, keys[~keep])
+            if len(missing):
+                raise ValueError("Cannot remove %d missing edges, e.g. %d -> "
+                                 "%d." % (len(missing), missing[0] >> 32,
+                                          missing[0] & 0xffffffff))
+
+        def update(degrees, removed_ids, added_ids):
+            if degrees is None:
+                return None
+            degrees = degrees.copy()
+            np.subtract.at(degrees, removed_ids, 1)
+            np.add.at(degrees, added_ids, 1)
+            return degrees
+
+        return PageRankGraph(
+            np.concatenate((self._src[keep], added[:, 0])),
+            np.concatenate((self._dst[keep], added[:, 1])),
+            self._n_vertices, self._labels,
+            out_degrees=update(self._out_degrees, removed[:, 0], added[:, 0]),
+            in_degrees=update(self._in_degrees, removed[:, 1], added[:, 1]))
+
+    def without_vertices(self, vertices):
+        """Graph without the given vertices and their edges, the remaining
+        vertices being renumbered in order.
+
+        :param vertices: ids of the vertices to drop
+        """
+        keep = np.ones(self._n_vertices, dtype=bool)
+        keep[vertices] = False
+        new_ids = np.cumsum(keep, dtype=VERTEX_ID_DTYPE) - 1
+
+        keep_edges = keep[self._src] & keep[self._dst]
+        labels = None
+        if self._labels is not None:
+            labels = [lbl for lbl, k in zip(self._labels, keep.tolist()) if k]
+        return PageRankGraph(new_ids[self._src[keep_edges]],
+                             new_ids[self._dst[keep_edges]],
+                             int(np.count_nonzero(keep)), labels)
+
+    def permuted(self, order):
+        """Same graph with the vertices renumbered, labels following them.
+
+        :param order: old vertex id of each new id
+        """
+        order = _as_ids(order)
+        new_ids = np.empty(self._n_vertices, dtype=VERTEX_ID_DTYPE)
+        new_ids[order] = np.arange(self._n_vertices, dtype=VERTEX_ID_DTYPE)
+        labels = self.labels
+        return PageRankGraph(new_ids[self._src], new_ids[self._dst],
+                             self._n_vertices,
+                             [labels[i] for i in order.tolist()])
+
+    #
+    # Conversions
+    #
+
+    def edge_list(self):
+        """(n_edges, 2) array of (source id, target id)."""
+        return np.column_stack((self._src, self._dst))
+
+    def label_edge_ids(self, edges):
+        """Vertex ids of (source label, target label) edges.
+
+        :param edges: list of label edges, or (n_edges, 2) array of vertex
+                      ids for an unlabelled graph
+        :return: <np.array> (n_edges, 2) vertex ids
+        """
+        if edges is None or not len(edges):
+            return np.empty((0, 2), dtype=VERTEX_ID_DTYPE)
+        if self._labels is None and isinstance(edges, np.ndarray) and \
+                edges.dtype.kind in 'iu':
+            return _as_ids(edges).reshape(-1, 2)
+        return _intern_labels(_label_array(edges), self.labels)[0]
+
+    def label_edges(self):
+        """Iterates over the edges as (source label, target label)."""
+        labels = self.labels
+        return ((labels[s], labels[t])
+                for s, t in zip(self._src.tolist(), self._dst.tolist()))
+
+    def to_networkx(self):
+        import networkx as nx
+
+        g = nx.Graph().to_directed()
+        g.add_edges_from(self.label_edges())
+        return g
+
+    def __len__(self):
+        return self._n_vertices
+
+    def __repr__(self):
+        return 'PageRankGraph(n_vertices={}, n_edges={})'.format(
+            self._n_vertices, self.n_edges)
@@ -0,0 +1,200 @@
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+from page_rank.model.tools.graph import PageRankGraph, VERTEX_ID_DTYPE, \
+    OFFSET_DTYPE
+
+# File layout, all values little-endian:
+#  - header: magic, version, label kind, n_vertices, n_edges
+#  - section table: (offset, size in bytes) of each of SECTIONS
+#  - sections, each aligned on SECTION_ALIGNMENT bytes
+MAGIC = b'PRGRAPH\0'
+VERSION = 1
+GRAPH_FILE_EXT = '.prg'
+
+_HEADER = struct.Struct('<8sIIQQ')
+_SECTION_ENTRY = struct.Struct('<QQ')
+SECTION_ALIGNMENT = 8
+
+# Labels kinds
+LABELS_IDS = 0  # no label table, labels are the vertex ids
+LABELS_INT = 1  # int64 labels
+LABELS_STR = 2  # utf-8 strings table
+
+# Sections in file order, with their element type
+SECTIONS = [
+    ('out_degrees', VERTEX_ID_DTYPE),
+    ('in_degrees', VERTEX_ID_DTYPE),
+    ('csr_offsets', OFFSET_DTYPE),
+    ('csr_sources', VERTEX_ID_DTYPE),  # source of each edge, sorted
+    ('csr_targets', VERTEX_ID_DTYPE),
+    ('csc_offsets', OFFSET_DTYPE),
+    ('csc_sources', VERTEX_ID_DTYPE),
+    ('label_offsets', OFFSET_DTYPE),  # LABELS_STR only
+    ('label_data', np.int64),  # int64 labels, or utf-8 bytes of strings
+]
+
+
+class LabelTable(object):
+    """Read-only sequence of labels, backed by (memory-mapped) arrays.
+
+    Labels are only converted to Python objects when accessed, so that huge
+    label tables are not loaded in memory.
+    """
+
+    def __init__(self, kind, n_labels, offsets=None, data=None):
+        self._kind = kind
+        self._n_labels = n_labels
+        self._offsets = offsets
+        self._data = data
+
+    def _get(self, i):
+        if self._kind == LABELS_IDS:
+            return i
+        if self._kind == LABELS_INT:
+            return int(self._data[i])
+        lo, hi = self._offsets[i], self._offsets[i + 1]
+        return self._data[lo:hi].tobytes().decode('utf-8')
+
+    def __len__(self):
+        return self._n_labels
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self._get(i) for i in range(*item.indices(len(self)))]
+        if item < 0:
+            item += self._n_labels
+        if not 0 <= item < self._n_labels:
+            raise IndexError('label index out of range')
+        return self._get(item)
+
+    def __iter__(self):
+        return (self._get(i) for i in range(self._n_labels))
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+
+def _label_sections(labels):
+    """:return: (<int> label kind, <np.array> offsets, <np.array> data)"""
+    if labels is None or isinstance(labels, LabelTable) and \
+            labels._kind == LABELS_IDS:
+        return LABELS_IDS, None, None
+
+    if isinstance(labels, LabelTable) and labels._kind == LABELS_INT:
+        return LABELS_INT, None, labels._data
+    if all(isinstance(lbl, (int, np.integer)) for lbl in labels):
+        return LABELS_INT, None, np.asarray(labels, dtype=np.int64)
+
+    encoded = [u'{}'.format(lbl).encode('utf-8') for lbl in labels]
+    offsets = np.zeros(len(encoded) + 1, dtype=OFFSET_DTYPE)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return LABELS_STR, offsets, np.frombuffer(b''.join(encoded),
+                                              dtype=np.uint8)
+
+
+def _aligned(offset):
+    return -(-offset // SECTION_ALIGNMENT) * SECTION_ALIGNMENT
+
+
+#
+# Exposed functions
+#
+
+def save_graph(path, graph):
+    """Writes a graph to the memory-mappable graph file format.
+
+    Labels are written as given if they all are integers, as utf-8 strings
+    otherwise. The file is written aside then renamed, so that concurrent
+    readers never map a partial file.
+
+    :param path: file path, conventionally ending with GRAPH_FILE_EXT
+    :param graph: <PageRankGraph> graph
+    """
+    label_kind, label_offsets, label_data = _label_sections(graph._labels)
+    arrays = dict(
+        out_degrees=graph.out_degrees,
+        in_degrees=graph.in_degrees,
+        csr_offsets=graph.csr_offsets,
+        csr_sources=np.repeat(np.arange(graph.n_vertices,
+                                        dtype=VERTEX_ID_DTYPE),
+                              graph.out_degrees),
+        csr_targets=graph.csr_targets,
+        csc_offsets=graph.csc_offsets,
+        csc_sources=graph.csc_sources,
+        label_offsets=label_offsets,
+        label_data=label_data,
+    )
+
+    # Section table
+    table = []
+    offset = _HEADER.size + len(SECTIONS) * _SECTION_ENTRY.size
+    for name, dtype in SECTIONS:
+        a = arrays[name]
+        size = 0 if a is None else a.nbytes
+        offset = _aligned(offset)
+        table.append((offset, size))
+        offset += size
+
+    dir_name = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=dir_name)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, label_kind, graph.n_vertices,
+                             graph.n_edges))
+        for entry in table:
+            f.write(_SECTION_ENTRY.pack(*entry))
+
+        for (name, dtype), (offset, size) in zip(SECTIONS, table):
+            if not size:
+                continue
+            f.write(b'\0' * (offset - f.tell()))
+            a = arrays[name]
+            if a.dtype != np.uint8:
+                a = np.asarray(a, dtype=np.dtype(dtype).newbyteorder('<'))
+            a.tofile(f)
+    os.rename(tmp_path, path)
+
+
+def open_graph(path):
+    """Opens a graph file, memory-mapping all its arrays read-only.
+
+    Nothing is loaded until accessed, so graphs bigger than the memory can be
+    used, and processes opening the same file share it through the page cache.
+
+    :param path: file path
+    :return: <PageRankGraph> graph
+    """
+    buf = np.memmap(path, dtype=np.uint8, mode='r')
+
+    magic, version, label_kind, n_vertices, n_edges = _HEADER.unpack_from(buf)
+    if magic != MAGIC:
+        raise ValueError("'%s' is not a Page Rank graph file." % path)
+    if version != VERSION:
+        raise ValueError("Unsupported graph file version %d, expected %d." % (
+            version, VERSION))
+
+    sections = {}
+    for i, (name, dtype) in enumerate(SECTIONS):
+        offset, size = _SECTION_ENTRY.unpack_from(
+            buf, _HEADER.size + i * _SECTION_ENTRY.size)
+        if name == 'label_data' and label_kind == LABELS_STR:
+            dtype = np.uint8
+        sections[name] = buf[offset:offset + size].view(
+            np.dtype(dtype).newbyteorder('<'))
+
+    labels = LabelTable(label_kind, n_vertices, sections['label_offsets'],
+                        sections['label_data'])
+    return PageRankGraph(
+        sections['csr_sources'], sections['csr_targets'], n_vertices, labels,
+        out_degrees=sections['out_degrees'],
+        in_degrees=sections['in_degrees'],
+        csr_offsets=sections['csr_offsets'],
+        csr_targets=sections['csr_targets'],
+        csc_offsets=sections['csc_offsets'],
+        csc_sources=sections['csc_sources'])
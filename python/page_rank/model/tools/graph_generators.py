@@ -0,0 +1,156 @@
+import numpy as np
+
+from page_rank.model.tools.graph import VERTEX_ID_DTYPE
+
+# Quadrant probabilities of R-MAT, as in the Graph500 benchmark
+RMAT_PROBABILITIES = (.57, .19, .19, .05)
+
+# Probability to link to a uniformly chosen vertex rather than to copy the
+#   target of an earlier edge, in preferential attachment
+UNIFORM_ATTACHMENT = .2
+
+# Extra edges drawn per batch, to compensate for the duplicates
+_OVERSAMPLING = 1.1
+
+
+#
+# Private functions, internal helpers
+#
+
+def _get_rng(seed):
+    if isinstance(seed, np.random.RandomState):
+        return seed
+    return np.random.RandomState(seed)
+
+
+def _check_counts(node_count, edge_count):
+    # Under these constraints we can comply with the requirements below
+    if not node_count <= edge_count <= node_count ** 2:
+        raise ValueError("Need node_count=%d <= edge_count=%d <= %d." % (
+            node_count, edge_count, node_count ** 2))
+
+
+def _unique_first(keys):
+    """Unique keys, in order of first occurrence."""
+    _, first = np.unique(keys, return_index=True)
+    return keys[np.sort(first)]
+
+
+def _generate(node_count, edge_count, sample_keys, rng):
+    """Draws `edge_count' distinct edges, each vertex having at least one
+    outgoing edge (so none is dangling, nor a sink).
+
+    :param sample_keys: function(n_edges, rng) -> <np.array> `src * n + dst'
+                        int64 keys of the random edges of the model
+    :return: <np.array> (edge_count, 2) vertex ids
+    """
+    _check_counts(node_count, edge_count)
+    n = np.int64(node_count)
+
+    # Ensures no dangling nodes, with one random outgoing edge per vertex
+    keys = np.arange(n) * n + rng.randint(node_count, size=node_count)
+
+    # Ensures no double edges, drawing more until there are enough
+    while len(keys) < edge_count:
+        missing = edge_count - len(keys)
+        sample = sample_keys(int(missing * _OVERSAMPLING) + 1, rng)
+        keys = _unique_first(np.concatenate((keys, sample)))[:edge_count]
+
+    edges = np.empty((edge_count, 2), dtype=VERTEX_ID_DTYPE)
+    edges[:, 0] = keys // n
+    edges[:, 1] = keys % n
+    return edges
+
+
+#
+# Exposed functions
+#
+
+def uniform_graph(node_count, edge_count, seed=None):
+    """Erdos-Renyi G(n, m) graph: `edge_count' distinct edges, uniformly
+    drawn, at least one outgoing per vertex.
+
+    :param seed: int seed or np.random.RandomState
+    :return: <np.array> (edge_count, 2) vertex ids
+    """
+    def sample_keys(n_edges, rng):
+        return rng.randint(node_count, size=n_edges).astype(np.int64) * \
+            node_count + rng.randint(node_count, size=n_edges)
+
+    return _generate(node_count, edge_count, sample_keys, _get_rng(seed))
+
+
+def rmat_graph(node_count, edge_count, probabilities=RMAT_PROBABILITIES,
+               seed=None):
+    """R-MAT (recursive Kronecker) graph, with power-law in and out degrees.
+
+    Each edge picks one quadrant of the adjacency matrix per bit of the
+    vertex ids. Ids over `node_count' are redrawn, and ids are randomly
+    permuted so that hubs are spread.
+
+    :param probabilities: (a, b, c, d) quadrant probabilities
+    :param seed: int seed or np.random.RandomState
+    :return: <np.array> (edge_count, 2) vertex ids
+    """
+    rng = _get_rng(seed)
+    a, b, c, _ = probabilities
+    scale = max(int(np.ceil(np.log2(node_count))), 1)
+    permutation = rng.permutation(node_count).astype(np.int64)
+
+    def sample_keys(n_edges, rng):
+        src = np.zeros(n_edges, dtype=np.int64)
+        dst = np.zeros(n_edges, dtype=np.int64)
+        for _ in range(scale):
+            r = rng.random_sample(n_edges)
+            src = src << 1 | (r >= a + b)
+            dst = dst << 1 | ((r >= a) & (r < a + b) | (r >= a + b + c))
+
+        valid = (src < node_count) & (dst < node_count)
+        return permutation[src[valid]] * node_count + permutation[dst[valid]]
+
+    return _generate(node_count, edge_count, sample_keys, rng)
+
+
+def preferential_attachment_graph(node_count, edge_count,
+                                  uniform=UNIFORM_ATTACHMENT, seed=None):
+    """Directed preferential attachment graph (Price's model), with
+    power-law in-degrees.
+
+    Vertices link in turn to a uniformly drawn vertex with probability
+    `uniform', or otherwise to the target of a uniformly drawn earlier edge,
+    i.e. proportionally to the in-degrees, giving an in-degree exponent of
+    `2 + uniform / (1 - uniform)' (2.25 by default, ~2.1 for the web). The
+    chains of copied targets are resolved by pointer jumping, in O(E log E)
+    array operations.
+
+    :param uniform: probability of a uniform attachment
+    :param seed: int seed or np.random.RandomState
+    :return: <np.array> (edge_count, 2) vertex ids
+    """
+    def sample_keys(n_edges, rng):
+        # Sources in arrival order, as many edges per vertex
+        src = np.sort(rng.randint(node_count, size=n_edges)).astype(np.int64)
+
+        # Edge each edge copies its target from, itself if uniform
+        idx = np.arange(n_edges)
+        copied = idx[:-1][rng.random_sample(n_edges - 1) >= uniform] + 1
+        origin = idx.copy()
+        origin[copied] = (rng.random_sample(len(copied)) * copied).astype(
+            np.int64)
+        while True:
+            next_origin = origin[origin]
+            if np.array_equal(next_origin, origin):
+                break
+            origin = next_origin
+
+        dst = rng.randint(node_count, size=n_edges)[origin]
+        return src * node_count + dst
+
+    return _generate(node_count, edge_count, sample_keys, _get_rng(seed))
+
+
+GENERATORS = {
+    'uniform': uniform_graph,
+    'rmat': rmat_graph,
+    'preferential_attachment': preferential_attachment_graph,
+}
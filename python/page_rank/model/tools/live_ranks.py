@@ -0,0 +1,274 @@
+import socket
+import struct
+import threading
+
+import numpy as np
+
+try:
+    import queue
+except ImportError:  # Python 2
+    import Queue as queue
+
+from page_rank.model.tools.page_rank_engine import FP_SCALE, PAYLOAD_MASK
+from page_rank.model.tools.utils import ITER_BITS, getLogger
+
+# EIEIO data messages of (32-bit key, 32-bit payload) pairs, as sent by the
+#   live packet gatherer, see spinnman.messages.eieio.EIEIOType
+EIEIO_KEY_PAYLOAD_32_BIT = 3
+_EIEIO_HEADER = struct.Struct('<H')
+_EIEIO_PREFIX = struct.Struct('<H')
+_EIEIO_PAIR_DTYPE = np.dtype([('key', '<u4'), ('payload', '<u4')])
+
+# Pairs per datagram, within the 256 bytes of an SDP packet
+MAX_PAIRS_PER_PACKET = 31
+
+# Iteration tag of the payloads, see c_models/src/neuron/message/in_messages.h
+ITER_MASK = (1 << ITER_BITS) - 1
+N_ITER_TAGS = 1 << ITER_BITS
+
+# A row is delivered incomplete once a later one is that many iterations ahead
+ROW_LAG = N_ITER_TAGS
+
+# Socket timeout, to check whether the receiver is closed and drained
+POLL_INTERVAL = .1  # sec
+
+_logger = getLogger(__name__)
+
+
+#
+# EIEIO packets
+#
+
+def encode_eieio_key_payload(keys, payloads):
+    """EIEIO data messages of (key, payload) pairs, as sent by the live packet
+    gatherer without prefix nor timestamps.
+
+    :return: [<bytes>] datagrams
+    """
+    pairs = np.empty(len(keys), dtype=_EIEIO_PAIR_DTYPE)
+    pairs['key'], pairs['payload'] = keys, payloads
+
+    packets = []
+    for lo in range(0, len(pairs), MAX_PAIRS_PER_PACKET):
+        chunk = pairs[lo:lo + MAX_PAIRS_PER_PACKET]
+        header = EIEIO_KEY_PAYLOAD_32_BIT << 10 | len(chunk)
+        packets.append(_EIEIO_HEADER.pack(header) + chunk.tobytes())
+    return packets
+
+
+def decode_eieio_key_payload(data):
+    """(key, payload) pairs of an EIEIO data message of 32-bit keys and
+    payloads, possibly with a key prefix.
+
+    :param data: <bytes> datagram
+    :return: (<np.array> keys, <np.array> payloads) as uint32
+    """
+    header, = _EIEIO_HEADER.unpack_from(data)
+    count, eieio_type = header & 0xff, header >> 10 & 0x3
+    if eieio_type != EIEIO_KEY_PAYLOAD_32_BIT or header & (1 << 13 | 1 << 12):
+        raise ValueError('Expected EIEIO 32-bit key / payload pairs without '
+                         'payload prefix, got header 0x%04x.' % header)
+
+    offset, prefix = _EIEIO_HEADER.size, 0
+    if header & 1 << 15:
+        prefix, = _EIEIO_PREFIX.unpack_from(data, offset)
+        offset += _EIEIO_PREFIX.size
+        if header & 1 << 14:
+            prefix <<= 16
+
+    pairs = np.frombuffer(data, dtype=_EIEIO_PAIR_DTYPE, count=count,
+                          offset=offset)
+    return pairs['key'] | np.uint32(prefix), pairs['payload'].copy()
+
+
+#
+# Host receiver
+#
+
+class LiveRanksReceiver(object):
+    """Receives the ranks broadcast by the vertices at each iteration, while
+    the simulation runs, and assembles them into rows of ranks.
+
+    Each vertex sends its `rank / out_degree' at the start of each iteration,
+    tagged with the iteration number modulo N_ITER_TAGS: the receiver gets a
+    copy of these packets through the live packet gatherer, as EIEIO UDP
+    datagrams. Ranks are thus only known to `out_degree * 2 ** ITER_BITS'
+    units of the last place.
+
+    Rows are delivered in iteration order, to the `callback' (from the
+    receiving thread) and through `rows()'. A row missing some ranks, e.g.
+    dropped packets, is delivered with NaN ranks once ROW_LAG later rows
+    started, or when the receiver is closed.
+    """
+
+    def __init__(self, out_degrees, rank_order=None, callback=None,
+                 host='127.0.0.1', port=0):
+        """Starts listening for ranks.
+
+        :param out_degrees: out-degree of each vertex, as mapped
+        :param rank_order: mapped id of each vertex, to deliver the ranks in
+                           input order, default is the mapped order
+        :param callback: function(<int> iteration, <np.array> ranks)
+        :param host: address to listen to
+        :param port: UDP port to listen to, default is any free port
+        """
+        self._out_degrees = np.maximum(np.asarray(out_degrees, np.int64), 1)
+        self._rank_order = rank_order
+        self._callback = callback
+        n = len(self._out_degrees)
+
+        # Key of each vertex, set by the adapter once the graph is mapped
+        self._keys = None
+        self._key_vertices = None
+        self._pending = []
+
+        # Rows being received, and last iteration received from each vertex
+        self._rows = {}
+        self._next_row = 0
+        self._last_iter = np.full(n, -1, dtype=np.int64)
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 22)
+        self._socket.bind((host, port))
+        self._socket.settimeout(POLL_INTERVAL)
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._receive_loop)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    #
+    # Private functions, internal helpers
+    #
+
+    def _receive_loop(self):
+        # Once closed, the datagrams already buffered are still received
+        while True:
+            try:
+                data = self._socket.recv(1 << 16)
+            except socket.timeout:
+                if self._closed.is_set():
+                    break
+                continue
+
+            try:
+                keys, payloads = decode_eieio_key_payload(data)
+            except ValueError as e:
+                _logger.warning('Ignoring live packet: %s', e)
+                continue
+            with self._lock:
+                if self._keys is None:
+                    self._pending.append((keys, payloads))
+                else:
+                    self._add(keys, payloads)
+
+    def _add(self, keys, payloads):
+        """Adds the ranks of (key, payload) pairs to their rows."""
+        idx = np.minimum(np.searchsorted(self._keys, keys),
+                         len(self._keys) - 1)
+        known = self._keys[idx] == keys
+        if not known.all():
+            _logger.warning('Ignoring %d live packets of unknown keys',
+                            np.count_nonzero(~known))
+        vertices = self._key_vertices[idx[known]]
+        payloads = payloads[known].astype(np.int64)
+
+        for vertex, payload in zip(vertices.tolist(), payloads.tolist()):
+            # Full iteration number, from its tag and the previous one: each
+            #   vertex sends once per iteration
+            last = int(self._last_iter[vertex])
+            iteration = last + (
+                ((payload & ITER_MASK) - last) % N_ITER_TAGS or N_ITER_TAGS)
+            self._last_iter[vertex] = iteration
+
+            row = self._rows.get(iteration)
+            if row is None:
+                if iteration < self._next_row:
+                    continue  # Row already delivered
+                row = self._rows[iteration] = [
+                    np.full(len(self._out_degrees), np.nan), 0]
+            if np.isnan(row[0][vertex]):
+                row[1] += 1
+            row[0][vertex] = float((payload & PAYLOAD_MASK) *
+                                   self._out_degrees[vertex]) / FP_SCALE
+
+        self._deliver_rows()
+
+    def _deliver_rows(self, flush=False):
+        """Delivers the complete rows in order, and incomplete ones lagging
+        behind, or all of them if `flush'.
+        """
+        n = len(self._out_degrees)
+        while self._rows:
+            row = self._rows.get(self._next_row)
+            lagging = max(self._rows) >= self._next_row + ROW_LAG
+            if not (flush or lagging or row is not None and row[1] == n):
+                break
+
+            if row is not None:
+                del self._rows[self._next_row]
+                ranks = row[0]
+                if self._rank_order is not None:
+                    ranks = ranks[self._rank_order]
+                if self._callback is not None:
+                    self._callback(self._next_row, ranks)
+                self._queue.put((self._next_row, ranks))
+            self._next_row += 1
+
+    #
+    # Exposed functions
+    #
+
+    @property
+    def address(self):
+        """(host, port) the ranks are to be sent to."""
+        return self._socket.getsockname()
+
+    def set_key_map(self, keys, vertices):
+        """Sets the multicast key of each vertex, once the graph is mapped.
+
+        :param keys: <np.array> keys
+        :param vertices: <np.array> mapped vertex id of each key
+        """
+        order = np.argsort(keys)
+        with self._lock:
+            self._keys = np.asarray(keys, dtype=np.uint32)[order]
+            self._key_vertices = np.asarray(vertices)[order]
+            pending, self._pending = self._pending, []
+            for keys, payloads in pending:
+                self._add(keys, payloads)
+
+    def rows(self, timeout=None):
+        """Iterates over the rows of ranks as they are received, until the
+        receiver is closed and all rows are delivered.
+
+        :param timeout: max time to wait for a row, in sec, default is until
+                        the receiver is closed
+        :return: iterator of (<int> iteration, <np.array> ranks)
+        """
+        while True:
+            try:
+                row = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                return
+            if row is None:
+                return
+            yield row
+
+    def close(self):
+        """Stops listening, delivering the rows still incomplete."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._thread.join()
+        self._socket.close()
+        with self._lock:
+            self._deliver_rows(flush=True)
+        self._queue.put(None)
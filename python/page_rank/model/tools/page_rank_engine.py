@@ -0,0 +1,147 @@
+import numpy as np
+
+from page_rank.model.tools.utils import ITER_BITS, PageRankNoConvergence, \
+    getLogger, to_fp, to_fp_array
+
+# Fixed-point format shared with `to_fp': 32 fractional bits (u0.32 in C)
+FP_FRACTION_BITS = 32
+FP_SCALE = 1 << FP_FRACTION_BITS
+FP_ROUNDUP = 1 << (FP_FRACTION_BITS - 1)
+
+# Low bits of the payload used to encode the iteration number, see
+#   c_models/src/neuron/message/in_messages.h
+PAYLOAD_MASK = ~((1 << ITER_BITS) - 1)
+
+# Limb size used to multiply 32-bit fixed-point numbers without overflowing
+#   the 64-bit containers
+_LIMB_BITS = FP_FRACTION_BITS // 2
+_LIMB_MASK = (1 << _LIMB_BITS) - 1
+
+_logger = getLogger(__name__)
+
+
+#
+# Fixed-point helpers, operating on scaled int64 values
+#
+
+def fp_scaled(n):
+    """Scaled integer value of `n' in the fixed-point family used by `to_fp'.
+
+    :param n: float or array of floats
+    :return: <int> or <np.array> of int64
+    """
+    if np.ndim(n) == 0:
+        return to_fp(n).scaledval
+    return to_fp_array(n).scaledval.astype(np.int64)
+
+
+def fp_mul(a, b):
+    """Fixed-point multiplication, rounding like `FXnum.__mul__'.
+
+    Computes `(a * b + FP_ROUNDUP) >> FP_FRACTION_BITS' exactly in int64 by
+    splitting `b' into two limbs, as the raw product of two u0.32 numbers
+    does not fit in 63 bits. The partial product `a * (b >> 16)' must still
+    fit, hence |a * b| < 2 ** 79: e.g. a u0.32 operand (< 2 ** 32) times a
+    value below 2 ** 47.
+
+    :param a: scaled value(s)
+    :param b: scaled value(s)
+    :return: <np.array> of int64
+    """
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+
+    hi = a * (b >> _LIMB_BITS)
+    lo = a * (b & _LIMB_MASK)
+    return (hi >> _LIMB_BITS) + ((((hi & _LIMB_MASK) << _LIMB_BITS) + lo +
+                                  FP_ROUNDUP) >> FP_FRACTION_BITS)
+
+
+def fp_div_count(a, count):
+    """Fixed-point division by an integer count, like `FXnum.__truediv__'.
+
+    `(a * FP_SCALE + FP_ROUNDUP) // (count * FP_SCALE)' simplifies to
+    `a // count' for non-negative `a'.
+
+    :param a: non-negative scaled value(s)
+    :param count: positive integer(s)
+    :return: <np.array> of int64
+    """
+    return np.asarray(a, dtype=np.int64) // count
+
+
+def fp_to_float(a):
+    """Converts scaled value(s) back to float64, like `FXnum.__float__'."""
+    return np.asarray(a, dtype=np.float64) / FP_SCALE
+
+
+#
+# Page Rank
+#
+
+def compute_page_rank(graph, d, d_sum, tol, max_iter=100, rank_init=None):
+    """Return the PageRank of the vertices of the graph.
+
+    Vectorised equivalent of `utils.compute_page_rank', bit-exact with its
+    32-bit fixed-point arithmetic:
+     - rank sent along each edge: `rank // out_degree'
+     - payload truncation: `(pkt >> ITER_BITS) << ITER_BITS'
+     - rank update: `d_sum + d * acc' (rounded multiplication), `d_sum'
+       being the teleport term of each vertex
+     - stopping rule: L1 norm of the update below `n_vertices * tol'
+
+    :param graph: <PageRankGraph> input graph
+    :param d: damping factor
+    :param d_sum: damping sum, or <np.array> id-indexed teleport terms for a
+                  personalized Page Rank
+    :param tol: convergence tolerance
+    :param max_iter: max iteration count before giving up on convergence
+    :param rank_init: <np.array> id-indexed initial ranks, e.g. those of a
+                      previous graph to warm start from, default is uniform
+    :return: (<np.array> id-indexed ranks, <int> # iterations required)
+    """
+    n_vertices = graph.n_vertices
+
+    # Graph structure: contributions are summed per target with `reduceat'
+    #   over the in-edges, sorted by target
+    out_degrees = graph.out_degrees
+    senders = out_degrees > 0
+    in_src = graph.csc_sources
+    has_in_edges = graph.in_degrees > 0
+    in_starts = graph.csc_offsets[:-1][has_in_edges]
+
+    # Init fixed-point constants
+    d = fp_scaled(d)
+    d_sum = fp_scaled(d_sum)
+    threshold = n_vertices * fp_scaled(tol)
+
+    # Iterate up to max_iter iterations
+    if rank_init is None:
+        x = np.full(n_vertices, FP_SCALE // n_vertices, dtype=np.int64)
+    else:
+        x = fp_scaled(rank_init)
+    pkt = np.zeros(n_vertices, dtype=np.int64)
+    for iter_no in range(max_iter):
+        x_last = x
+
+        # Exchange ranks, simulating the payload-lossy encoding of the
+        #   iteration (see in_messages_payload_format)
+        pkt[senders] = fp_div_count(x_last[senders], out_degrees[senders])
+        pkt &= PAYLOAD_MASK
+
+        x = np.zeros(n_vertices, dtype=np.int64)
+        if len(in_src):
+            x[has_in_edges] = np.add.reduceat(pkt[in_src], in_starts)
+
+        # Compute dangling factor
+        if d != FP_SCALE:
+            x = d_sum + fp_mul(d, x)
+
+        # Check convergence, l1 norm
+        err = np.abs(x - x_last).sum()
+        _logger.debug('[t=%04d] l1 error %d (threshold %d)', iter_no, err,
+                      threshold)
+        if err < threshold:
+            return fp_to_float(x), iter_no + 1  # iter t+1 happens at end of t
+
+    raise PageRankNoConvergence(max_iter)
@@ -0,0 +1,240 @@
+import numpy as np
+
+from page_rank.model.tools.graph import VERTEX_ID_DTYPE
+from page_rank.model.tools.spinnaker_emulator import CORES_PER_CHIP, \
+    MAX_ATOMS_PER_CORE
+
+# Label propagation rounds, and fraction of the vertices updated per round
+LABEL_PROPAGATION_ROUNDS = 10
+LABEL_PROPAGATION_UPDATE_RATE = .5
+
+# Cost of updating a vertex, relative to dispatching one incoming packet to it
+VERTEX_COST = 1.
+
+
+#
+# Private functions, internal helpers
+#
+
+def _undirected(graph):
+    """Both directions of every edge, without self-loops."""
+    not_loop = graph.src != graph.dst
+    src, dst = graph.src[not_loop], graph.dst[not_loop]
+    return np.concatenate((src, dst)), np.concatenate((dst, src))
+
+
+def _core_of_vertices(n_vertices, atoms_per_core, core_slices):
+    if core_slices is None:
+        return np.arange(n_vertices) // (atoms_per_core or MAX_ATOMS_PER_CORE)
+    return np.repeat(np.arange(len(core_slices) - 1), np.diff(core_slices))
+
+
+def _greedy_slices(cumulated_costs, max_load, max_atoms):
+    """Slice boundaries of the greedy in order packing, no slice being over
+    `max_load' nor `max_atoms', or None if a single vertex is over `max_load'.
+    """
+    n = len(cumulated_costs) - 1
+    slices = [0]
+    while slices[-1] < n:
+        lo = slices[-1]
+        hi = int(np.searchsorted(cumulated_costs,
+                                 cumulated_costs[lo] + max_load,
+                                 side='right')) - 1
+        hi = min(hi, lo + max_atoms, n)
+        if hi == lo:
+            return None
+        slices.append(hi)
+    return slices
+
+
+def _majority_labels(u, v, labels, n_vertices, rng):
+    """Most frequent label of the neighbours `u' of each vertex `v', ties
+    broken randomly, -1 for vertices without neighbour.
+    """
+    # Distinct (vertex, label) pairs and their number of occurrences
+    keys = np.sort(v.astype(np.int64) << 32 | labels[u])
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    count = np.diff(np.append(starts, len(keys)))
+    keys = keys[starts]
+    vertex, label = keys >> 32, keys & 0xffffffff
+
+    # Best label per vertex: highest count, then random
+    order = np.lexsort((rng.random_sample(len(keys)), -count, vertex))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = vertex[order][1:] != vertex[order][:-1]
+    best = np.full(n_vertices, -1, dtype=np.int64)
+    best[vertex[order][first]] = label[order][first]
+    return best
+
+
+#
+# Exposed functions
+#
+
+def rcm_order(graph):
+    """Reverse Cuthill-McKee ordering of the undirected graph: neighbours get
+    close ids, so that edges mostly stay within a core.
+
+    :return: <np.array> old vertex id of each new id
+    """
+    import scipy.sparse
+    from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+    u, v = _undirected(graph)
+    n = graph.n_vertices
+    adjacency = scipy.sparse.csr_matrix(
+        (np.ones(len(u), dtype=np.int8), (u, v)), shape=(n, n))
+    return reverse_cuthill_mckee(adjacency, symmetric_mode=True).astype(
+        VERTEX_ID_DTYPE)
+
+
+def label_propagation_order(graph, rounds=LABEL_PROPAGATION_ROUNDS, seed=0):
+    """Orders the vertices by community, found by label propagation on the
+    undirected graph: each round, a random half of the vertices adopt the
+    most frequent label of their neighbours.
+
+    :param rounds: number of rounds
+    :param seed: int seed or np.random.RandomState
+    :return: <np.array> old vertex id of each new id
+    """
+    rng = seed if isinstance(seed, np.random.RandomState) else \
+        np.random.RandomState(seed)
+    n = graph.n_vertices
+    u, v = _undirected(graph)
+    labels = np.arange(n, dtype=np.int64)
+    if not len(u):
+        return labels.astype(VERTEX_ID_DTYPE)
+
+    for _ in range(rounds):
+        best = _majority_labels(u, v, labels, n, rng)
+        update = (best >= 0) & \
+            (rng.random_sample(n) < LABEL_PROPAGATION_UPDATE_RATE)
+        if not (labels[update] != best[update]).any():
+            break
+        labels[update] = best[update]
+
+    return np.argsort(labels, kind='mergesort').astype(VERTEX_ID_DTYPE)
+
+
+VERTEX_ORDERS = {
+    'rcm': rcm_order,
+    'label_propagation': label_propagation_order,
+}
+
+
+def vertex_costs(graph):
+    """Predicted cost of each vertex on its core, per iteration: dispatching
+    its incoming packets, then updating its rank.
+
+    :return: <np.array> costs
+    """
+    return graph.in_degrees + VERTEX_COST
+
+
+def balanced_slices(graph, n_cores=None, max_atoms=MAX_ATOMS_PER_CORE):
+    """Slices the vertices in id order onto cores with about the same summed
+    `vertex_costs', rather than the same number of vertices.
+
+    The highest core cost is bisected, packing vertices greedily onto each
+    core without exceeding it nor `max_atoms', which also bounds the DTCM used.
+
+    :param n_cores: number of cores, default is the least needed with
+                    `max_atoms' vertices per core
+    :param max_atoms: max number of vertices per core
+    :return: <np.array> `n_cores + 1' slice boundaries, core `i' hosting
+             vertices [slices[i], slices[i + 1])
+    """
+    n = graph.n_vertices
+    max_atoms = min(max_atoms, MAX_ATOMS_PER_CORE)
+    if n_cores is None:
+        n_cores = -(-n // max_atoms)
+    if n_cores * max_atoms < n:
+        raise ValueError("Cannot fit %d vertices on %d cores of %d atoms." % (
+            n, n_cores, max_atoms))
+
+    # Bisection of the highest core cost
+    cumulated = np.concatenate(([0.], np.cumsum(vertex_costs(graph))))
+    lo, hi = 0., cumulated[-1]
+    slices = _greedy_slices(cumulated, hi, max_atoms)
+    while hi - lo > 1e-3 * hi:
+        mid = (lo + hi) / 2.
+        mid_slices = _greedy_slices(cumulated, mid, max_atoms)
+        if mid_slices is not None and len(mid_slices) <= n_cores + 1:
+            hi, slices = mid, mid_slices
+        else:
+            lo = mid
+
+    # Extra cores are left empty, and not used
+    slices += [n] * (n_cores + 1 - len(slices))
+    return np.array(slices, dtype=np.int64)
+
+
+def core_loads(graph, atoms_per_core=None, core_slices=None):
+    """Predicted cost of each core per iteration, see `vertex_costs'.
+
+    :return: <np.array> summed cost of the vertices of each core
+    """
+    core = _core_of_vertices(graph.n_vertices, atoms_per_core, core_slices)
+    n_cores = len(core_slices) - 1 if core_slices is not None else \
+        int(core[-1]) + 1 if len(core) else 0
+    return np.bincount(core, weights=vertex_costs(graph), minlength=n_cores)
+
+
+def load_report(predicted, actual=None):
+    """Compares the predicted per-core loads with the actual ones, e.g. the
+    packets dispatched on each core during the simulation.
+
+    :return: <dict> loads, and their imbalance: max / mean
+    """
+    report = dict(predicted=predicted,
+                  predicted_imbalance=predicted.max() / predicted.mean())
+    if actual is not None:
+        actual = np.asarray(actual, dtype=np.float64)
+        report.update(actual=actual,
+                      actual_imbalance=actual.max() / max(actual.mean(), 1.))
+    return report
+
+
+def traffic_report(graph, atoms_per_core=None, cores_per_chip=CORES_PER_CHIP,
+                   core_slices=None):
+    """Cut and multicast traffic of the graph, when its vertices are sliced in
+    id order onto cores of `atoms_per_core' vertices, or `core_slices' (see
+    `balanced_slices').
+
+    One packet is sent per iteration for each (source vertex, target core)
+    pair, and crosses chips if the target core is on another chip.
+
+    :return: <dict> `cut_edges' across cores, `chip_cut_edges' across chips,
+             `packets' and `chip_packets' (across chips) per iteration, and
+             `chip_in_packets' / `chip_out_packets' <np.array> per chip
+    """
+    core = _core_of_vertices(graph.n_vertices, atoms_per_core, core_slices)
+    chip = core // cores_per_chip
+    n_chips = int(chip[-1]) + 1 if graph.n_vertices else 0
+    src_core, dst_core = core[graph.src], core[graph.dst]
+    src_chip, dst_chip = chip[graph.src], chip[graph.dst]
+
+    packets = np.unique(graph.src.astype(np.int64) << 32 | dst_core)
+    chip_packets = np.unique(graph.src[src_chip != dst_chip].astype(
+        np.int64) << 32 | dst_chip[src_chip != dst_chip])
+    packet_src_chip = chip[chip_packets >> 32]
+    packet_dst_chip = chip_packets & 0xffffffff
+
+    return dict(
+        cut_edges=int(np.count_nonzero(src_core != dst_core)),
+        chip_cut_edges=int(np.count_nonzero(src_chip != dst_chip)),
+        packets=len(packets),
+        chip_packets=len(chip_packets),
+        chip_in_packets=np.bincount(packet_dst_chip, minlength=n_chips),
+        chip_out_packets=np.bincount(packet_src_chip, minlength=n_chips),
+    )
+
+
+def format_traffic_report(report, n_edges):
+    """One line summary of a `traffic_report'."""
+    return ('%d/%d edges across cores, %d across chips. Packets per '
+            'iteration: %d, %d across chips (max %d in / %d out of a chip)' % (
+                report['cut_edges'], n_edges, report['chip_cut_edges'],
+                report['packets'], report['chip_packets'],
+                report['chip_in_packets'].max(initial=0),
+                report['chip_out_packets'].max(initial=0)))
@@ -0,0 +1,152 @@
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Separator of the names of nested phases, e.g. `build.projections'
+PHASE_SEPARATOR = '.'
+
+
+#
+# Private functions, internal helpers
+#
+
+def _cpu_time():
+    """User and system CPU time of this process, in seconds."""
+    try:
+        return time.process_time()
+    except AttributeError:  # Python 2
+        times = os.times()
+        return times[0] + times[1]
+
+
+def _peak_rss():
+    """Peak resident set size of this process so far, in bytes, or None if
+    not reported by the platform."""
+    try:
+        import resource
+    except ImportError:  # e.g. Windows
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, in KiB on Linux
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _new_phase(name):
+    return OrderedDict([('name', name), ('calls', 0), ('wall_time', 0.),
+                        ('cpu_time', 0.), ('peak_rss', None),
+                        ('rss_increase', None)])
+
+
+#
+# Exposed functions
+#
+
+class PhaseProfiler(object):
+    """Wall time, CPU time and peak RSS of the phases of a computation.
+
+    Phases are timed with `phase', nested ones being named after their
+    parents, e.g. `build.projections'. Phases of the same name are
+    accumulated, e.g. each chunk of iterations run until convergence.
+    """
+
+    def __init__(self, enabled=True):
+        """
+        :param enabled: record the phases, or only run them
+        """
+        self._enabled = enabled
+        self._phases = OrderedDict()
+        self._stack = []
+
+    def reset(self):
+        """Forgets the phases recorded so far."""
+        self._phases = OrderedDict()
+
+    @contextmanager
+    def phase(self, name):
+        """Records the time and memory spent in the block, as phase `name'
+        of the enclosing one."""
+        if not self._enabled:
+            yield
+            return
+
+        self._stack.append(name)
+        full_name = PHASE_SEPARATOR.join(self._stack)
+        # Inserted at start, so that phases are listed in call order
+        phase = self._phases.setdefault(full_name, _new_phase(full_name))
+
+        rss = _peak_rss()
+        wall, cpu = time.time(), _cpu_time()
+        try:
+            yield
+        finally:
+            phase['calls'] += 1
+            phase['wall_time'] += time.time() - wall
+            phase['cpu_time'] += _cpu_time() - cpu
+            peak = _peak_rss()
+            if peak is not None:
+                phase['peak_rss'] = max(phase['peak_rss'] or 0, peak)
+                phase['rss_increase'] = (phase['rss_increase'] or 0) + \
+                    peak - rss
+            self._stack.pop()
+
+    def add(self, name, wall_time, **values):
+        """Records a phase timed by another component, e.g. the simulator,
+        as phase `name' of the enclosing one.
+
+        :param wall_time: time spent in the phase, in seconds
+        """
+        if not self._enabled:
+            return
+
+        full_name = PHASE_SEPARATOR.join(self._stack + [name])
+        phase = self._phases.setdefault(full_name, _new_phase(full_name))
+        phase['calls'] += 1
+        phase['wall_time'] += wall_time
+        phase.update(values)
+
+    def report(self, **metadata):
+        """Phases recorded so far, JSON serializable.
+
+        :param metadata: values describing the computation, e.g. its graph
+                         size, added to the report
+        :return: <dict> `phases', list of <dict> `name', `calls',
+                 `wall_time' and `cpu_time' in seconds, process `peak_rss'
+                 at the end of the phase and `rss_increase' during it in
+                 bytes; `wall_time' and `cpu_time' of the top-level phases
+        """
+        phases = [dict(phase) for phase in self._phases.values()]
+        top_level = [phase for phase in phases
+                     if PHASE_SEPARATOR not in phase['name']]
+
+        report = dict(metadata)
+        report.update(
+            timestamp=time.time(), phases=phases,
+            wall_time=sum(phase['wall_time'] for phase in top_level),
+            cpu_time=sum(phase['cpu_time'] for phase in top_level),
+            peak_rss=_peak_rss())
+        return report
+
+
+def append_metrics(path, report):
+    """Appends a report to a metrics file, one JSON object per line.
+
+    :param path: path of the file, created if needed
+    :param report: <dict> JSON serializable report, see
+                   `PhaseProfiler.report'
+    :return: None
+    """
+    with open(path, 'a') as f:
+        f.write(json.dumps(report, sort_keys=True) + '\n')
+
+
+def read_metrics(path):
+    """Reports appended to a metrics file by `append_metrics'.
+
+    :return: [<dict>] reports, in order
+    """
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
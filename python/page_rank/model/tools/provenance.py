@@ -0,0 +1,183 @@
+import re
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+# Router items summed over the machine by default, see
+#   SpiNNakerAdapterInterface.extract_router_provenance
+DEFAULT_ROUTER_PROVENANCE_NAMES = [
+    'total_multi_cast_sent_packets',
+    'total_created_packets',
+    'total_dropped_packets',
+    'total_missed_dropped_packets',
+    'total_lost_dropped_packets'
+]
+
+# Columns of the router table, and the item of each chip they are read from,
+#   see RouterProvenanceGatherer
+ROUTER_METRICS = OrderedDict([
+    ('local_multicast_packets', 'Local_Multicast_Packets'),
+    ('external_multicast_packets', 'External_Multicast_Packets'),
+    ('dropped_multicast_packets', 'Dropped_Multicast_Packets'),
+    ('missed_dropped_packets', 'Missed_For_Reinjection'),
+    ('dumped_from_a_processor', 'Dumped_from_a_processor'),
+])
+ROUTER_LOCATION = ('x', 'y')
+
+# Columns of the core table, and the item of each core they are read from:
+#   extra_provenance_data_region_entries of c_models/src/neuron/c_main.c, as
+#   named by sPyNNaker, and the timer overruns counted by the simulation
+CORE_METRICS = OrderedDict([
+    ('pre_synaptic_events', 'Total_pre_synaptic_events'),
+    ('input_buffer_overflows', 'Times_the_input_buffer_lost_packets'),
+    ('timer_tick', 'Last_timer_tic_the_core_ran_to'),
+    ('timer_overruns', 'Times_the_timer_tic_over_ran'),
+])
+CORE_LOCATION = ('x', 'y', 'p')
+
+# Counters of the router and core tables reported as warnings when non-zero,
+#   with the kind of warning
+WARNING_METRICS = OrderedDict([
+    ('dropped_multicast_packets', 'dropped_packets'),
+    ('input_buffer_overflows', 'buffer_overflows'),
+    ('timer_overruns', 'timer_overruns'),
+])
+
+# Warning of `count' events of a `kind' of WARNING_METRICS, at the chip
+#   (x, y) or core (x, y, p) `location'
+ProvenanceWarning = namedtuple('ProvenanceWarning', 'kind location count')
+
+# Router items are named after their chip, e.g. `router_at_chip_0_1'
+_ROUTER_NAME = re.compile(r'router_at_chip_(\d+)_(\d+)$')
+
+
+#
+# Private functions, internal helpers
+#
+
+def _top_rows(table, values, n):
+    """The `n' rows of `table' with the highest `values', highest first."""
+    order = np.argsort(-values, kind='mergesort')[:n]
+    return table[order]
+
+
+#
+# Exposed functions
+#
+
+def provenance_table(rows, location, metrics):
+    """Tabulates per-location provenance counters.
+
+    :param rows: [(<tuple> location, <dict> counters of the location)], a
+                 location appearing more than once being summed
+    :param location: names of the location columns, e.g. CORE_LOCATION
+    :param metrics: names of the counter columns, missing counters being 0
+    :return: <np.array> structured array, one row per location in order,
+             with the `location' and `metrics' columns
+    """
+    dtype = [(name, np.int64) for name in list(location) + list(metrics)]
+    values = OrderedDict()
+    for loc, counters in rows:
+        acc = values.setdefault(tuple(loc), [0] * len(metrics))
+        for i, name in enumerate(metrics):
+            acc[i] += int(counters.get(name, 0))
+
+    table = np.array([loc + tuple(acc) for loc, acc in values.items()],
+                     dtype=dtype)
+    return np.sort(table, order=list(location))
+
+
+def router_table(items):
+    """Router table of the provenance items of RouterProvenanceGatherer.
+
+    :param items: [<ProvenanceDataItem>] items, the ones not named after a
+                  chip, e.g. machine totals, being ignored
+    :return: <np.array> table of ROUTER_LOCATION and ROUTER_METRICS, see
+             `provenance_table'
+    """
+    columns = {name: column for column, name in ROUTER_METRICS.items()}
+    rows = []
+    for item in items:
+        match = len(item.names) > 1 and _ROUTER_NAME.match(item.names[-2])
+        if match and item.names[-1] in columns:
+            rows.append((tuple(int(v) for v in match.groups()),
+                         {columns[item.names[-1]]: item.value}))
+    return provenance_table(rows, ROUTER_LOCATION, list(ROUTER_METRICS))
+
+
+def core_table(items_by_placement):
+    """Core table of the provenance items of each placed vertex.
+
+    :param items_by_placement: [(<Placement> placement, [<ProvenanceDataItem>]
+                               items read from its core)]
+    :return: <np.array> table of CORE_LOCATION and CORE_METRICS, see
+             `provenance_table'
+    """
+    columns = {name: column for column, name in CORE_METRICS.items()}
+    return provenance_table(
+        [((placement.x, placement.y, placement.p),
+          {columns[item.names[-1]]: item.value for item in items
+           if item.names[-1] in columns})
+         for placement, items in items_by_placement],
+        CORE_LOCATION, list(CORE_METRICS))
+
+
+def sum_items(items, collect_names):
+    """Sums provenance items by name, over all chips and cores.
+
+    :param items: [<ProvenanceDataItem>] items
+    :param collect_names: [<str>] last part of the names of the items to sum
+    :return: <dict> name-indexed sums
+    """
+    res = dict().fromkeys(collect_names, 0)
+    for item in items:
+        name = item.names[-1]
+        if name in res:
+            res[name] += int(item.value)
+    return res
+
+
+def hottest_routers(routers, n=10):
+    """Routers handling the most multicast packets, the first candidates for
+    dropping packets when lowering the time_scale_factor.
+
+    :param routers: <np.array> router table, see `router_table'
+    :param n: number of routers
+    :return: <np.array> the `n' rows of the hottest routers, hottest first
+    """
+    return _top_rows(routers, routers['local_multicast_packets'] +
+                     routers['external_multicast_packets'], n)
+
+
+def most_overflowing_cores(cores, n=10):
+    """Cores whose input buffer lost the most packets, i.e. could not keep up
+    with the packets received within their timer ticks.
+
+    :param cores: <np.array> core table, see `core_table'
+    :param n: number of cores
+    :return: <np.array> the rows of up to `n' cores with overflows, most
+             overflowing first
+    """
+    overflowing = cores[cores['input_buffer_overflows'] > 0]
+    return _top_rows(overflowing, overflowing['input_buffer_overflows'], n)
+
+
+def provenance_warnings(routers, cores):
+    """Warnings of the counters of WARNING_METRICS, for each router or core
+    where they are non-zero.
+
+    :param routers: <np.array> router table, see `router_table'
+    :param cores: <np.array> core table, see `core_table'
+    :return: [<ProvenanceWarning>] warnings, by kind then location
+    """
+    warnings = []
+    for metric, kind in WARNING_METRICS.items():
+        for table, location in [(routers, ROUTER_LOCATION),
+                                (cores, CORE_LOCATION)]:
+            if metric not in table.dtype.names:
+                continue
+            for row in table[table[metric] > 0]:
+                warnings.append(ProvenanceWarning(
+                    kind, tuple(int(row[name]) for name in location),
+                    int(row[metric])))
+    return warnings
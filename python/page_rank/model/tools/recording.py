@@ -0,0 +1,184 @@
+import numbers
+
+import numpy as np
+
+# Ticks the ranks are recorded at, see recording_modes in
+#   c_models/src/neuron/vertex.c: the index of each mode is its C value
+RECORDING_MODES = ('all', 'iterations', 'interval', 'final', 'changed')
+
+# Modes the rank of every tick can be reconstructed from, as ranks only
+#   change when an iteration starts
+LOSSLESS_MODES = ('all', 'iterations', 'changed')
+
+_WORD_BITS = 32
+
+
+#
+# Private functions, internal helpers
+#
+
+def _bitmap_words(n_vertices):
+    return -(-n_vertices // _WORD_BITS)
+
+
+def _decode_changed_records(words, n_vertices):
+    """Records of RECORD_CHANGED: time, bitmap of the vertices whose rank
+    changed since the previous record, then their ranks. Each record is
+    completed with the ranks of the previous ones.
+    """
+    n_words = _bitmap_words(n_vertices)
+    bit = np.arange(_WORD_BITS, dtype=np.uint32)
+
+    times, rows = [], []
+    states = np.zeros(n_vertices, dtype=np.uint32)
+    offset = 0
+    while offset < len(words):
+        bitmap = words[offset + 1:offset + 1 + n_words]
+        changed = ((bitmap[:, None] >> bit) & 1).astype(bool).ravel()[
+            :n_vertices]
+        n_changed = np.count_nonzero(changed)
+
+        start = offset + 1 + n_words
+        states = states.copy()
+        states[changed] = words[start:start + n_changed]
+        times.append(words[offset])
+        rows.append(states)
+        offset = start + n_changed
+
+    return (np.array(times, dtype=np.int64),
+            np.array(rows, dtype=np.uint32).reshape(-1, n_vertices))
+
+
+#
+# Exposed functions
+#
+
+def as_recording_policy(policy):
+    """Recording policy of the ranks, as (<str> mode, <int> interval).
+
+    The ranks of each core are recorded at:
+     - None or 'all': every tick
+     - 'iterations': the ticks starting an iteration
+     - <int> N, or ('interval', N): the ticks starting every N-th iteration
+     - 'final': none but the last tick of each run
+     - 'changed': the ticks some rank changed at, only the changed ones
+    and always at the last tick of each run.
+
+    :return: (<str> mode, <int> iterations between records of `interval')
+    """
+    if policy is None:
+        return 'all', 1
+    if isinstance(policy, numbers.Integral):
+        mode, interval = 'interval', policy
+    elif isinstance(policy, tuple):
+        mode, interval = policy
+    else:
+        mode, interval = policy, 1
+
+    if mode not in RECORDING_MODES:
+        raise ValueError('Unknown recording policy %r, expected one of %s.' %
+                         (mode, ', '.join(RECORDING_MODES)))
+    if interval < 1:
+        raise ValueError('Recording interval must be at least 1, got %d.' %
+                         interval)
+    return mode, int(interval)
+
+
+def is_lossless(policy):
+    """Whether the rank of every tick can be reconstructed."""
+    return as_recording_policy(policy)[0] in LOSSLESS_MODES
+
+
+def encode_ranks_record(time, states, changed=None):
+    """Record of a core, as written by `vertex_do_timestep_update': its
+    `timed_state_t', or with RECORD_CHANGED the time, bitmap of the `changed'
+    vertices and their ranks.
+
+    :param time: tick
+    :param states: <np.array> u0.32 ranks of the vertices of the core
+    :param changed: <np.array> mask of the changed vertices, RECORD_CHANGED
+    :return: <bytes> record
+    """
+    if changed is None:
+        return np.concatenate(([time], states)).astype('<u4').tobytes()
+
+    n = len(states)
+    padded = np.zeros(_bitmap_words(n) * _WORD_BITS, dtype=np.uint64)
+    padded[:n] = changed
+    bitmap = (padded.reshape(-1, _WORD_BITS) <<
+              np.arange(_WORD_BITS, dtype=np.uint64)).sum(axis=1)
+    return np.concatenate(([time], bitmap, states[changed])).astype(
+        '<u4').tobytes()
+
+
+def decode_ranks_records(data, n_vertices, policy=None):
+    """Records of a core, as written with the recording `policy'.
+
+    :param data: <buffer> recorded bytes
+    :param n_vertices: number of vertices of the core
+    :return: (<np.array> tick of each record, <np.array> (records x
+              vertices) u0.32 ranks as uint32)
+    """
+    words = np.frombuffer(data, dtype='<u4')
+    if as_recording_policy(policy)[0] == 'changed':
+        return _decode_changed_records(words, n_vertices)
+
+    rows = words.reshape(-1, n_vertices + 1)
+    return rows[:, 0].astype(np.int64), rows[:, 1:]
+
+
+def ranks_from_records(recordings, n_ticks=None, n_vertices=None, raw=False,
+                       policy=None):
+    """Assembles the ranks recorded by each core with the recording `policy'
+    into one row per tick.
+
+    With a lossless policy, ticks not recorded repeat the ranks of the last
+    one recorded. Otherwise, ranks not recorded are NaN, or 0 if `raw'.
+
+    :param recordings: list of (<int> first vertex id, <int> number of
+                       vertices, <buffer> recorded bytes), one per core
+    :param n_ticks: number of ticks to extract, default is up to the last one
+                    recorded by every core
+    :param n_vertices: total number of vertices, default is the last one
+                       recorded
+    :param raw: return the fixed-point ranks as uint32 instead of float64
+    :return: <np.array> (ticks x vertices) ranks
+    """
+    from page_rank.model.tools.page_rank_engine import FP_SCALE
+
+    records = [(lo, n, decode_ranks_records(data, n, policy))
+               for lo, n, data in recordings]
+    if n_ticks is None:
+        n_ticks = min(int(times[-1]) + 1 if len(times) else 0
+                      for _, _, (times, _) in records) if records else 0
+    if n_vertices is None:
+        n_vertices = max(lo + n for lo, n, _ in records) if records else 0
+
+    ranks = np.zeros((n_ticks, n_vertices), dtype=np.uint32) if raw else \
+        np.full((n_ticks, n_vertices), np.nan)
+    lossless = is_lossless(policy)
+    for lo, n, (times, states) in records:
+        if lossless:
+            # Last record at or before each tick
+            last = np.searchsorted(times, np.arange(n_ticks), side='right') - 1
+            ticks = np.flatnonzero(last >= 0)
+            states = states[last[ticks]]
+        else:
+            recorded = times < n_ticks
+            ticks, states = times[recorded], states[recorded]
+
+        if raw:
+            ranks[ticks, lo:lo + n] = states
+        else:
+            ranks[ticks, lo:lo + n] = states / float(FP_SCALE)
+    return ranks
+
+
+def recorded_ticks(ranks):
+    """Ticks whose rank of every vertex was recorded, see
+    `ranks_from_records'.
+
+    :param ranks: <np.array> (ticks x vertices) float ranks
+    :return: <np.array> ticks
+    """
+    return np.flatnonzero(~np.isnan(ranks).any(axis=1))
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from page_rank.model.tools.utils import getLogger, get_cache_dir
+
+# Entries of the results cache, in the cache directory
+RESULTS_DIR = 'results'
+RESULT_FILE_EXT = '.npz'
+
+# Bound of the total size of the entries, least recently used ones are evicted
+DEFAULT_MAX_BYTES = 1 << 30
+
+_logger = getLogger(__name__)
+
+
+#
+# Exposed functions
+#
+
+def graph_fingerprint(graph):
+    """Hash of the edges of a graph, independent of its labels.
+
+    :param graph: <PageRankGraph> graph
+    :return: <str> hex digest
+    """
+    sha1 = hashlib.sha1(str(graph.n_vertices).encode())
+    for a in (graph.src, graph.dst):
+        sha1.update(np.ascontiguousarray(a, dtype='<i4').data)
+    return sha1.hexdigest()
+
+
+def cache_key(fingerprint, **params):
+    """Key of a result, computed on a graph with some parameters.
+
+    :param fingerprint: <str> graph fingerprint, see `graph_fingerprint'
+    :param params: JSON serializable parameters the result depends on
+    :return: <str> hex digest
+    """
+    return hashlib.sha1('{}:{}'.format(fingerprint, json.dumps(
+        params, sort_keys=True)).encode()).hexdigest()
+
+
+class ResultCache(object):
+    """Content-addressed cache of results, e.g. tuned time_scale_factors and
+    reference ranks, keyed by `cache_key'.
+
+    Each entry is a .npz file of named arrays and scalars, written aside then
+    renamed so that concurrent processes can share the cache. Reading an entry
+    marks it as recently used: once the entries exceed `max_bytes', the least
+    recently used ones are removed.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        """Opens the cache, creating its directory if needed.
+
+        :param cache_dir: directory of the entries, default is RESULTS_DIR of
+                          `get_cache_dir'
+        :param max_bytes: bound of the total size of the entries
+        """
+        self._dir = cache_dir or os.path.join(get_cache_dir(), RESULTS_DIR)
+        self._max_bytes = max_bytes
+        try:
+            os.makedirs(self._dir)
+        except OSError:
+            # Already exists, possibly created by a concurrent process
+            if not os.path.isdir(self._dir):
+                raise
+
+    def _path(self, key):
+        return os.path.join(self._dir, key + RESULT_FILE_EXT)
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self._dir):
+            if not name.endswith(RESULT_FILE_EXT):
+                continue
+            try:
+                stat = os.stat(os.path.join(self._dir, name))
+            except OSError:
+                continue  # Removed by a concurrent process
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self._max_bytes:
+                break
+            _logger.debug('Evicting cached result %s', name)
+            try:
+                os.remove(os.path.join(self._dir, name))
+            except OSError:
+                pass
+            total -= size
+
+    def get(self, key):
+        """:return: <dict> values of the entry, or None if not cached"""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                values = {name: data[name] for name in data.files}
+            os.utime(path, None)
+        except (IOError, OSError):
+            return None
+
+        return {name: v.item() if v.ndim == 0 else v
+                for name, v in values.items()}
+
+    def put(self, key, **values):
+        """Stores the values of an entry, replacing any previous one.
+
+        :param values: scalars or arrays, by name
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self._dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **values)
+        os.rename(tmp_path, self._path(key))
+        self._evict()
@@ -1,14 +1,30 @@
+import hashlib
+import os
 import sys
+import time
 import logging
+from functools import wraps
 import matplotlib.pyplot as plt
 
 import networkx as nx
 import numpy as np
 
 from page_rank.model.tools.utils import FailedOnWarningError, \
-    graph_visualiser, to_fp, getLogger, silence_output, node_formatter, \
-    format_ranks_string, compute_page_rank
-from page_rank.model.tools.spinnaker_adapter import SpiNNakerAdapter
+    InvalidGraphError, graph_visualiser, to_fp, getLogger, silence_output, \
+    node_formatter, format_ranks_string, compute_page_rank
+from page_rank.model.tools.graph import PageRankGraph
+from page_rank.model.tools.live_ranks import LiveRanksReceiver
+from page_rank.model.tools.profiling import PhaseProfiler, append_metrics
+from page_rank.model.tools.recording import as_recording_policy, \
+    is_lossless, recorded_ticks
+from page_rank.model.tools.partitioning import VERTEX_ORDERS, \
+    balanced_slices, core_loads, format_traffic_report, load_report, \
+    traffic_report
+from page_rank.model.tools.spinnaker_emulator import MAX_ATOMS_PER_CORE
+from page_rank.model.tools.page_rank_engine import fp_scaled, fp_to_float, \
+    compute_page_rank as compute_page_rank_vectorized
+from page_rank.model.tools.result_cache import ResultCache, cache_key, \
+    graph_fingerprint
 
 FLOAT_PRECISION = 5
 TOL = 10 ** (-FLOAT_PRECISION)
@@ -27,51 +43,138 @@ DEFAULT_SPYNNAKER_PARAMS = {
     'max_delay': .1,  # ms
 }
 
+# Backend used when no adapter is given, either 'spinnaker' or 'emulator'
+BACKEND_ENV_VAR = 'PAGE_RANK_BACKEND'
+
+# Number of offending edges / vertices listed in validation errors
+MAX_REPORTED_OFFENDERS = 10
+
 
 #
 # Main simulation interface
 #
 
-def _gen_labels(edges):
-    return map(str, set([s for s, _ in edges] + [t for _, t in edges]))
+def _format_offenders(offenders, count):
+    fmt = ', '.join(map(str, offenders))
+    return fmt + (', ...' if count > len(offenders) else '')
 
 
-def _gen_sim_vertices(labels):
-    return list(range(len(labels)))
+def _get_default_adapter():
+    # Imported lazily, so the emulator runs without sPyNNaker installed
+    backend = os.environ.get(BACKEND_ENV_VAR, 'spinnaker')
+    if backend == 'emulator':
+        from page_rank.model.tools.spinnaker_emulator import \
+            SpiNNakerEmulatorAdapter
+        return SpiNNakerEmulatorAdapter()
+    if backend == 'spinnaker':
+        from page_rank.model.tools.spinnaker_adapter import SpiNNakerAdapter
+        return SpiNNakerAdapter()
+    raise ValueError("Unknown %s '%s', expected 'spinnaker' or 'emulator'." % (
+        BACKEND_ENV_VAR, backend))
 
 
-def _gen_sim_edges(edges, labels, sim_vertices):
-    labels_to_ids = dict(zip(labels, sim_vertices))
-    return [(labels_to_ids[src], labels_to_ids[tgt]) for src, tgt in edges]
+def _validate_damping(damping):
+    # Ensure damping factor has a valid range
+    if not (0 <= damping < 1):
+        raise ValueError("Damping factor '%.02f' not in [0,1)." % damping)
+
 
+def _validate_graph_structure(graph, damping):
+    labels = graph.labels
 
-def _validate_graph_structure(edges, labels, damping):
     # Ensure to duplicate edges
-    size_diff = len(edges) - len(set(edges))
-    if size_diff != 0:
-        raise ValueError("Found %d forbidden duplicate edges." % size_diff)
+    duplicates = graph.duplicate_edges()
+    if len(duplicates):
+        raise InvalidGraphError(
+            "Found %d forbidden duplicate edges: %s." % (
+                len(duplicates), _format_offenders([
+                    (labels[graph.src[i]], labels[graph.dst[i]])
+                    for i in duplicates[:MAX_REPORTED_OFFENDERS]],
+                    len(duplicates))),
+            duplicate_edges=duplicates,
+            dangling_vertices=graph.dangling_vertices())
 
     # Ensure all nodes connected (no dangling nodes)
-    if labels:
-        size_diff = len(labels) - len(_gen_labels(edges))
-        if size_diff != 0:
-            raise ValueError("Found %d dangling nodes (extra 'labels' "
-                             "not used in 'edges')." % size_diff)
-
-    # Ensure damping factor has a valid range
-    if not (0 <= damping < 1):
-        raise ValueError("Damping factor '%.02f' not in [0,1)." % damping)
+    dangling = graph.dangling_vertices()
+    if len(dangling):
+        raise InvalidGraphError(
+            "Found %d dangling nodes (extra 'labels' not used in 'edges'): "
+            "%s." % (len(dangling), _format_offenders([
+                labels[i] for i in dangling[:MAX_REPORTED_OFFENDERS]],
+                len(dangling))),
+            dangling_vertices=dangling)
+
+    _validate_damping(damping)
+
+
+def _digest(values):
+    """Hash of a float array, for the result cache keys."""
+    return hashlib.sha1(np.ascontiguousarray(values, dtype='<f8').data
+                        ).hexdigest()
+
+
+def _as_teleport(teleport, labels):
+    """Teleport probabilities of the vertices, in vertex id order.
+
+    :param teleport: None for uniform, weight of each vertex in id order, or
+                     <dict> label-indexed weights, missing labels weighing 0
+    :return: <np.array> probabilities summing to 1, or None if uniform
+    """
+    if teleport is None:
+        return None
+
+    n_vertices = len(labels)
+    if isinstance(teleport, dict):
+        ids = {label: i for i, label in enumerate(labels)}
+        unknown = [label for label in teleport if label not in ids]
+        if unknown:
+            raise ValueError("Unknown teleport labels: %s." % _format_offenders(
+                unknown[:MAX_REPORTED_OFFENDERS], len(unknown)))
+        weights = np.zeros(n_vertices)
+        weights[[ids[label] for label in teleport]] = list(teleport.values())
+    else:
+        weights = np.array(teleport, dtype=np.float64)
+
+    if weights.shape != (n_vertices,):
+        raise ValueError("Expected %d teleport weights, got shape %s." % (
+            n_vertices, weights.shape))
+    if not (weights >= 0).all() or not weights.sum() > 0:
+        raise ValueError("Teleport weights must be non-negative, and not all "
+                         "zero.")
+    return weights / weights.sum()
+
+
+def _profiled(method):
+    """Profiles the phases of an exposed run method of PageRankSimulation,
+    unless called by another one, saving them as its `profile'."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._profiling:
+            return method(self, *args, **kwargs)
+
+        self._profiler.reset()
+        self._profiling = True
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._profiling = False
+            self._save_profile(method.__name__)
+    return wrapper
 
 
 class PageRankSimulation:
 
     def __init__(self, run_time, edges, labels=None, parameters=None,
                  damping=.85, log_level=logging.INFO, pause=False,
-                 fail_on_warning=False, spinnaker_adapter=SpiNNakerAdapter()):
+                 fail_on_warning=False, spinnaker_adapter=None,
+                 use_cache=True, vertex_order=None, teleport=None,
+                 recording_policy=None, metrics_file=None):
         """Creates an object to define, run and inspect a Page Rank simulation.
 
         :param run_time: time to run the computation for
-        :param edges: list of edges
+        :param edges: list of edges, as label tuples, (n_edges, 2) array of
+                      vertex ids, scipy.sparse adjacency matrix, PageRankGraph
+                      or path of a graph file (see graph_file.save_graph)
         :param labels: labels of the nodes
         :param parameters: sPyNNaker setup() parameters
         :param damping: damping factor in Page Rank
@@ -82,29 +185,76 @@ class PageRankSimulation:
                       (see SpiNNakerManchester/spinnaker_tools)
 
         :param fail_on_warning: throw an exception if simulation throws warnings
-        :param spinnaker_adapter: adapter to interact with the neural model
+        :param spinnaker_adapter: adapter to interact with the neural model,
+                                  default is given by $PAGE_RANK_BACKEND
+        :param use_cache: reuse the reference ranks of identical graphs, see
+                          result_cache.ResultCache
+        :param vertex_order: renumbering of the vertices before mapping them
+                             in order onto the cores, to keep edges within
+                             cores: name of one of partitioning.VERTEX_ORDERS
+                             or old vertex id of each new id. Ranks are still
+                             reported in input order.
+        :param teleport: personalized Page Rank, where the random surfer
+                         teleports to the vertices following these weights
+                         rather than uniformly: weight of each vertex in id
+                         order, or label-indexed <dict>. See `_as_teleport'.
+        :param recording_policy: ticks the ranks are recorded at on the
+                                 machine, default is every tick: see
+                                 recording.as_recording_policy. Ranks not
+                                 recorded are repeated from the last ones,
+                                 or NaN with a lossy policy.
+        :param metrics_file: path of a file to append the `profile' of each
+                             run to, as a line of JSON. See
+                             profiling.append_metrics.
         """
-        _validate_graph_structure(edges, labels, damping)
+        self._graph = PageRankGraph.from_input(edges, labels)
+        _validate_graph_structure(self._graph, damping)
 
         # Simulation parameters
         self._run_time = run_time
-        self._edges = edges
-        self._labels = labels or _gen_labels(self._edges)
-        self._sim_vertices = _gen_sim_vertices(self._labels)
-        self._sim_edges = _gen_sim_edges(self._edges, self._labels,
-                                              self._sim_vertices)
+        self._labels = self._graph.labels
+
+        # Graph as mapped, and new id of each vertex to translate ranks back
+        self._mapped_graph = self._graph
+        self._vertex_order = None
+        self._rank_order = None
+        if vertex_order is not None:
+            if isinstance(vertex_order, (str, type(u''))):
+                vertex_order = VERTEX_ORDERS[vertex_order](self._graph)
+            self._vertex_order = np.asarray(vertex_order)
+            self._mapped_graph = self._graph.permuted(vertex_order)
+            self._rank_order = np.empty(self._graph.n_vertices, dtype=np.intp)
+            self._rank_order[vertex_order] = np.arange(self._graph.n_vertices)
         self._parameters = DEFAULT_SPYNNAKER_PARAMS
         self._parameters.update(parameters or {})
         self._damping = damping
+        self._teleport = _as_teleport(teleport, self._labels)
+        self._recording_policy = as_recording_policy(recording_policy)
+        self._rank_init = None
         self._pause = pause
         self._fail_on_warning = fail_on_warning
-        self._spinnaker_adapter = spinnaker_adapter
+        self._use_cache = use_cache
+        self._spinnaker_adapter = spinnaker_adapter or _get_default_adapter()
+        self._metrics_file = metrics_file
+
+        # Time and memory spent in each phase of the runs, and in those of
+        #   the adapter
+        self._profiler = PhaseProfiler()
+        self._spinnaker_adapter.set_profiler(self._profiler)
+        self._profile = None
+        self._profiling = False
 
         # Simulation state variables
         self._sim_ranks = None
         self._sim_convergence = None
+        self._sim_errors = None
+        self._sim_vertex_convergence = None
         self._input_networkx_repr = None
         self._simulation_has_ran = False
+        self._convergence_report = None
+        self._live_receivers = []
+        self._atoms_per_core = None
+        self._core_slices = None
 
         # Numpy printing with some precision and no scientific notation
         np.set_printoptions(suppress=True, precision=FLOAT_PRECISION)
@@ -116,15 +266,19 @@ class PageRankSimulation:
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        for receiver in self._live_receivers:
+            receiver.close()
+
         if exc_type is None:
             if self._pause:
                 raw_input('Press any key to finish...')
 
-            if self._fail_on_warning:
-                if self._spinnaker_adapter.has_provenance_warnings():
-                    raise FailedOnWarningError()
-            else:
-                self._spinnaker_adapter.simulation_teardown()
+            # Provenance is read before the simulation is torn down
+            has_warnings = self._fail_on_warning and \
+                self._spinnaker_adapter.has_provenance_warnings()
+            self._spinnaker_adapter.simulation_teardown()
+            if has_warnings:
+                raise FailedOnWarningError()
         # else, exception is cascaded if there is one...
         #   simulation_teardown() not executed, fails on sPyNNaker runtime error
 
@@ -132,22 +286,60 @@ class PageRankSimulation:
     # Private functions, internal helpers
     #
 
+    def _save_profile(self, name):
+        """Saves the phases of the run method `name' as the `profile', and
+        appends it to the metrics file if any."""
+        self._profile = self._profiler.report(
+            call=name, backend=type(self._spinnaker_adapter).__name__,
+            n_vertices=self._graph.n_vertices, n_edges=self._graph.n_edges,
+            run_time=self._run_time, timestep=self._parameters['timestep'],
+            time_scale_factor=self._parameters['time_scale_factor'])
+        if self._metrics_file is not None:
+            append_metrics(self._metrics_file, self._profile)
+
     def _get_damping_factor(self):
         # Ensures float is encoded in fixed-point without precision loss
         return float(to_fp(self._damping))
 
     def _get_damping_sum(self):
         # Ensures float is encoded in fixed-point without precision loss
-        return float(to_fp((1. - self._damping) / len(self._labels)))
+        return float(to_fp((1. - self._damping) / self._graph.n_vertices))
+
+    def _get_teleport(self, mapped=False):
+        """Teleport term of the rank update: the damping sum if uniform, or
+        that of each vertex, in input or `mapped' vertex order.
+        """
+        if self._teleport is None:
+            return self._get_damping_sum()
+
+        teleport = self._teleport
+        if mapped and self._vertex_order is not None:
+            teleport = teleport[self._vertex_order]
+        # Ensures floats are encoded in fixed-point without precision loss
+        return fp_to_float(fp_scaled((1. - self._damping) * teleport))
+
+    def _get_rank_init(self, mapped=False):
+        """Initial ranks to warm start from, in input or `mapped' vertex
+        order, or None to start from uniform ranks.
+        """
+        if self._rank_init is None or not mapped or \
+                self._vertex_order is None:
+            return self._rank_init
+        return self._rank_init[self._vertex_order]
+
+    def _get_page_rank_kwargs(self):
+        kwargs = dict(
+            damping_factor=self._get_damping_factor(),
+            teleport=self._get_teleport(mapped=True)
+        )
+        if self._rank_init is not None:
+            kwargs['rank_init'] = self._get_rank_init(mapped=True)
+        return kwargs
 
     def _init_networkx_repr(self):
         if self._input_networkx_repr is None:
-            # Graph structure
-            g = nx.Graph().to_directed()
-            g.add_edges_from(self._edges)
-
             # Save graph for Page Rank python computations
-            self._input_networkx_repr = g
+            self._input_networkx_repr = self._graph.to_networkx()
         return self._input_networkx_repr
 
     def _extract_sim_ranks(self):
@@ -159,27 +351,154 @@ class PageRankSimulation:
             raise RuntimeError('You first need to .run(...) the simulation.')
 
         if self._sim_ranks is None:
-            ranks = self._spinnaker_adapter.extract_ranks()
+            with self._profiler.phase('extract'):
+                ranks = self._spinnaker_adapter.extract_ranks()
+                if self._rank_order is not None:
+                    ranks = ranks[:, self._rank_order]
+
+            n_ticks, n_vertices = ranks.shape
+
+            # Ticks whose ranks were recorded, all of them but with a lossy
+            #   recording policy
+            ticks = recorded_ticks(ranks)
+
+            # L1 error between consecutive (recorded) iterations
+            diffs = np.abs(np.diff(ranks[ticks], axis=0))
+            errors = diffs.sum(axis=1)
+
+            # First iteration below the tolerance, if any
+            converged = errors < n_vertices * TOL
+            convergence = n_ticks
+            if converged.any():
+                convergence = int(ticks[converged.argmax() + 1])
+
+            # Per vertex, iteration after which the rank stays within the
+            # tolerance, i.e. after its last change greater than it
+            vertex_convergence = np.full(n_vertices, n_ticks)
+            if len(ticks) > 1:
+                moved = diffs >= TOL
+                last_moved = len(ticks) - 2 - moved[::-1].argmax(axis=0)
+                vertex_convergence = np.where(moved.any(axis=0),
+                                              ticks[last_moved + 1] + 1,
+                                              ticks[0] + 1)
+
+            # Copy first convergence row to all remaining, in place
+            if convergence + 1 < n_ticks:
+                ranks[convergence + 1:] = ranks[convergence]
 
-            # Compute convergence
-            x_last = ranks[0]
-            N = len(x_last)
-            convergence = len(ranks)
+            self._sim_ranks, self._sim_convergence = ranks, convergence
+            self._sim_errors = errors
+            self._sim_vertex_convergence = vertex_convergence
+        return self._sim_ranks, self._sim_convergence
 
-            for it, x in enumerate(ranks[1:]):
-                err = sum([abs(x_i - x_last_i)
-                           for x_i, x_last_i in zip(x, x_last)])
-                if err < N * TOL:
-                    convergence = it + 1  # since we began at index #1
-                    break
-                x_last = x
+    def _get_core_slices(self, atoms_per_core, balance_load):
+        if not balance_load:
+            return None
+        n_cores = -(-self._graph.n_vertices //
+                    min(atoms_per_core or MAX_ATOMS_PER_CORE,
+                        MAX_ATOMS_PER_CORE))
+        return balanced_slices(self._mapped_graph, n_cores)
 
-            # Copy first convergence row to all remaining
-            for i in range(convergence + 1, len(ranks)):
-                ranks[i, :] = ranks[convergence, :]
+    def _get_reference_ranks(self):
+        """Python Page Rank, from the results cache if already computed.
 
-            self._sim_ranks, self._sim_convergence = ranks, convergence
-        return self._sim_ranks, self._sim_convergence
+        :return: (<np.array> ranks, <int> number of iterations to convergence)
+        """
+        if not self._use_cache:
+            return self.do_python_page_rank()
+
+        params = dict(result='reference_ranks', damping=self._damping, tol=TOL)
+        if self._teleport is not None:
+            params['teleport'] = _digest(self._teleport)
+        if self._rank_init is not None:
+            params['rank_init'] = _digest(self._rank_init)
+
+        cache = ResultCache()
+        key = cache_key(graph_fingerprint(self._graph), **params)
+        cached = cache.get(key)
+        if cached is not None:
+            self._logger.debug("Reference ranks from the results cache")
+            return cached['ranks'], cached['n_iter']
+
+        ranks, it = self.do_python_page_rank()
+        cache.put(key, ranks=ranks, n_iter=it)
+        return ranks, it
+
+    def _setup_and_build(self, atoms_per_core, balance_load):
+        self._atoms_per_core = atoms_per_core
+        self._core_slices = self._get_core_slices(atoms_per_core, balance_load)
+
+        # Setup simulation
+        with self._profiler.phase('setup'):
+            self._spinnaker_adapter.simulation_setup(**self._parameters)
+
+        # Build graph
+        if self._rank_order is not None:
+            self._logger.important('Input order: ' + format_traffic_report(
+                traffic_report(self._graph, atoms_per_core),
+                self._graph.n_edges))
+            self._logger.important('Mapped order: ' + format_traffic_report(
+                self.traffic_report(atoms_per_core, balance_load),
+                self._graph.n_edges))
+
+        with self._profiler.phase('build'):
+            self._build_page_rank_graph(self._get_page_rank_kwargs())
+
+    def _build_page_rank_graph(self, page_rank_kwargs):
+        kwargs = {}
+        atoms_per_core = self._atoms_per_core
+        if self._core_slices is not None:
+            kwargs['core_slices'] = self._core_slices
+            # Balanced slices may be larger than `atoms_per_core', up to
+            #   MAX_ATOMS_PER_CORE: each one still fits a single core
+            atoms_per_core = int(np.max(np.diff(self._core_slices)))
+        if self._recording_policy[0] != 'all':
+            kwargs['recording_policy'] = self._recording_policy
+
+        self._spinnaker_adapter.build_page_rank_graph(
+            self._mapped_graph, atoms_per_core=atoms_per_core,
+            page_rank_kwargs=page_rank_kwargs, **kwargs
+        )
+
+    def _run_and_verify(self, verify, **kwargs):
+        """Runs the loaded graph, then checks its results.
+
+        :return: (<bool> whether the results match, <str> report)
+        """
+        self._sim_ranks = None
+        with self._profiler.phase('run'):
+            self._spinnaker_adapter.simulation_run(self._run_time)
+        self._simulation_has_ran = True
+
+        # Correctness check
+        return self._verify_sim(verify, **kwargs)
+
+    def _run_batch(self, settings, configure, verify, atoms_per_core,
+                   balance_load, **kwargs):
+        """Runs the graph for each of the `settings', applied by
+        `configure(setting)'. The graph is mapped for the first run, and its
+        parameters reloaded for the next ones.
+
+        :return: (<np.array> ranks at convergence of each run, <np.array>
+                  bool correctness of each run)
+        """
+        ranks, correct = [], []
+        for i, setting in enumerate(settings):
+            configure(setting)
+            if i == 0:
+                correct.append(self.run(verify, atoms_per_core, balance_load,
+                                        **kwargs))
+            else:
+                with silence_output(
+                        enable=not self._logger.isEnabledFor(logging.INFO)):
+                    with self._profiler.phase('reload'):
+                        self._spinnaker_adapter.reload_page_rank_parameters(
+                            self._get_page_rank_kwargs())
+                    is_correct, msg = self._run_and_verify(verify, **kwargs)
+                self._logger.important(msg)
+                correct.append(is_correct)
+            ranks.append(self._extract_sim_ranks()[0][-1])
+        return np.array(ranks), np.array(correct, dtype=bool)
 
     def _verify_sim(self, verify, diff_only=False, diff_max=50):
         """Verifies simulation results correctness.
@@ -197,72 +516,256 @@ class PageRankSimulation:
         computed_ranks = computed_ranks[-1]
         msg += "[SpiNNaker] Convergence < 10e-%d in #%d iterations.\n" % (
             FLOAT_PRECISION, it)
+        recording_size = self._spinnaker_adapter.extract_recording_size()
+        if self._recording_policy[0] != 'all' and recording_size is not None:
+            msg += "[SpiNNaker] %d bytes of ranks recorded (%s policy).\n" % (
+                recording_size, self._recording_policy[0])
 
         if not verify:
             return True, msg + "Correctness unchecked.\n"
 
-        # Get Page Rank from python implementation
-        self._logger.important("Computing Page Rank...")
-        expected_ranks, it = self.do_python_page_rank()
-        msg += "[Python PR] Convergence < 10e-%d in #%d iterations.\n" % (
-            FLOAT_PRECISION, it)
-
-        # Compare at defined precision
-        is_correct = np.allclose(computed_ranks, expected_ranks, atol=TOL)
-
-        if is_correct:
-            msg += "CORRECT Page Rank results.\n"
-            if not diff_only:
-                msg += format_ranks_string(self._labels, {
-                    'Computed': computed_ranks
-                })
-        else:
-            msg += ("INCORRECT Page Rank results.\n" +
-                    format_ranks_string(self._labels, {
-                        'Computed': computed_ranks,
-                        'Expected': expected_ranks
-                    }, diff_only, diff_max))
+        with self._profiler.phase('verify'):
+            # Get Page Rank from python implementation
+            self._logger.important("Computing Page Rank...")
+            expected_ranks, it = self._get_reference_ranks()
+            msg += "[Python PR] Convergence < 10e-%d in #%d iterations.\n" % (
+                FLOAT_PRECISION, it)
+
+            # Compare at defined precision
+            is_correct = np.allclose(computed_ranks, expected_ranks, atol=TOL)
+
+            if is_correct:
+                msg += "CORRECT Page Rank results.\n"
+                if not diff_only:
+                    msg += format_ranks_string(self._labels, {
+                        'Computed': computed_ranks
+                    })
+            else:
+                msg += ("INCORRECT Page Rank results.\n" +
+                        format_ranks_string(self._labels, {
+                            'Computed': computed_ranks,
+                            'Expected': expected_ranks
+                        }, diff_only, diff_max))
 
-        return is_correct, msg
+            return is_correct, msg
 
     #
     # Exposed functions
     #
 
-    def run(self, verify=False, atoms_per_core=None, **kwargs):
+    def stream_ranks(self, callback=None, host='127.0.0.1', port=0):
+        """Streams the ranks of each iteration to the host while the
+        simulation runs, e.g. to watch them converge.
+
+        To be called before `run' or `run_to_convergence'. Rows of ranks, in
+        input order, are passed to `callback' as they are received, from the
+        receiving thread, or iterated over with `rows()' from another thread;
+        their iteration count restarts from 0 whenever the mapped graph is
+        reloaded, e.g. by `run_damping_sweep'. The receiver is closed when
+        the simulation ends. See live_ranks.LiveRanksReceiver.
+
+        :param callback: function(<int> iteration, <np.array> ranks)
+        :param host: address of this host, as seen from the machine
+        :param port: UDP port to listen to, default is any free port
+        :return: <LiveRanksReceiver> receiver
+        """
+        receiver = LiveRanksReceiver(
+            self._mapped_graph.out_degrees, rank_order=self._rank_order,
+            callback=callback, host=host, port=port)
+        self._spinnaker_adapter.activate_live_output(receiver)
+        self._live_receivers.append(receiver)
+        return receiver
+
+    @_profiled
+    def run(self, verify=False, atoms_per_core=None, balance_load=False,
+            **kwargs):
         """Runs the simulation.
 
         :param verify: check the results with a Page Rank python implementation.
         :param atoms_per_core: number of vertices to set per core
+        :param balance_load: slice the vertices onto as many cores as with
+                             `atoms_per_core', but with about the same number
+                             of incoming edges per core, see
+                             partitioning.balanced_slices
         :return: bool, correctness of the simulation results
         """
-
         with silence_output(enable=not self._logger.isEnabledFor(logging.INFO)):
-            # Setup simulation
-            self._spinnaker_adapter.simulation_setup(**self._parameters)
+            self._setup_and_build(atoms_per_core, balance_load)
 
-            # Build graph
-            page_rank_kwargs = dict(
-                damping_factor=self._get_damping_factor(),
-                damping_sum=self._get_damping_sum()
-            )
+            # Run
+            is_correct, msg = self._run_and_verify(verify, **kwargs)
 
-            self._spinnaker_adapter.build_page_rank_graph(
-                self._sim_vertices, self._sim_edges,
-                atoms_per_core=atoms_per_core, page_rank_kwargs=page_rank_kwargs
-            )
+        self._logger.important(msg)
+        return is_correct
 
-            # Run
-            self._spinnaker_adapter.simulation_run(self._run_time)
+    @_profiled
+    def run_to_convergence(self, verify=False, atoms_per_core=None,
+                           balance_load=False, chunk_iterations=5,
+                           max_iterations=None, **kwargs):
+        """Runs the simulation until the ranks converge, rather than for
+        `run_time'.
+
+        The simulation runs by chunks of iterations, pausing after each one
+        to check the L1 change between the recorded ranks: it stops as soon
+        as it is below `n_vertices * TOL', or after `max_iterations'. See
+        `convergence_report' for the iterations and time saved.
+
+        :param verify: check the results with a Page Rank python implementation.
+        :param atoms_per_core: number of vertices to set per core
+        :param balance_load: see `run'
+        :param chunk_iterations: number of iterations between two checks
+        :param max_iterations: iteration budget, default is that of `run_time'
+        :return: bool, correctness of the simulation results
+        """
+        if not is_lossless(self._recording_policy):
+            raise ValueError('Checking convergence needs the ranks of every '
+                             'iteration, not a %r recording policy.' %
+                             self._recording_policy[0])
+
+        timestep = self._parameters['timestep']
+        if max_iterations is None:
+            max_iterations = int(round(self._run_time / timestep))
+        threshold = self._graph.n_vertices * TOL
+
+        with silence_output(enable=not self._logger.isEnabledFor(logging.INFO)):
+            self._setup_and_build(atoms_per_core, balance_load)
+
+            # Run by chunks, until converged
+            start = time.time()
+            n_iter, converged = 0, False
+            while n_iter < max_iterations and not converged:
+                chunk = min(chunk_iterations, max_iterations - n_iter)
+                with self._profiler.phase('run'):
+                    self._spinnaker_adapter.simulation_run(chunk * timestep)
+                n_iter += chunk
+
+                with self._profiler.phase('check'):
+                    ranks = self._spinnaker_adapter.extract_ranks()
+                errors = np.abs(np.diff(ranks[-(chunk + 1):], axis=0)).sum(
+                    axis=1)
+                converged = bool((errors < threshold).any())
+            wall_time = time.time() - start
+
+            self._sim_ranks = None
             self._simulation_has_ran = True
 
             # Correctness check
             is_correct, msg = self._verify_sim(verify, **kwargs)
 
+        saved = max_iterations - n_iter
+        self._convergence_report = dict(
+            converged=converged, iterations=n_iter,
+            max_iterations=max_iterations, wall_time=wall_time,
+            saved_iterations=saved,
+            # Real time of the ticks not run, on the machine
+            saved_time=saved * timestep *
+            self._parameters['time_scale_factor'] / 1000.)
+        msg += ("%s after %d/%d iterations in %.2f sec, saving %d iterations "
+                "(%.3f sec of machine time).\n" % (
+                    'Converged' if converged else 'NOT converged', n_iter,
+                    max_iterations, wall_time, saved,
+                    self._convergence_report['saved_time']))
+
         self._logger.important(msg)
         return is_correct
 
-    def do_python_page_rank(self, max_iter=100, tol=TOL):
+    @_profiled
+    def run_personalized(self, teleports, verify=False, atoms_per_core=None,
+                         balance_load=False, **kwargs):
+        """Runs a personalized Page Rank for each teleport vector, on the
+        graph mapped and loaded once: between runs, only the teleport term of
+        the vertices is reloaded.
+
+        :param teleports: teleport weights of each run, see `teleport' in
+                          `__init__'
+        :param verify: check each run with a Page Rank python implementation
+        :param atoms_per_core: number of vertices to set per core
+        :param balance_load: see `run'
+        :return: (<np.array> (n_runs, n_vertices) ranks at convergence,
+                  <np.array> bool correctness of each run)
+        """
+        def configure(teleport):
+            self._teleport = _as_teleport(teleport, self._labels)
+
+        return self._run_batch(teleports, configure, verify, atoms_per_core,
+                               balance_load, **kwargs)
+
+    @_profiled
+    def run_damping_sweep(self, dampings, verify=False, atoms_per_core=None,
+                          balance_load=False, **kwargs):
+        """Runs the Page Rank for each damping factor, on the graph mapped
+        and loaded once: between runs, only the damping factor and teleport
+        term of the vertices are reloaded.
+
+        :param dampings: damping factors, in [0, 1)
+        :param verify: check each run with a Page Rank python implementation
+        :param atoms_per_core: number of vertices to set per core
+        :param balance_load: see `run'
+        :return: (<np.array> (n_dampings, n_vertices) ranks at convergence,
+                  <np.array> bool correctness of each run)
+        """
+        for damping in dampings:
+            _validate_damping(damping)
+
+        def configure(damping):
+            self._damping = damping
+
+        return self._run_batch(dampings, configure, verify, atoms_per_core,
+                               balance_load, **kwargs)
+
+    @_profiled
+    def update_edges(self, added=None, removed=None, verify=False, **kwargs):
+        """Adds and removes edges of the graph, then runs the simulation
+        again, warm started from the ranks of the previous run.
+
+        The vertices stay on their cores, only the degrees of the vertices of
+        the changed edges are updated. Backends which cannot update a mapped
+        graph map it again.
+
+        :param added: edges to add, as in `__init__'
+        :param removed: existing edges to remove
+        :param verify: check the results with a Page Rank python
+                       implementation, warm started the same way
+        :return: bool, correctness of the simulation results
+        """
+        if not self._simulation_has_ran:
+            raise RuntimeError('You first need to .run(...) the simulation.')
+
+        added = self._graph.label_edge_ids(added)
+        removed = self._graph.label_edge_ids(removed)
+        graph = self._graph.with_edges(added, removed)
+        _validate_graph_structure(graph, self._damping)
+
+        # Warm start from the previous ranks at convergence
+        self._rank_init = self._extract_sim_ranks()[0][-1].copy()
+        mapped_graph = graph
+        if self._rank_order is not None:
+            mapped_graph = self._mapped_graph.with_edges(
+                self._rank_order[added], self._rank_order[removed])
+        self._graph, self._mapped_graph = graph, mapped_graph
+        self._input_networkx_repr = None
+
+        with silence_output(enable=not self._logger.isEnabledFor(logging.INFO)):
+            page_rank_kwargs = self._get_page_rank_kwargs()
+            try:
+                with self._profiler.phase('update'):
+                    self._spinnaker_adapter.update_page_rank_graph(
+                        self._mapped_graph, page_rank_kwargs)
+            except NotImplementedError:
+                self._logger.important('Mapping the updated graph again')
+                self._spinnaker_adapter.simulation_teardown()
+                with self._profiler.phase('setup'):
+                    self._spinnaker_adapter.simulation_setup(
+                        **self._parameters)
+                with self._profiler.phase('build'):
+                    self._build_page_rank_graph(page_rank_kwargs)
+
+            is_correct, msg = self._run_and_verify(verify, **kwargs)
+
+        self._logger.important(msg)
+        return is_correct
+
+    def do_python_page_rank(self, max_iter=100, tol=TOL, vectorized=True):
         """Return the PageRank of the nodes in the graph.
 
         Adapted to return the # of iterations necessary to compute the Page Rank
@@ -270,15 +773,118 @@ class PageRankSimulation:
         Source
         ------
         networkx/algorithms/link_analysis/pagerank_alg.py
+
+        :param vectorized: use the NumPy engine, bit-exact with the (much
+                           slower) scalar fixed-point implementation
         """
+        labels = self._labels
+        d = self._get_damping_factor()
+        d_sum = self._get_teleport()
+
+        rank_init = self._get_rank_init()
+
+        if vectorized:
+            return compute_page_rank_vectorized(self._graph, d, d_sum, tol,
+                                                max_iter, rank_init)
 
         # Init graph structure
         g = self._init_networkx_repr()
-        labels = self._labels
-        d = self._get_damping_factor()
-        d_sum = self._get_damping_sum()
 
-        return compute_page_rank(g, labels, d, d_sum, tol, max_iter)
+        return compute_page_rank(g, labels, d, d_sum, tol, max_iter,
+                                 rank_init)
+
+    def convergence_errors(self):
+        """L1 error between the ranks of consecutive simulated iterations.
+
+        :return: <np.array> error of each iteration, from the 1st
+        """
+        self._extract_sim_ranks()
+        return self._sim_errors
+
+    def convergence_report(self):
+        """Iterations run by the last `run_to_convergence', out of its
+        budget, and the time saved by stopping early.
+
+        :return: <dict> report, or None if not run to convergence
+        """
+        return self._convergence_report
+
+    def profile(self):
+        """Wall time, CPU time and peak RSS of each phase of the last run
+        method called, e.g. `run': `setup', `build', `run', `extract' and
+        `verify', with the internal phases of the adapter, e.g.
+        `build.projections', nested under them. See
+        profiling.PhaseProfiler.report.
+
+        :return: <dict> JSON serializable report, or None if not run
+        """
+        return self._profile
+
+    def vertex_convergence_iterations(self):
+        """Number of iterations after which each vertex rank only changes by
+        less than the tolerance, or the number of recorded iterations if it
+        never settles.
+
+        :return: <np.array> iterations, in vertex id order
+        """
+        self._extract_sim_ranks()
+        return self._sim_vertex_convergence
+
+    def traffic_report(self, atoms_per_core=None, balance_load=False):
+        """Edge cut and multicast traffic of the graph as mapped, see
+        partitioning.traffic_report.
+
+        :param atoms_per_core: number of vertices to set per core
+        :param balance_load: slice the vertices as `run(balance_load=True)'
+        :return: <dict> report
+        """
+        return traffic_report(
+            self._mapped_graph, atoms_per_core,
+            core_slices=self._get_core_slices(atoms_per_core, balance_load))
+
+    def core_load_report(self):
+        """Predicted load of each core of the last run, see
+        partitioning.vertex_costs, and the packets actually dispatched on each
+        core if the adapter reports them.
+
+        :return: <dict> report, see partitioning.load_report
+        """
+        if not self._simulation_has_ran:
+            raise RuntimeError('You first need to .run(...) the simulation.')
+        return load_report(
+            core_loads(self._mapped_graph, self._atoms_per_core,
+                       self._core_slices),
+            self._spinnaker_adapter.extract_pre_synaptic_events())
+
+    def extract_router_provenance(self, collect_names=None):
+        """Router provenance of the simulation, before it is torn down.
+
+        :param collect_names: [<str>] router entries to extract, default is
+                              given by the adapter
+        :return: <dict> name-indexed counts
+        """
+        return self._spinnaker_adapter.extract_router_provenance(collect_names)
+
+    def extract_provenance(self):
+        """Provenance counters of each router and each core of the
+        simulation, before it is torn down. See provenance.hottest_routers
+        and provenance.most_overflowing_cores to find the bottlenecks.
+
+        :return: <dict> `routers' and `cores' tables, see
+                 provenance.router_table and provenance.core_table
+        """
+        return self._spinnaker_adapter.extract_provenance()
+
+    def provenance_warnings(self):
+        """Warnings of the provenance counters of the simulation so far, e.g.
+        dropped packets, buffer overflows or timer overruns. The simulation
+        is not torn down, so that it can be run again, e.g. with other
+        parameters.
+
+        :return: [<ProvenanceWarning>] warnings, see
+                 provenance.provenance_warnings
+        """
+        return self._spinnaker_adapter.extract_provenance_warnings()
 
     @graph_visualiser
     def draw_input_graph(self, save_graph=False):
@@ -1,27 +1,58 @@
-import io
-import logging
+from collections import OrderedDict
 
 import numpy as np
 
 import spynnaker8 as p
 from spinn_front_end_common.utilities import globals_variables
+from spinn_front_end_common.utilities.connections import DatabaseConnection
 from spinn_front_end_common.interface.interface_functions \
     import RouterProvenanceGatherer
+from spinnman.messages.eieio import EIEIOType
 
 from page_rank.model.python_models.model_data_holders.page_rank_data_holder \
     import PageRankDataHolder as Page_Rank
 from page_rank.model.python_models.synapse_dynamics.synapse_dynamics_noop \
     import SynapseDynamicsNoOp
+from page_rank.model.tools.provenance import \
+    DEFAULT_ROUTER_PROVENANCE_NAMES, core_table, router_table, sum_items
+from page_rank.model.tools.recording import RECORDING_MODES, \
+    as_recording_policy
 from page_rank.model.tools.spinnaker_adapter_interface import \
     SpiNNakerAdapterInterface
-from page_rank.model.tools.utils import getLogger
+from page_rank.model.tools.utils import getLogger, ranks_from_recordings
 
 RANK = 'v'
-PROVENANCE_LOGGER = 'spinn_front_end_common.interface.abstract_spinnaker_base'
+
+# Phases of `p.run' timed by the simulator, and their accumulated time in ms,
+#   see AbstractSpinnakerBase
+SIMULATOR_TIMERS = OrderedDict([
+    ('mapping', '_mapping_time'),
+    ('data_generation', '_dsg_time'),
+    ('loading', '_load_time'),
+    ('execution', '_execute_time'),
+    ('extraction', '_extraction_time'),
+])
 
 _logger = getLogger(__name__)
 
 
+#
+# Private functions, internal helpers
+#
+
+def _simulator_timers():
+    """Time spent so far by the simulator in each of SIMULATOR_TIMERS, in
+    ms, 0 if not reported."""
+    m = globals_variables.get_simulator()
+    return [getattr(m, attr, None) or 0. for attr in SIMULATOR_TIMERS.values()]
+
+
+def _slice_kwargs(page_rank_kwargs, lo, hi):
+    """Parameters of the vertices [lo, hi), per-vertex arrays being sliced."""
+    return {name: value[lo:hi] if np.ndim(value) else value
+            for name, value in (page_rank_kwargs or {}).items()}
+
+
 #
 # Main simulation interface
 #
@@ -31,8 +62,16 @@ class SpiNNakerAdapter(SpiNNakerAdapterInterface):
     def __init__(self):
         SpiNNakerAdapterInterface.__init__(self)
 
-        # State variable
-        self._model = None
+        # State variable: (first vertex id, Population) of each slice
+        self._populations = []
+        self._recording_policy = as_recording_policy(None)
+        self._recording_size = None
+
+        # Live output receivers, activated at the next run, and the database
+        #   connections notified of their keys
+        self._live_receivers = []
+        self._live_pending = []
+        self._database_connections = []
 
     def simulation_setup(self, *args, **kwargs):
         """Setup the SpiNNaker simulation framework
@@ -47,44 +86,140 @@ class SpiNNakerAdapter(SpiNNakerAdapterInterface):
         :return: None
         """
         p.end()
-
-    def build_page_rank_graph(self, vertices, edges, atoms_per_core=None,
-                              page_rank_kwargs=None):
+        for connection in self._database_connections:
+            connection.close()
+        self._database_connections = []
+        self._live_pending = list(self._live_receivers)
+
+    def build_page_rank_graph(self, graph, atoms_per_core=None,
+                              page_rank_kwargs=None, core_slices=None,
+                              recording_policy=None):
         """Create a sPyNNaker simulation graph from the Page Rank input graph.
 
         Maps the graph to sPyNNaker.
 
+        :param graph: <PageRankGraph> input graph
+        :param page_rank_kwargs: `damping_factor', `teleport' term and optional
+                                 `rank_init', the same for every vertex or
+                                 <np.array> of each vertex
+        :param core_slices: boundaries of the vertices of each core, see
+                            partitioning.balanced_slices. One Population is
+                            created per slice, fitting a core, with one
+                            Projection per pair of connected slices.
+        :param recording_policy: ticks the ranks are recorded at, see
+                                 recording.as_recording_policy
         :return: None
         """
-
-        # Pre-processing, compute inbound / outbound edges for each node
-        n_neurons = len(vertices)
-        outgoing_edges_count = [0] * n_neurons
-        incoming_edges_count = [0] * n_neurons
-        for src, tgt in edges:
-            outgoing_edges_count[src] += 1
-            incoming_edges_count[tgt] += 1
-
-        # Vertices
-        self._model = p.Population(
-            n_neurons,
-            Page_Rank(
-                rank_init=1. / n_neurons,
-                incoming_edges_count=incoming_edges_count,
-                outgoing_edges_count=outgoing_edges_count,
-                **(page_rank_kwargs or {})
-            ),
-            label="page_rank")
+        n_neurons = graph.n_vertices
+        if core_slices is None:
+            core_slices = [0, n_neurons]
+        else:
+            # Each slice fits a core, and is not to be split again by PACMAN
+            atoms_per_core = int(np.max(np.diff(core_slices)))
+        kwargs = dict(rank_init=1. / n_neurons)
+        kwargs.update(page_rank_kwargs or {})
+
+        self._recording_policy = as_recording_policy(recording_policy)
+        self._recording_size = None
+        mode, interval = self._recording_policy
+        kwargs.update(recording_mode=RECORDING_MODES.index(mode),
+                      recording_interval=interval)
+
+        # Vertices, inbound / outbound edges counts are precomputed by the graph
+        self._populations = []
+        self._live_pending = list(self._live_receivers)
+        with self._profiler.phase('populations'):
+            for lo, hi in zip(core_slices[:-1], core_slices[1:]):
+                if hi == lo:
+                    continue
+                self._populations.append((lo, p.Population(
+                    hi - lo,
+                    Page_Rank(
+                        incoming_edges_count=graph.in_degrees[lo:hi],
+                        outgoing_edges_count=graph.out_degrees[lo:hi],
+                        **_slice_kwargs(kwargs, lo, hi)
+                    ),
+                    label="page_rank" if len(core_slices) == 2 else
+                    "page_rank_%d" % len(self._populations))))
 
         if atoms_per_core:
             p.set_number_of_neurons_per_core(atoms_per_core)
 
-        # Edges
-        p.Projection(
-            self._model, self._model,
-            p.FromListConnector(edges),
-            synapse_type=SynapseDynamicsNoOp()
-        )
+        # Edges, grouped by the populations of their source and target
+        with self._profiler.phase('projections'):
+            firsts = np.array([lo for lo, _ in self._populations])
+            n_pops = len(firsts)
+            pop_of = np.searchsorted(firsts, np.arange(n_neurons),
+                                     side='right') - 1
+            pairs = pop_of[graph.src].astype(np.int64) * n_pops + \
+                pop_of[graph.dst]
+            order = np.argsort(pairs, kind='mergesort')
+            pairs, bounds = np.unique(pairs[order], return_index=True)
+            edges = graph.edge_list()[order]
+            for pair, lo, hi in zip(pairs.tolist(), bounds.tolist(),
+                                    bounds[1:].tolist() + [len(order)]):
+                pre, post = divmod(pair, n_pops)
+                p.Projection(
+                    self._populations[pre][1], self._populations[post][1],
+                    p.FromListConnector(
+                        edges[lo:hi] - [firsts[pre], firsts[post]]),
+                    synapse_type=SynapseDynamicsNoOp()
+                )
+
+    def reload_page_rank_parameters(self, page_rank_kwargs=None):
+        """Resets the simulation to its start with new Page Rank parameters.
+
+        The graph stays mapped and loaded: only the neuron parameters are
+        written again to the cores before the next run.
+
+        :param page_rank_kwargs: as in `build_page_rank_graph'
+        :return: None
+        """
+        p.reset()
+        for lo, population in self._populations:
+            kwargs = _slice_kwargs(page_rank_kwargs, lo, lo + population.size)
+            rank_init = kwargs.pop('rank_init', None)
+            population.set(**kwargs)
+            if rank_init is not None:
+                population.initialize(rank=rank_init)
+
+    def _activate_live_output(self, receiver):
+        """Adds a live packet gatherer forwarding the packets sent by every
+        population to `receiver', whose key map is set from the database once
+        the graph is mapped.
+        """
+        host, port = receiver.address
+        for _, population in self._populations:
+            p.external_devices.activate_live_output_for(
+                population, host=host, port=port,
+                message_type=EIEIOType.KEY_PAYLOAD_32_BIT,
+                payload_as_time_stamps=False, use_payload_prefix=False,
+                notify=False)
+
+        def read_key_map(db_reader):
+            keys, vertices = [], []
+            for first, population in self._populations:
+                key_to_atom = db_reader.get_key_to_atom_id_mapping(
+                    population.label)
+                keys.extend(key_to_atom.keys())
+                vertices.extend(first + atom for atom in key_to_atom.values())
+            receiver.set_key_map(np.array(keys), np.array(vertices))
+
+        connection = DatabaseConnection(local_port=None)
+        connection.add_database_callback(read_key_map)
+        p.external_devices.add_database_socket_address(
+            'localhost', connection.local_port, None)
+        self._database_connections.append(connection)
+
+    def activate_live_output(self, receiver):
+        """Forwards the ranks sent by the vertices at each iteration to
+        `receiver', from the next run of the graph built.
+
+        :param receiver: <LiveRanksReceiver> receiver
+        :return: None
+        """
+        self._live_receivers.append(receiver)
+        self._live_pending.append(receiver)
 
     def simulation_run(self, *args, **kwargs):
         """Run the simulation on SpiNNaker.
@@ -92,62 +227,138 @@ class SpiNNakerAdapter(SpiNNakerAdapterInterface):
         :return: None
         """
 
-        # Record ranks
-        self._model.record([RANK])
+        # Live output, to be mapped with the graph
+        for receiver in self._live_pending:
+            self._activate_live_output(receiver)
+        self._live_pending = []
 
-        # Run simulation
-        p.run(*args, **kwargs)
+        # Record ranks
+        for _, population in self._populations:
+            population.record([RANK])
+
+        # Run simulation, mapping and loading the graph first if needed
+        with self._profiler.phase('simulator'):
+            timers = _simulator_timers()
+            p.run(*args, **kwargs)
+            for name, elapsed in zip(SIMULATOR_TIMERS, np.subtract(
+                    _simulator_timers(), timers)):
+                if elapsed > 0:
+                    self._profiler.add(name, elapsed / 1000.)
+
+    def _get_rank_recordings(self):
+        """Raw rank recordings of each core, read from the buffer manager.
+
+        :return: [(<int> first vertex id, <int> number of vertices, <buffer>
+                  recorded `timed_state_t' rows)]
+        """
+        m = globals_variables.get_simulator()
 
-    def extract_ranks(self):
+        recordings = []
+        for first, population in self._populations:
+            app_vertex = population._vertex
+            region = app_vertex.RECORDING_REGION[RANK]
+            for vertex in m.graph_mapper.get_machine_vertices(app_vertex):
+                placement = m.placements.get_placement_of_vertex(vertex)
+                vertex_slice = m.graph_mapper.get_slice(vertex)
+                data, missing = m.buffer_manager.get_data_for_vertex(
+                    placement, region)
+                lo_atom = first + vertex_slice.lo_atom
+                if missing:
+                    _logger.warning("Missing rank recordings for vertices "
+                                    "%d..%d.", lo_atom,
+                                    lo_atom + vertex_slice.n_atoms - 1)
+                recordings.append((lo_atom, vertex_slice.n_atoms,
+                                   data.read_all()))
+
+        self._recording_size = sum(len(data) for _, _, data in recordings)
+        return recordings
+
+    def extract_ranks(self, raw=False, use_neo=False):
         """Extract the per-iteration ranks computed during the simulation.
 
+        The recording region of each core is read directly, without building
+        a neo Block.
+
+        :param raw: return the u0.32 fixed-point ranks as uint32
+        :param use_neo: go through `Population.get_data', slower
         :return: <np.array> ranks
         """
+        if use_neo:
+            return np.concatenate([np.array(
+                [[np.float64(cell / 2 ** 17) for cell in row]
+                 for row in population.get_data(RANK).segments[0].filter(
+                     name=RANK)[0]])
+                for _, population in self._populations], axis=1)
+
+        n_vertices = sum(population.size for _, population in self._populations)
+        with self._profiler.phase('read_recordings'):
+            recordings = self._get_rank_recordings()
+        with self._profiler.phase('convert'):
+            return ranks_from_recordings(recordings, n_vertices=n_vertices,
+                                         raw=raw,
+                                         policy=self._recording_policy)
+
+    def extract_recording_size(self):
+        """Number of bytes of ranks recorded, over all cores.
+
+        :return: <int> size
+        """
+        if self._recording_size is None:
+            self._get_rank_recordings()
+        return self._recording_size
 
-        raw_ranks =  self._model.get_data(RANK).segments[0].filter(name=RANK)[0]
-        return np.array([[np.float64(cell / 2 ** 17) for cell in row]
-                          for row in raw_ranks])
+    def _read_router_provenance(self):
+        """Provenance items of the routers of every chip, and their totals
+        over the machine.
 
-    def extract_router_provenance(self, collect_names=None):
-        """Extract the router information for the given names.
-
-        :type collect_names: [<str>] router entries to extract
-        :return: <dict> name-indexed names
+        :return: [<ProvenanceDataItem>] items
         """
-        if collect_names is None:
-            collect_names = [
-                'total_multi_cast_sent_packets',
-                'total_created_packets',
-                'total_dropped_packets',
-                'total_missed_dropped_packets',
-                'total_lost_dropped_packets'
-            ]
-
         m = globals_variables.get_simulator()
 
         router_provenance = RouterProvenanceGatherer()
-        router_prov = router_provenance(m._txrx, m._machine, m._router_tables,
-                                        True)
-
-        res = dict().fromkeys(collect_names, 0)
-        for item in router_prov:
+        items = router_provenance(m._txrx, m._machine, m._router_tables, True)
+        for item in items:
             _logger.debug('{} => {}'.format(item.names, item.value))
-            name = item.names[-1]
-            if name in collect_names:
-                res[name] += int(item.value)
+        return items
+
+    def _read_core_provenance(self):
+        """Provenance items of the cores of the graph, see
+        c_models/src/neuron/c_main.c.
 
-        return res
+        :return: [(<Placement> placement, [<ProvenanceDataItem>] items)]
+        """
+        m = globals_variables.get_simulator()
+
+        items_by_placement = []
+        for _, population in self._populations:
+            for vertex in m.graph_mapper.get_machine_vertices(
+                    population._vertex):
+                placement = m.placements.get_placement_of_vertex(vertex)
+                items_by_placement.append((
+                    placement,
+                    vertex.get_provenance_data_from_machine(m._txrx,
+                                                            placement)))
+        return items_by_placement
 
-    def has_provenance_warnings(self):
-        """Whether the simulation produced provenance data warnings.
+    def extract_router_provenance(self, collect_names=None):
+        """Extract the router information for the given names.
 
-        :return: <bool>
+        :type collect_names: [<str>] router entries to extract
+        :return: <dict> name-indexed names
         """
-        with io.BytesIO() as log_capture_string:
-            log = logging.getLogger(PROVENANCE_LOGGER)
-            map(log.removeHandler, log.handlers)
-            log.addHandler(logging.StreamHandler(log_capture_string))
+        if collect_names is None:
+            collect_names = DEFAULT_ROUTER_PROVENANCE_NAMES
+        return sum_items(self._read_router_provenance(), collect_names)
 
-            self.simulation_teardown()
+    def extract_provenance(self):
+        """Provenance counters of each router and each core of the graph.
 
-            return bool(log_capture_string.getvalue())
+        The router diagnostics are read from the live machine, and the core
+        counters from the provenance region of each core, as last written.
+        Neither tears the simulation down.
+
+        :return: <dict> `routers' and `cores' tables, see
+                 provenance.router_table and provenance.core_table
+        """
+        return dict(routers=router_table(self._read_router_provenance()),
+                    cores=core_table(self._read_core_provenance()))
@@ -1,11 +1,25 @@
 import abc
 
+from page_rank.model.tools.profiling import PhaseProfiler
+from page_rank.model.tools.provenance import provenance_warnings
+
 
 class SpiNNakerAdapterInterface:
     __metaclass__ = abc.ABCMeta
 
     def __init__(self):
-        pass
+        # Records the internal phases of the adapter, see `set_profiler'
+        self._profiler = PhaseProfiler(enabled=False)
+
+    def set_profiler(self, profiler):
+        """Records the time and memory spent in the internal phases of the
+        adapter, e.g. creating the projections, as sub-phases of those of
+        `profiler'.
+
+        :param profiler: <PhaseProfiler> profiler
+        :return: None
+        """
+        self._profiler = profiler
 
     @abc.abstractmethod
     def simulation_setup(self, *args, **kwargs):
@@ -24,13 +38,49 @@ class SpiNNakerAdapterInterface:
         pass
 
     @abc.abstractmethod
-    def build_page_rank_graph(self, vertices, edges, **kwargs):
+    def build_page_rank_graph(self, graph, **kwargs):
         """Create a sPyNNaker simulation graph from the Page Rank input graph.
 
+        :param graph: <PageRankGraph> input graph
         :return: None
         """
         pass
 
+    def reload_page_rank_parameters(self, page_rank_kwargs=None):
+        """Resets the simulation to its start with new Page Rank parameters,
+        keeping the graph as mapped and loaded by `build_page_rank_graph'.
+
+        :param page_rank_kwargs: parameters, as in `build_page_rank_graph'
+        :return: None
+        """
+        raise NotImplementedError(
+            '%s cannot reload the parameters of a mapped graph.' %
+            type(self).__name__)
+
+    def update_page_rank_graph(self, graph, page_rank_kwargs=None):
+        """Replaces the edges of the graph mapped by `build_page_rank_graph',
+        each vertex staying on its core, and resets the simulation to its
+        start.
+
+        :param graph: <PageRankGraph> graph, with the same vertices
+        :param page_rank_kwargs: parameters, as in `build_page_rank_graph'
+        :return: None
+        """
+        raise NotImplementedError(
+            '%s cannot update the edges of a mapped graph.' %
+            type(self).__name__)
+
+    def activate_live_output(self, receiver):
+        """Forwards the ranks sent by the vertices at each iteration to a
+        host-side receiver while the simulation runs.
+
+        :param receiver: <LiveRanksReceiver> receiver, listening at its
+                         `address' and keyed with `set_key_map'
+        :return: None
+        """
+        raise NotImplementedError(
+            '%s cannot stream the ranks while running.' % type(self).__name__)
+
     @abc.abstractmethod
     def simulation_run(self, *args, **kwargs):
         """Run the simulation on SpiNNaker.
@@ -40,9 +90,11 @@ class SpiNNakerAdapterInterface:
         pass
 
     @abc.abstractmethod
-    def extract_ranks(self):
+    def extract_ranks(self, raw=False):
         """Extract the per-iteration ranks computed during the simulation.
 
+        :param raw: return the u0.32 fixed-point ranks as uint32
+
         :return: <np.array> ranks
         """
         pass
@@ -56,10 +108,46 @@ class SpiNNakerAdapterInterface:
         """
         pass
 
-    @abc.abstractmethod
+    def extract_provenance(self):
+        """Provenance counters of each router and each core of the graph.
+
+        :return: <dict> `routers' and `cores' tables, see
+                 provenance.router_table and provenance.core_table
+        """
+        raise NotImplementedError(
+            '%s does not report per-core provenance.' % type(self).__name__)
+
+    def extract_provenance_warnings(self):
+        """Warnings of the provenance counters of the simulation so far.
+
+        The counters are read without tearing the simulation down, so that
+        it can be run again.
+
+        :return: [<ProvenanceWarning>] warnings, see
+                 provenance.provenance_warnings
+        """
+        prov = self.extract_provenance()
+        return provenance_warnings(prov['routers'], prov['cores'])
+
     def has_provenance_warnings(self):
-        """Whether the simulation produced provenance data warnings.
+        """Whether the simulation produced provenance data warnings so far,
+        see `extract_provenance_warnings'.
 
         :return: <bool>
         """
-        pass
+        return bool(self.extract_provenance_warnings())
+
+    def extract_recording_size(self):
+        """Number of bytes of ranks recorded, over all cores.
+
+        :return: <int> size, or None if not reported by this backend
+        """
+        return None
+
+    def extract_pre_synaptic_events(self):
+        """Number of packets dispatched to the vertices of each core.
+
+        :return: <np.array> counts, in core order, or None if not reported by
+                 this backend
+        """
+        return None
@@ -0,0 +1,645 @@
+import socket
+
+import numpy as np
+
+from page_rank.model.tools.live_ranks import encode_eieio_key_payload
+from page_rank.model.tools.page_rank_engine import PAYLOAD_MASK, fp_mul, \
+    fp_scaled
+from page_rank.model.tools.provenance import CORE_LOCATION, CORE_METRICS, \
+    DEFAULT_ROUTER_PROVENANCE_NAMES, ROUTER_LOCATION, ROUTER_METRICS, \
+    ProvenanceWarning, provenance_table
+from page_rank.model.tools.recording import as_recording_policy, \
+    encode_ranks_record
+from page_rank.model.tools.spinnaker_adapter_interface import \
+    SpiNNakerAdapterInterface
+from page_rank.model.tools.utils import ITER_BITS, getLogger, \
+    ranks_from_recordings
+
+# Mirrors PageRankBase._model_based_max_atoms_per_core: a higher number would
+#   overflow the 8-bit semaphores used
+MAX_ATOMS_PER_CORE = 255
+
+# See c_models/src/neuron/vertex.c
+TIMEOUT_AFTER_N_TIME_STEP = 3
+
+# Application cores of a SpiNN-5 chip, out of 18: one runs the monitor and
+#   one is kept spare
+CORES_PER_CHIP = 16
+
+# See c_models/src/neuron/message/in_messages.h
+ITER_MASK = (1 << ITER_BITS) - 1
+N_ITER_BUFFERS = 1 << ITER_BITS
+
+# Checkpoints, see c_models/src/neuron/models/vertex_model_page_rank.c
+SENT_PACKET = 1 << 1
+RECEIVED_ALL = 1 << 2
+FINISHED = 1 << 3
+
+_logger = getLogger(__name__)
+
+
+class SpiNNakerEmulatorAdapter(SpiNNakerAdapterInterface):
+    """Pure-software SpiNNaker backend, emulating the C model on the host.
+
+    Reproduces, per timer tick, the behaviour of `vertex_do_timestep_update'
+    for every core: vertices are sliced onto cores of up to 255 atoms, and
+    packets are buffered per iteration following their ITER_BITS tag. The
+    `sark_app_*' semaphore is shared by all the cores of the application on a
+    chip, so the cores of a chip advance their iteration together once it is
+    lowered to 0 (or reset it after TIMEOUT_AFTER_N_TIME_STEP ticks without
+    progress). Cores are placed in order, `cores_per_chip' per chip, and the
+    8-bit wrap-around of the semaphore is not modelled. All vertices of all
+    cores are updated with array operations, so no board is needed.
+
+    Packets are delivered within the tick they are sent, unless dropped by
+    the optional traffic model:
+     - `packet_drop_rate': probability for a router to drop a packet
+     - `packets_per_ms': number of packets a core can receive per millisecond
+       of real time, i.e. `timestep * time_scale_factor' ms per tick
+
+    Ranks are recorded per core with the same layout as on SpiNNaker,
+    following the recording policy given to `build_page_rank_graph'.
+
+    Live output stands in for the live packet gatherer: the packets sent at
+    each tick are forwarded as EIEIO datagrams over local UDP, with the key
+    `core << 8 | index of the vertex on its core'.
+    """
+
+    def __init__(self, packet_drop_rate=0., packets_per_ms=None, seed=None,
+                 cores_per_chip=CORES_PER_CHIP):
+        SpiNNakerAdapterInterface.__init__(self)
+
+        self._cores_per_chip = cores_per_chip
+        self._packet_drop_rate = packet_drop_rate
+        self._packets_per_ms = packets_per_ms
+        self._rng = np.random.RandomState(seed)
+
+        # Set by simulation_setup(...)
+        self._timestep = None
+        self._time_scale_factor = None
+
+        # Set by build_page_rank_graph(...)
+        self._graph = None
+        self._n_cores = 0
+        self._core_of = None
+        self._chip_of = None
+
+        # Simulation state
+        self._time = 0
+        self._recording_policy = as_recording_policy(None)
+        self._recordings = []
+        self._last_recorded = None
+        self._provenance = None
+
+        # Set by activate_live_output(...)
+        self._live_receivers = []
+        self._live_socket = None
+
+    #
+    # Private functions, internal helpers
+    #
+
+    def _init_state(self, damping_factor, teleport, rank_init=None):
+        n, n_cores = self._graph.n_vertices, self._n_cores
+        n_chips = self._n_chips
+
+        # Global parameters, as u0.32 scaled integers
+        self._damping_factor = fp_scaled(damping_factor)
+
+        # neuron_t
+        self._teleport = np.zeros(n, dtype=np.int64) + fp_scaled(teleport)
+        if rank_init is None:
+            rank_init = 1. / n
+        self._rank = np.zeros(n, dtype=np.int64) + fp_scaled(rank_init)
+        self._curr_rank_acc = np.zeros(n, dtype=np.int64)
+        self._curr_rank_count = np.zeros(n, dtype=np.int64)
+        self._iter_state = np.zeros(n, dtype=np.uint8)
+
+        # Rank recordings of each core, restarting with the simulation
+        self._recordings = [[] for _ in range(n_cores)]
+        self._last_recorded = None
+
+        # Per core state: semaphores, deadlock detection and in_messages
+        self._curr_iter = np.zeros(n_cores, dtype=np.int64)
+        self._last_sema_value = np.full(n_cores, -1, dtype=np.int64)
+        self._last_progressing_iteration_age = np.zeros(n_cores, dtype=np.int64)
+        self._pending_acc = np.zeros((N_ITER_BUFFERS, n), dtype=np.int64)
+        self._pending_count = np.zeros((N_ITER_BUFFERS, n), dtype=np.int64)
+
+        self._provenance = dict(
+            total_multi_cast_sent_packets=0,
+            total_created_packets=0,
+            total_dropped_packets=0,
+            total_lost_dropped_packets=0,
+            total_missed_dropped_packets=0,
+            dropped_unconsumed_messages=0,
+            iteration_resets=np.zeros(n_cores, dtype=np.int64),
+            pre_synaptic_events=np.zeros(n_cores, dtype=np.int64),
+            input_buffer_overflows=np.zeros(n_cores, dtype=np.int64),
+            local_multicast_packets=np.zeros(n_chips, dtype=np.int64),
+            external_multicast_packets=np.zeros(n_chips, dtype=np.int64),
+            dropped_multicast_packets=np.zeros(n_chips, dtype=np.int64),
+        )
+
+    def _per_core(self, values):
+        return np.bincount(self._core_of, weights=values,
+                           minlength=self._n_cores).astype(np.int64)
+
+    @property
+    def _n_chips(self):
+        return int(self._chip_of[-1]) + 1 if self._n_cores else 0
+
+    def _start_iterations(self, time):
+        """Start of `vertex_do_timestep_update': checks the semaphores and
+        finishes or resets the iteration of the cores that are done or stuck.
+
+        :return: <np.array> mask of the cores starting an iteration
+        """
+        # Semaphore: raised when sending, lowered when finishing, shared by
+        #   the cores of a chip
+        state = self._iter_state
+        sema = self._per_core((state & SENT_PACKET > 0) &
+                              (state & FINISHED == 0))
+        sema = np.bincount(self._chip_of, weights=sema).astype(
+            np.int64)[self._chip_of]
+
+        # Keep track of progress to detect communication deadlocks
+        stuck = (0 < sema) & (sema == self._last_sema_value)
+        self._last_progressing_iteration_age = np.where(
+            stuck, self._last_progressing_iteration_age + 1, 0)
+        self._last_sema_value = sema
+        should_timeout = \
+            self._last_progressing_iteration_age >= TIMEOUT_AFTER_N_TIME_STEP
+
+        # Skip first iteration otherwise ranks will be erased
+        advance = (sema == 0) | should_timeout
+        if time == 0:
+            return np.ones(self._n_cores, dtype=bool)
+        if not advance.any():
+            return advance
+
+        # in_messages_increment_iteration_number: purge current buffer
+        buff_idx = self._curr_iter & ITER_MASK
+        purged = advance[self._core_of] & \
+            (np.arange(N_ITER_BUFFERS)[:, None] == buff_idx[self._core_of])
+        self._provenance['dropped_unconsumed_messages'] += int(
+            self._pending_count[purged].sum())
+        self._pending_acc[purged] = 0
+        self._pending_count[purged] = 0
+        self._curr_iter[advance] += 1
+
+        # vertex_model_iteration_did_finish / vertex_model_iteration_did_reset
+        reset = advance & should_timeout
+        self._provenance['iteration_resets'] += reset
+        if reset.any():
+            _logger.debug('[t=%04d] Resetting %d cores', time, reset.sum())
+
+        finish = (advance & ~should_timeout)[self._core_of]
+        self._rank[finish] = self._teleport[finish] + fp_mul(
+            self._damping_factor, self._curr_rank_acc[finish])
+
+        advanced = advance[self._core_of]
+        self._curr_rank_acc[advanced] = 0
+        self._curr_rank_count[advanced] = 0
+        self._iter_state[advanced] = 0
+
+        # Process the messages received early for the new iteration
+        new_idx = self._curr_iter & ITER_MASK
+        for idx in range(N_ITER_BUFFERS):
+            ready = advanced & (new_idx[self._core_of] == idx)
+            self._curr_rank_acc[ready] += self._pending_acc[idx, ready]
+            self._curr_rank_count[ready] += self._pending_count[idx, ready]
+            self._pending_acc[idx, ready] = 0
+            self._pending_count[idx, ready] = 0
+
+        return advance
+
+    def _send_packets(self):
+        """Sending loop of `vertex_do_timestep_update'.
+
+        :return: (<np.array> mask of the sending vertices, <np.array> their
+                  payload, <np.array> their iteration tag)
+        """
+        state = self._iter_state
+        sending = (state & (FINISHED | SENT_PACKET)) == 0
+
+        # vertex_model_will_send_pkt
+        has_incoming = self._graph.in_degrees > 0
+        self._iter_state[sending & has_incoming] |= SENT_PACKET
+        self._iter_state[sending & ~has_incoming] |= FINISHED
+
+        # vertex_model_get_broadcast_rank + in_messages_payload_format
+        out_degrees = self._graph.out_degrees
+        payload = np.where(out_degrees > 0,
+                           self._rank // np.maximum(out_degrees, 1),
+                           self._rank) & PAYLOAD_MASK
+        tag = self._curr_iter[self._core_of] & ITER_MASK
+
+        self._provenance['total_created_packets'] += int(
+            np.count_nonzero(sending))
+        return sending, payload, tag
+
+    def _init_routes(self):
+        """One multicast packet is routed per (source vertex, target core),
+        then dispatched to all the targets of the source on that core.
+        """
+        graph = self._graph
+        keys = graph.src.astype(np.int64) * self._n_cores + \
+            self._core_of[graph.dst]
+        packets, self._edge_packet = np.unique(keys, return_inverse=True)
+        self._packet_src = packets // self._n_cores
+        self._packet_core = packets % self._n_cores
+        self._packet_src_chip = self._chip_of[self._core_of[self._packet_src]]
+        self._packet_dst_chip = self._chip_of[self._packet_core]
+
+    def _route_packets(self, sending):
+        """Routes the multicast packets of the sending vertices to the cores
+        hosting their targets, dropping some of them with the traffic model.
+
+        :return: <np.array> ids of the edges along which a packet is received
+        """
+        packets = np.flatnonzero(sending[self._packet_src])
+        n_packets = len(packets)
+        self._provenance['total_multi_cast_sent_packets'] += n_packets
+
+        # Packets are routed by the chip of their source, then by the one of
+        #   their target if different
+        n_chips = self._n_chips
+        src_chip = self._packet_src_chip[packets]
+        dst_chip = self._packet_dst_chip[packets]
+        self._provenance['local_multicast_packets'] += np.bincount(
+            src_chip, minlength=n_chips)
+        self._provenance['external_multicast_packets'] += np.bincount(
+            dst_chip[src_chip != dst_chip], minlength=n_chips)
+
+        delivered = np.ones(n_packets, dtype=bool)
+        if self._packet_drop_rate > 0:
+            delivered &= self._rng.random_sample(n_packets) >= \
+                self._packet_drop_rate
+            self._provenance['dropped_multicast_packets'] += np.bincount(
+                dst_chip[~delivered], minlength=n_chips)
+
+        if self._packets_per_ms is not None:
+            capacity = int(self._packets_per_ms * self._timestep *
+                           self._time_scale_factor)
+
+            # Packets arrive in random order, the ones over capacity are lost
+            packet_core = self._packet_core[packets]
+            order = np.lexsort((self._rng.random_sample(n_packets),
+                                packet_core))
+            sorted_core = packet_core[order]
+            first_of_core = np.searchsorted(sorted_core, sorted_core)
+            arrival = np.empty(n_packets, dtype=np.int64)
+            arrival[order] = np.arange(n_packets) - first_of_core
+            overflow = delivered & (arrival >= capacity)
+            self._provenance['input_buffer_overflows'] += np.bincount(
+                packet_core[overflow], minlength=self._n_cores)
+            delivered &= ~overflow
+
+        n_dropped = n_packets - int(np.count_nonzero(delivered))
+        self._provenance['total_dropped_packets'] += n_dropped
+        self._provenance['total_lost_dropped_packets'] += n_dropped
+
+        received = np.zeros(len(self._packet_src), dtype=bool)
+        received[packets[delivered]] = True
+        return np.flatnonzero(received[self._edge_packet])
+
+    def _receive_packets(self, edges, payload, tag, sending):
+        """`in_messages_add_key_payload' and `vertex_model_receive_packet'
+        for the packets received along `edges'.
+        """
+        graph = self._graph
+        n = graph.n_vertices
+        if len(edges) == graph.n_edges:
+            src, dst = graph.src, graph.dst
+        else:
+            src, dst = graph.src[edges], graph.dst[edges]
+
+        # Packets of the current iteration of the target core are consumed,
+        #   others are buffered for the iteration they are tagged with
+        curr_tag = (self._curr_iter & ITER_MASK)[self._core_of]
+        sent_tags = np.unique(tag[sending])
+        for idx in sent_tags:
+            if len(sent_tags) > 1:
+                sel = tag[src] == idx
+                src_sel, dst_sel = src[sel], dst[sel]
+            else:
+                src_sel, dst_sel = src, dst
+            acc = np.bincount(dst_sel, weights=payload[src_sel],
+                              minlength=n).astype(np.int64)
+            count = np.bincount(dst_sel, minlength=n)
+            self._provenance['pre_synaptic_events'] += self._per_core(count)
+
+            consumed = curr_tag == idx
+            self._curr_rank_acc[consumed] += acc[consumed]
+            self._curr_rank_count[consumed] += count[consumed]
+            self._pending_acc[idx, ~consumed] += acc[~consumed]
+            self._pending_count[idx, ~consumed] += count[~consumed]
+
+    def _finish_vertices(self):
+        """`_has_received_all' / `_has_sent_packet' checkpoints."""
+        in_degrees = self._graph.in_degrees
+        received_all = (in_degrees > 0) & \
+            (self._curr_rank_count >= in_degrees)
+        self._iter_state[received_all] |= RECEIVED_ALL
+
+        state = self._iter_state
+        finish = (state & SENT_PACKET > 0) & (state & RECEIVED_ALL > 0)
+        self._iter_state[finish] |= FINISHED
+
+    def _live_keys(self):
+        """Key of each vertex, the live output being keyed per core."""
+        first = np.searchsorted(self._core_of, self._core_of)
+        return self._core_of << 8 | np.arange(len(self._core_of)) - first
+
+    def _send_live_packets(self, sending, payload, tag):
+        """Forwards the packets sent to the live output receivers."""
+        if self._live_socket is None:
+            self._live_socket = socket.socket(socket.AF_INET,
+                                              socket.SOCK_DGRAM)
+        packets = encode_eieio_key_payload(
+            self._live_keys()[sending], (payload | tag)[sending])
+        for receiver in self._live_receivers:
+            for packet in packets:
+                self._live_socket.sendto(packet, receiver.address)
+
+    def _record_ranks(self, time, started, is_last_tick):
+        """Records the rank of the vertices of each core at the beginning of
+        the iteration, following the recording policy.
+        """
+        mode, interval = self._recording_policy
+        firsts = np.searchsorted(self._core_of, np.arange(self._n_cores + 1))
+
+        changed = None
+        if mode == 'changed':
+            changed = np.ones(len(self._rank), dtype=bool) \
+                if self._last_recorded is None \
+                else self._rank != self._last_recorded
+            record = self._per_core(changed) > 0
+        elif mode == 'iterations':
+            record = started.copy()
+        elif mode == 'interval':
+            record = started & (self._curr_iter % interval == 0)
+        elif mode == 'final':
+            record = np.zeros(self._n_cores, dtype=bool)
+        else:
+            record = np.ones(self._n_cores, dtype=bool)
+        if is_last_tick:
+            record[:] = True
+
+        for core in np.flatnonzero(record):
+            lo, hi = firsts[core], firsts[core + 1]
+            self._recordings[core].append(encode_ranks_record(
+                time, self._rank[lo:hi],
+                None if changed is None else changed[lo:hi]))
+        if changed is not None:
+            self._last_recorded = self._rank.copy()
+
+    def _do_timestep_update(self, time, is_last_tick=False):
+        started = self._start_iterations(time)
+        self._record_ranks(time, started, is_last_tick)
+
+        sending, payload, tag = self._send_packets()
+        if self._live_receivers:
+            self._send_live_packets(sending, payload, tag)
+        edges = self._route_packets(sending)
+        self._receive_packets(edges, payload, tag, sending)
+        self._finish_vertices()
+
+    #
+    # Exposed functions
+    #
+
+    @property
+    def n_cores(self):
+        return self._n_cores
+
+    @property
+    def core_of_vertex(self):
+        """Core index hosting each vertex."""
+        return self._core_of
+
+    @property
+    def chip_of_core(self):
+        """Chip index hosting each core."""
+        return self._chip_of
+
+    @property
+    def iteration_resets(self):
+        """Number of iteration resets, per core."""
+        return self._provenance['iteration_resets']
+
+    @property
+    def pre_synaptic_events(self):
+        """Number of packets dispatched to a vertex, per core."""
+        return self._provenance['pre_synaptic_events']
+
+    def simulation_setup(self, timestep=.1, time_scale_factor=10, **kwargs):
+        """Setup the emulated SpiNNaker simulation framework
+
+        :param timestep: time interval between each timer tick, in ms
+        :param time_scale_factor: slow down factor of the timer ticks
+        :return: None
+        """
+        self._timestep = timestep
+        self._time_scale_factor = time_scale_factor
+        self._time = 0
+        self._recordings = []
+
+    def simulation_teardown(self):
+        """Tear down the emulated SpiNNaker simulation framework
+
+        :return: None
+        """
+        self._graph = None
+        if self._live_socket is not None:
+            self._live_socket.close()
+            self._live_socket = None
+
+    def build_page_rank_graph(self, graph, atoms_per_core=None,
+                              page_rank_kwargs=None, core_slices=None,
+                              recording_policy=None):
+        """Slice the Page Rank input graph onto the emulated cores.
+
+        :param graph: <PageRankGraph> input graph
+        :param atoms_per_core: number of vertices to set per core
+        :param page_rank_kwargs: `damping_factor', `teleport' term and optional
+                                 `rank_init', the same for every vertex or
+                                 <np.array> of each vertex
+        :param core_slices: boundaries of the vertices of each core, instead
+                            of `atoms_per_core', see
+                            partitioning.balanced_slices
+        :param recording_policy: ticks the ranks are recorded at, see
+                                 recording.as_recording_policy
+        :return: None
+        """
+        self._graph = graph
+        self._recording_policy = as_recording_policy(recording_policy)
+        if core_slices is not None:
+            self._n_cores = len(core_slices) - 1
+            self._core_of = np.repeat(np.arange(self._n_cores),
+                                      np.diff(core_slices))
+        else:
+            atoms_per_core = min(atoms_per_core or MAX_ATOMS_PER_CORE,
+                                 MAX_ATOMS_PER_CORE)
+            self._core_of = np.arange(graph.n_vertices) // atoms_per_core
+            self._n_cores = int(self._core_of[-1]) + 1 \
+                if graph.n_vertices else 0
+        self._chip_of = np.arange(self._n_cores) // self._cores_per_chip
+        with self._profiler.phase('routes'):
+            self._init_routes()
+        with self._profiler.phase('state'):
+            self._init_state(**(page_rank_kwargs or {}))
+
+        for receiver in self._live_receivers:
+            receiver.set_key_map(self._live_keys(), np.arange(graph.n_vertices))
+
+    def update_page_rank_graph(self, graph, page_rank_kwargs=None):
+        """Replaces the edges of the mapped graph, each vertex staying on its
+        core, and restarts the simulation from its first tick.
+
+        :param graph: <PageRankGraph> graph, with the same vertices
+        :param page_rank_kwargs: as in `build_page_rank_graph'
+        :return: None
+        """
+        self._graph = graph
+        self._init_routes()
+        self.reload_page_rank_parameters(page_rank_kwargs)
+
+    def reload_page_rank_parameters(self, page_rank_kwargs=None):
+        """Restarts the simulation from its first tick with new parameters,
+        keeping the graph mapped onto the same cores.
+
+        :param page_rank_kwargs: as in `build_page_rank_graph'
+        :return: None
+        """
+        self._time = 0
+        self._init_state(**(page_rank_kwargs or {}))
+
+    def activate_live_output(self, receiver):
+        """Forwards the ranks sent by the vertices at each tick to
+        `receiver', from the next run.
+
+        :param receiver: <LiveRanksReceiver> receiver
+        :return: None
+        """
+        self._live_receivers.append(receiver)
+        if self._graph is not None:
+            receiver.set_key_map(self._live_keys(),
+                                 np.arange(self._graph.n_vertices))
+
+    def simulation_run(self, run_time):
+        """Run the emulated simulation, for `run_time' ms of machine time.
+
+        Successive runs resume where the previous one stopped.
+
+        :return: None
+        """
+        n_ticks = int(round(run_time / self._timestep))
+        for time in range(self._time, self._time + n_ticks):
+            self._do_timestep_update(
+                time, is_last_tick=time == self._time + n_ticks - 1)
+        self._time += n_ticks
+
+    def extract_ranks(self, raw=False):
+        """Extract the per-iteration ranks computed during the simulation.
+
+        :param raw: return the u0.32 fixed-point ranks as uint32
+        :return: <np.array> ranks
+        """
+        firsts = np.searchsorted(self._core_of, np.arange(self._n_cores + 1))
+        with self._profiler.phase('convert'):
+            return ranks_from_recordings(
+                [(lo, hi - lo, b''.join(records)) for lo, hi, records in zip(
+                    firsts[:-1].tolist(), firsts[1:].tolist(),
+                    self._recordings)],
+                n_ticks=self._time, n_vertices=len(self._core_of), raw=raw,
+                policy=self._recording_policy)
+
+    def extract_recording_size(self):
+        """Number of bytes of ranks recorded, over all cores.
+
+        :return: <int> size
+        """
+        return sum(len(record) for records in self._recordings
+                   for record in records)
+
+    def extract_router_provenance(self, collect_names=None):
+        """Extract the router information for the given names.
+
+        Emulated core counters, e.g. `iteration_resets', can also be
+        collected, summed over all cores.
+
+        :type collect_names: [<str>] router entries to extract
+        :return: <dict> name-indexed names
+        """
+        if collect_names is None:
+            collect_names = DEFAULT_ROUTER_PROVENANCE_NAMES
+
+        res = dict().fromkeys(collect_names, 0)
+        for name in collect_names:
+            if name in self._provenance:
+                res[name] = int(np.sum(self._provenance[name]))
+        return res
+
+    def extract_provenance(self):
+        """Provenance counters of each router and each core of the graph.
+
+        Chip `i' is located at (i, 0), and its cores are numbered from 1,
+        core 0 running the monitor. Packets dropped following
+        `packet_drop_rate' are dropped by the router of their target chip,
+        the ones over `packets_per_ms' overflow the input buffer of their
+        target core. Timer overruns are not emulated.
+
+        :return: <dict> `routers' and `cores' tables, see
+                 provenance.router_table and provenance.core_table
+        """
+        prov = self._provenance
+        chip_of = self._chip_of.tolist()
+        firsts = np.searchsorted(self._chip_of, self._chip_of).tolist()
+        timer_tick = max(self._time - 1, 0)
+
+        routers = provenance_table(
+            [((chip, 0), {name: prov[name][chip] for name in ROUTER_METRICS
+                          if name in prov})
+             for chip in range(self._n_chips)],
+            ROUTER_LOCATION, list(ROUTER_METRICS))
+        cores = provenance_table(
+            [((chip_of[core], 0, core - firsts[core] + 1), dict(
+                pre_synaptic_events=prov['pre_synaptic_events'][core],
+                input_buffer_overflows=prov['input_buffer_overflows'][core],
+                timer_tick=timer_tick))
+             for core in range(self._n_cores)],
+            CORE_LOCATION, list(CORE_METRICS))
+        return dict(routers=routers, cores=cores)
+
+    def extract_pre_synaptic_events(self):
+        """Number of packets dispatched to the vertices of each core.
+
+        :return: <np.array> counts, in core order
+        """
+        return self.pre_synaptic_events.copy()
+
+    def extract_provenance_warnings(self):
+        """Warnings of the provenance counters of the simulation so far, and
+        of the emulated `iteration_resets' of each core and messages
+        `dropped_unconsumed_messages'.
+
+        The simulation is not torn down, so that it can be run again.
+
+        :return: [<ProvenanceWarning>] warnings, see
+                 provenance.provenance_warnings
+        """
+        warnings = SpiNNakerAdapterInterface.extract_provenance_warnings(self)
+
+        cores = self.extract_provenance()['cores'][list(CORE_LOCATION)]
+        warnings.extend(
+            ProvenanceWarning('iteration_resets', location, count)
+            for location, count in zip(
+                cores.tolist(), self._provenance['iteration_resets'].tolist())
+            if count > 0)
+        if self._provenance['dropped_unconsumed_messages'] > 0:
+            warnings.append(ProvenanceWarning(
+                'dropped_unconsumed_messages', None,
+                self._provenance['dropped_unconsumed_messages']))
+        return warnings
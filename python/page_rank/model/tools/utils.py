@@ -7,11 +7,14 @@ import sys
 from contextlib import contextmanager
 from functools import wraps
 
-from page_rank.model.tools.fixed_point import FXfamily
+from page_rank.model.tools.fixed_point import FXArray, FXfamily
 
 ITER_BITS = 2  # see c_models/src/neuron/messages/in_messages.h
 LOG_IMPORTANT = (logging.INFO + logging.WARNING) // 2
 
+# Directory of the on-disk caches, default is ~/.cache/page_rank
+CACHE_DIR_ENV_VAR = 'PAGE_RANK_CACHE_DIR'
+
 
 class PageRankNoConvergence(RuntimeError):
     pass
@@ -21,6 +24,20 @@ class FailedOnWarningError(RuntimeError):
     pass
 
 
+class InvalidGraphError(ValueError):
+    """Input graph with duplicate edges or dangling vertices.
+
+    The offenders are given by `duplicate_edges', indices of the edges
+    repeating an earlier one, and `dangling_vertices', ids of the vertices
+    without any edge.
+    """
+
+    def __init__(self, message, duplicate_edges=(), dangling_vertices=()):
+        ValueError.__init__(self, message)
+        self.duplicate_edges = duplicate_edges
+        self.dangling_vertices = dangling_vertices
+
+
 class GUITimeoutError(Exception):
     pass
 
@@ -37,6 +54,10 @@ def to_fp(n):
     return _fp_builder(n)
 
 
+def to_fp_array(n):
+    return FXArray(n, _fp_builder)
+
+
 def to_hex(fp):
     return fp.toBinaryString(logBase=4, twosComp=False)
 
@@ -98,6 +119,22 @@ def silence_output(enable=True, pipe_to=os.devnull):
     return _silencer() if enable else _no_op()
 
 
+def get_cache_dir():
+    """Directory of the on-disk caches, created if needed.
+
+    :return: <str> path, given by $PAGE_RANK_CACHE_DIR
+    """
+    path = os.environ.get(CACHE_DIR_ENV_VAR, os.path.join(
+        os.path.expanduser('~'), '.cache', 'page_rank'))
+    try:
+        os.makedirs(path)
+    except OSError:
+        # Already exists, possibly created by a concurrent process
+        if not os.path.isdir(path):
+            raise
+    return path
+
+
 def install_requirements(requirements_file=None):
     """Installs the requirements.txt file in the parent directory
 
@@ -174,33 +211,50 @@ def graph_visualiser(func):
     return decorator
 
 
-def extract_router_provenance(collect_names=None):
-    from spinn_front_end_common.utilities import globals_variables
-    from spinn_front_end_common.interface.interface_functions \
-        import RouterProvenanceGatherer
-
-    if collect_names is None:
-        collect_names = [
-            'total_multi_cast_sent_packets',
-            'total_created_packets',
-            'total_dropped_packets',
-            'total_missed_dropped_packets',
-            'total_lost_dropped_packets'
-        ]
+def ranks_from_recordings(recordings, n_ticks=None, n_vertices=None,
+                          raw=False, policy=None):
+    """Assembles the ranks recorded by each core into a single array.
+
+    Each core records one `timed_state_t' per tick: the uint32 time followed
+    by the u0.32 rank of each of its vertices. The raw buffers are
+    reinterpreted in place and scaled with a single operation per core.
+    Other recording policies are reconstructed by
+    recording.ranks_from_records.
+
+    :param recordings: list of (<int> first vertex id, <int> number of
+                       vertices, <buffer> recorded bytes), one per core
+    :param n_ticks: number of ticks to extract, default is the least recorded
+    :param n_vertices: total number of vertices, default is the last one
+                       recorded
+    :param raw: return the fixed-point ranks as uint32 instead of float64
+    :param policy: recording policy, see recording.as_recording_policy
+    :return: <np.array> (ticks x vertices) ranks
+    """
+    import numpy as np
+    from page_rank.model.tools.recording import as_recording_policy, \
+        ranks_from_records
 
-    m = globals_variables.get_simulator()
+    if as_recording_policy(policy)[0] != 'all':
+        return ranks_from_records(recordings, n_ticks, n_vertices, raw, policy)
 
-    router_provenance = RouterProvenanceGatherer()
-    router_prov = router_provenance(m._txrx, m._machine, m._router_tables, True)
+    rows = [(lo, n, np.frombuffer(data, dtype='<u4').reshape(-1, n + 1))
+            for lo, n, data in recordings]
 
-    res = dict().fromkeys(collect_names, 0)
-    for item in router_prov:
-        getLogger().debug('{} => {}'.format(item.names, item.value))
-        name = item.names[-1]
-        if name in collect_names:
-            res[name] += int(item.value)
+    if n_ticks is None:
+        n_ticks = min(len(r) for _, _, r in rows) if rows else 0
+    if n_vertices is None:
+        n_vertices = max(lo + n for lo, n, _ in rows) if rows else 0
 
-    return res
+    ranks = np.empty((n_ticks, n_vertices),
+                     dtype=np.uint32 if raw else np.float64)
+    for lo, n, r in rows:
+        states = r[:n_ticks, 1:]
+        if raw:
+            ranks[:, lo:lo + n] = states
+        else:
+            np.multiply(states, 1. / 2 ** _fp_builder.resolution,
+                        out=ranks[:, lo:lo + n])
+    return ranks
 
 
 def node_formatter(name):
@@ -250,7 +304,8 @@ def format_ranks_string(labels, ranks, diff_only=False, diff_max=50):
     return table.get_string()
 
 
-def compute_page_rank(g, labels, d, d_sum, tol, max_iter=100):
+def compute_page_rank(g, labels, d, d_sum, tol, max_iter=100,
+                      rank_init=None):
     """Return the PageRank of the nodes in the graph.
 
     Adapted to:
@@ -265,9 +320,12 @@ def compute_page_rank(g, labels, d, d_sum, tol, max_iter=100):
     :param g: input graph
     :param labels: labels of the nodes
     :param d: damping factor
-    :param d_sum: damping sum
+    :param d_sum: damping sum, or teleport term of each node, in `labels'
+                  order, for a personalized Page Rank
     :param tol: convergence tolerance
     :param max_iter: max iteration count before giving up on convergence
+    :param rank_init: initial rank of each node, in `labels' order, default
+                      is uniform
     :return: ( <dict> node-indexed dict of ranks, <int> # iterations required )
     """
     import networkx as nx
@@ -282,10 +340,16 @@ def compute_page_rank(g, labels, d, d_sum, tol, max_iter=100):
     zero = to_fp(0)
     one = to_fp(1.)
     n = to_fp(n)
-    d_sum = to_fp(d_sum)
+    if np.ndim(d_sum):
+        d_sum = dict(zip(labels, map(to_fp, d_sum)))
+    else:
+        d_sum = dict.fromkeys(w, to_fp(d_sum))
 
     # Iterate up to max_iter iterations
-    x = dict.fromkeys(w, one / n)
+    if rank_init is None:
+        x = dict.fromkeys(w, one / n)
+    else:
+        x = dict(zip(labels, map(to_fp, rank_init)))
     for iter_no in range(max_iter):
         getLogger().debug('\n===== TIME STEP = {} ====='.format(iter_no))
         x_last = x
@@ -312,12 +376,12 @@ def compute_page_rank(g, labels, d, d_sum, tol, max_iter=100):
         if d != one:
             for node in x:
                 prev = x[node]
-                x[node] = d_sum + d * x[node]
+                x[node] = d_sum[node] + d * x[node]
                 getLogger().debug(
                     "[idx=%3s] %f[%s] * %f[%s] + %f[%s] = %f[%s]" % (
                         node, d, to_hex(d), prev, to_hex(prev),
-                        d_sum,
-                        to_hex(d_sum), x[node],
+                        d_sum[node],
+                        to_hex(d_sum[node]), x[node],
                         to_hex(x[node])))
 
         # Check convergence, l1 norm
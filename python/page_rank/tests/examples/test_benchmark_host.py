@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from page_rank.examples.benchmark_host import BENCHMARKS, find_regressions, \
+    load_baseline, mk_case, run, save_baseline
+
+
+class TestBenchmarkHost(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._path = os.path.join(self._dir, 'baselines', 'benchmark.json')
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def test_benchmarks(self):
+        case = mk_case(100, 10, 'uniform', seed=0)
+        self.assertEqual(case.graph.n_vertices, 10)
+        for bench in BENCHMARKS.values():
+            bench(case)()
+
+    def test_baseline(self):
+        self.assertIsNone(load_baseline(self._path))
+        os.makedirs(os.path.dirname(self._path))
+        save_baseline(self._path, {'run': {'100': .5, '1000': .01}},
+                      generator='uniform')
+        save_baseline(self._path, {'run': {'100': .1}})
+
+        # Sizes not measured again are kept
+        baseline = load_baseline(self._path)
+        self.assertEqual(baseline['timings'],
+                         {'run': {'100': .1, '1000': .01}})
+        self.assertEqual(baseline['generator'], 'uniform')
+
+        self.assertEqual(find_regressions({'run': {'100': .11}}, baseline,
+                                          threshold=.2), [])
+        self.assertEqual(find_regressions({'run': {'100': .2, '1000': .05},
+                                           'new': {'100': 1.}}, baseline,
+                                          threshold=.2),
+                         [('run', '100', .1, .2), ('run', '1000', .01, .05)])
+
+        # Too short to be told apart from noise
+        self.assertEqual(find_regressions({'run': {'100': 1e-4}},
+                                          {'timings': {'run': {'100': 1e-5}}},
+                                          threshold=.2), [])
+        self.assertEqual(find_regressions({'run': {'100': 1.}}, None,
+                                          threshold=.2), [])
+
+    def test_run(self):
+        kwargs = dict(edge_counts=[100], edges_scale=10, generator='uniform',
+                      repeat=1, only=['validate', 'run'], baseline=self._path)
+        self.assertEqual(run(save=True, threshold=.2, **kwargs), 0)
+        self.assertEqual(sorted(load_baseline(self._path)['timings']),
+                         ['run', 'validate'])
+        self.assertEqual(run(threshold=1e6, **kwargs), 0)
+
+        with self.assertRaises(ValueError):
+            run(threshold=.2, **dict(kwargs, only=['unknown']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+
+from page_rank.examples.tune_time_scale_factor import MAX_ITER, _find_tsf, \
+    _next_tsf
+
+
+def _mk_probe(threshold, drop_signal=True, n_packets=10000):
+    """Probes of a simulation passing from `threshold', dropping packets
+    linearly less often up to it if `drop_signal'."""
+    tsfs = []
+
+    def probe(tsf):
+        tsfs.append(tsf)
+        rate = max(0., 1. - tsf / float(threshold)) if drop_signal else 0.
+        return dict(tsf=tsf, passed=tsf >= threshold,
+                    total_dropped_packets=int(rate * n_packets),
+                    total_multi_cast_sent_packets=n_packets)
+    return probe, tsfs
+
+
+class TestFindTsf(unittest.TestCase):
+
+    def _find(self, threshold, tsf_res, tsf_min=10, tsf_max=None,
+              drop_signal=True):
+        probe, tsfs = _mk_probe(threshold, drop_signal)
+        tsf = _find_tsf(tsf_min, tsf_res, tsf_max, [], probe)
+
+        # Lowest passing tsf, up to the resolution
+        res = tsf * tsf_res if tsf_res < 1 else tsf_res
+        self.assertGreaterEqual(tsf, threshold)
+        self.assertLessEqual(tsf - threshold, max(res, 1))
+        self.assertIn(tsf, tsfs + ([tsf_max] if tsf_max else []))
+        return tsfs
+
+    def test_drop_signal(self):
+        for threshold in [11, 57, 1234, 5000]:
+            for tsf_res in [1, 5, 10, .01, .1]:
+                for tsf_max in [None, 20000]:
+                    self._find(threshold, tsf_res, tsf_max=tsf_max)
+
+        # The drop rate model converges within a few probes
+        self.assertLessEqual(len(self._find(1234, 10)), 6)
+
+    def test_no_drop_signal(self):
+        for threshold in [11, 57, 1234, 5000, 40000]:
+            for tsf_res in [1, 5, 10, .01, .1]:
+                for tsf_max in [None, 100000]:
+                    self._find(threshold, tsf_res, tsf_max=tsf_max,
+                               drop_signal=False)
+
+    def test_reuses_probes(self):
+        probe, tsfs = _mk_probe(500)
+        probes = [probe(tsf) for tsf in [100, 400, 600]]
+        tsf = _find_tsf(10, 10, None, probes, probe)
+
+        # Starts within the known range (400, 600)
+        self.assertTrue(500 <= tsf <= 510)
+        self.assertTrue(all(400 < t < 600 for t in tsfs[3:]))
+        self.assertEqual(len(probes), len(tsfs))
+
+    def test_max_iter(self):
+        probe, tsfs = _mk_probe(10 ** 9, drop_signal=False)
+        with self.assertRaises(RuntimeError):
+            _find_tsf(10, 10, None, [], probe)
+        self.assertEqual(len(tsfs), MAX_ITER)
+
+    def test_next_tsf_above_lower(self):
+        # Estimate rounding to the lower bound, without upper bound
+        probes = [dict(tsf=100, passed=False, total_dropped_packets=1,
+                       total_multi_cast_sent_packets=10 ** 6)]
+        self.assertEqual(_next_tsf(probes, 100, None, lambda t: t * .001),
+                         101)
+
+
+if __name__ == '__main__':
+    unittest.main()
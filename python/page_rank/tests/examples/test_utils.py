@@ -0,0 +1,65 @@
+import time
+import unittest
+
+from page_rank.examples.utils import imap_processes
+
+
+def _square(x, delay=0.):
+    time.sleep(delay)
+    return x * x
+
+
+def _fail(x):
+    raise ValueError('bad %d' % x)
+
+
+class TestImapProcesses(unittest.TestCase):
+
+    def _run(self, fn, kwargs_list, **kwargs):
+        return list(imap_processes(fn, kwargs_list, poll_interval=.01,
+                                   **kwargs))
+
+    def test_single_worker(self):
+        # One run at a time: completed in submission order
+        results = self._run(_square, [dict(x=x) for x in range(4)],
+                            workers=1)
+        self.assertEqual([(i, result, error)
+                          for i, result, _, error in results],
+                         [(0, 0, None), (1, 1, None), (2, 4, None),
+                          (3, 9, None)])
+
+    def test_workers(self):
+        # Runs overlap, yielded in completion order: the slowest last
+        kwargs_list = [dict(x=0, delay=.5), dict(x=1), dict(x=2),
+                       dict(x=3)]
+        start = time.time()
+        results = self._run(_square, kwargs_list, workers=4)
+
+        self.assertLess(time.time() - start, 1.5)
+        self.assertEqual(results[-1][:2], (0, 0))
+        self.assertEqual(sorted((i, result) for i, result, _, _ in results),
+                         [(0, 0), (1, 1), (2, 4), (3, 9)])
+        self.assertGreaterEqual(results[-1][2], .5)
+
+    def test_child_exception(self):
+        results = self._run(_fail, [dict(x=1), dict(x=2)], workers=2)
+        self.assertEqual(sorted((i, result, error)
+                                for i, result, _, error in results),
+                         [(0, None, 'ValueError: bad 1'),
+                          (1, None, 'ValueError: bad 2')])
+
+    def test_timeout(self):
+        results = self._run(_square, [dict(x=2, delay=10.), dict(x=3)],
+                            workers=2, timeout=.3)
+        by_index = {i: (result, elapsed, error)
+                    for i, result, elapsed, error in results}
+
+        self.assertEqual(by_index[1], (9, by_index[1][1], None))
+        result, elapsed, error = by_index[0]
+        self.assertIsNone(result)
+        self.assertEqual(error, 'Timed out after 0.3 sec')
+        self.assertLess(elapsed, 5.)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from page_rank.model.tools import edge_list
+
+SNAP_TEXT = b"""# Directed graph
+# FromNodeId\tToNodeId
+0\t11
+0\t867
+11\t0
+867\t11
+"""
+
+CSV_TEXT = b"""# source,target
+B,C
+C,A
+A,B
+"""
+
+
+class TestEdgeList(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _write(self, name, content):
+        path = os.path.join(self._dir, name)
+        with (gzip.open if name.endswith('.gz') else open)(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_read_snap_gzip(self):
+        path = self._write('snap.txt.gz', SNAP_TEXT)
+
+        # Chunks smaller than a line, so lines span several reads
+        graph = edge_list.read_edge_list(path, chunk_size=3)
+
+        self.assertEqual(graph.labels, [0, 11, 867])
+        self.assertEqual(graph.src.tolist(), [0, 0, 1, 2])
+        self.assertEqual(graph.dst.tolist(), [1, 2, 0, 1])
+
+    def test_read_csv_labels(self):
+        path = self._write('graph.csv', CSV_TEXT)
+        graph = edge_list.read_edge_list(path, delimiter=',', chunk_size=6)
+
+        self.assertEqual(graph.labels, ['A', 'B', 'C'])
+        self.assertEqual(list(graph.label_edges()),
+                         [('B', 'C'), ('C', 'A'), ('A', 'B')])
+
+    def test_read_numeric_then_text_labels(self):
+        path = self._write('mixed.tsv', b'10\t2\n2\tx\nx\t10\n')
+        graph = edge_list.read_edge_list(path, chunk_size=5)
+
+        self.assertEqual(graph.labels, ['10', '2', 'x'])
+        self.assertEqual(list(graph.label_edges()),
+                         [('10', '2'), ('2', 'x'), ('x', '10')])
+
+    def test_odd_number_of_labels(self):
+        path = self._write('bad.txt', b'0 1\n2\n')
+
+        with self.assertRaises(ValueError):
+            edge_list.read_edge_list(path)
+
+    def test_load_from_cache(self):
+        path = self._write('snap.txt', SNAP_TEXT)
+        cache_dir = os.path.join(self._dir, 'cache')
+        os.makedirs(cache_dir)
+
+        graph = edge_list.load_edge_list(path, cache_dir=cache_dir)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+        # Same content, different file: served from the cache
+        os.rename(path, path + '.moved')
+        cached = edge_list.load_edge_list(path + '.moved', cache_dir=cache_dir)
+        self.assertEqual(cached.labels, graph.labels)
+        self.assertEqual(cached.src.tolist(), graph.src.tolist())
+        self.assertEqual(cached.dst.tolist(), graph.dst.tolist())
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import operator
+import unittest
+
+import numpy as np
+
+from page_rank.model.tools.fixed_point import FXArray, FXfamily, \
+    FXfamilyError, FXnum, FXoverflowError
+from page_rank.model.tools.utils import to_fp, to_fp_array
+
+_FAMILIES = [
+    FXfamily(n_bits=32),            # u0.32 of the ranks, see `to_fp'
+    FXfamily(n_bits=12, n_intbits=8),
+    FXfamily(n_bits=70),            # scaled values overflowing int64
+]
+
+
+class TestFXArray(unittest.TestCase):
+
+    def assertMatches(self, array, numbers):
+        self.assertIsInstance(array, FXArray)
+        self.assertEqual([int(v) for v in np.ravel(array.scaledval)],
+                         [x.scaledval for x in numbers])
+
+    @staticmethod
+    def _values(seed, size=500, low=-50., high=50.):
+        rng = np.random.RandomState(seed)
+        values = rng.uniform(low, high, size=size)
+        values[:4] = [0., -0., 1., -1.]
+        return values
+
+    def test_construction(self):
+        for family in _FAMILIES:
+            values = self._values(0)
+            self.assertMatches(FXArray(values, family),
+                               [FXnum(v, family) for v in values])
+
+            integers = np.arange(-20, 20)
+            self.assertMatches(FXArray(integers, family),
+                               [FXnum(int(v), family) for v in integers])
+
+        # Cast from another family
+        values = self._values(1)
+        x = FXArray(values, _FAMILIES[1])
+        for family in _FAMILIES:
+            self.assertMatches(FXArray(x, family),
+                               [FXnum(FXnum(v, _FAMILIES[1]), family)
+                                for v in values])
+
+        self.assertMatches(to_fp_array([.15, .85]), [to_fp(.15), to_fp(.85)])
+
+    def test_arithmetic(self):
+        ops = [operator.add, operator.sub, operator.mul, operator.truediv]
+
+        for family in _FAMILIES:
+            a = self._values(2, low=-8., high=8.)
+            b = self._values(3, low=-8., high=8.)
+            b[abs(b) < .25] = .5
+            x, y = FXArray(a, family), FXArray(b, family)
+            fx = [FXnum(v, family) for v in a]
+            fy = [FXnum(v, family) for v in b]
+
+            for op in ops:
+                self.assertMatches(op(x, y),
+                                   [op(u, v) for u, v in zip(fx, fy)])
+
+                # With scalars, on either side
+                self.assertMatches(op(x, 3), [op(u, 3) for u in fx])
+                self.assertMatches(op(x, fy[4]), [op(u, fy[4]) for u in fx])
+                self.assertMatches(op(fx[4], y), [op(fx[4], v) for v in fy])
+                self.assertMatches(op(2.5, y), [op(2.5, v) for v in fy])
+
+            self.assertMatches(x >> 3, [u >> 3 for u in fx])
+            self.assertMatches(x << 2, [u << 2 for u in fx])
+            self.assertMatches(-x, [-u for u in fx])
+            self.assertMatches(abs(x), [abs(u) for u in fx])
+
+    def test_mul_limbs(self):
+        # u0.32 ranks times counts: too large for a plain int64 product
+        family = _FAMILIES[0]
+        rng = np.random.RandomState(4)
+        a = rng.randint(0, 2 ** 32, size=1000)
+        b = rng.randint(0, 2 ** 40, size=1000)
+        x = FXArray(family=family, scaled_value=a)
+        y = FXArray(family=family, scaled_value=b)
+        self.assertEqual(x.scaledval.dtype, np.int64)
+
+        fx = [FXnum(family=family, scaled_value=int(v)) for v in a]
+        fy = [FXnum(family=family, scaled_value=int(v)) for v in b]
+        self.assertMatches(x * y, [u * v for u, v in zip(fx, fy)])
+        self.assertMatches(x / y, [u / v for u, v in zip(fx, fy)])
+
+    def test_reductions(self):
+        for family in _FAMILIES:
+            values = self._values(5, low=-1., high=1.)
+            x = FXArray(values, family)
+            fx = [FXnum(v, family) for v in values]
+
+            total = fx[0]
+            for u in fx[1:]:
+                total += u
+            self.assertEqual(x.sum().scaledval, total.scaledval)
+            self.assertEqual(x.min().scaledval, min(fx).scaledval)
+            self.assertEqual(x.max().scaledval, max(fx).scaledval)
+
+            rows = x.reshape(50, 10).sum(axis=1)
+            self.assertMatches(rows, [sum(fx[i:i + 10], family(0))
+                                      for i in range(0, 500, 10)])
+
+    def test_conversions(self):
+        for family in _FAMILIES:
+            values = self._values(6)
+            x = FXArray(values, family)
+            fx = [FXnum(v, family) for v in values]
+
+            self.assertEqual(x.to_float().tolist(), [float(u) for u in fx])
+            self.assertEqual([u.scaledval for u in x.tolist()],
+                             [u.scaledval for u in fx])
+            self.assertEqual(x[7].scaledval, fx[7].scaledval)
+            self.assertMatches(x[10:20], fx[10:20])
+
+            x[3] = 2.75
+            self.assertEqual(x[3].scaledval, FXnum(2.75, family).scaledval)
+            self.assertTrue((x == x.copy()).all())
+            self.assertEqual((x < 0).tolist(), [u < 0 for u in x.tolist()])
+
+    def test_errors(self):
+        family = _FAMILIES[1]
+        x = FXArray([1.5, -2.5], family)
+
+        # Magnitude limited to 2 ** (8 - 1), like FXnum
+        with self.assertRaises(FXoverflowError):
+            FXArray([200.], family)
+        with self.assertRaises(FXoverflowError):
+            x * 100
+        with self.assertRaises(FXoverflowError):
+            x << 8
+
+        with self.assertRaises(FXfamilyError):
+            x + FXArray([1.], _FAMILIES[0])
+        with self.assertRaises(FXfamilyError):
+            x * FXnum(1., _FAMILIES[0])
+        with self.assertRaises(ZeroDivisionError):
+            x / FXArray([1., 0.], family)
+        with self.assertRaises(ValueError):
+            FXArray([np.nan], family)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import unittest
+
+import numpy as np
+import scipy.sparse
+
+from page_rank.model.tools.graph import PageRankGraph
+
+EDGES = [
+    ('A', 'B'),
+    ('A', 'C'),
+    ('B', 'D'),
+    ('C', 'A'),
+    ('C', 'B'),
+    ('C', 'D'),
+    ('D', 'C'),
+]
+
+
+class TestPageRankGraph(unittest.TestCase):
+
+    def test_from_edges_interns_labels(self):
+        graph = PageRankGraph.from_edges(EDGES)
+
+        self.assertEqual(graph.labels, ['A', 'B', 'C', 'D'])
+        self.assertEqual(graph.n_vertices, 4)
+        self.assertEqual(graph.n_edges, 7)
+        self.assertEqual(graph.src.dtype, np.int32)
+        self.assertEqual(list(graph.label_edges()), EDGES)
+
+    def test_from_edges_with_labels(self):
+        graph = PageRankGraph.from_edges(EDGES, labels=['D', 'C', 'B', 'A'])
+
+        self.assertEqual(graph.src.tolist(), [3, 3, 2, 1, 1, 1, 0])
+        self.assertEqual(list(graph.label_edges()), EDGES)
+
+    def test_from_edges_unknown_label(self):
+        with self.assertRaises(ValueError):
+            PageRankGraph.from_edges(EDGES, labels=['A', 'B', 'C'])
+
+    def test_from_edges_mixed_label_types(self):
+        edges = [(1, 'a'), ('a', '1'), ('1', 1)]
+
+        graph = PageRankGraph.from_edges(edges, labels=[1, 'a', '1'])
+        self.assertEqual(graph.src.tolist(), [0, 1, 2])
+        self.assertEqual(graph.dst.tolist(), [1, 2, 0])
+        self.assertEqual(list(graph.label_edges()), edges)
+
+        graph = PageRankGraph.from_edges(edges)
+        self.assertEqual(graph.labels, [1, '1', 'a'])
+        self.assertEqual(list(graph.label_edges()), edges)
+
+    def test_degrees(self):
+        graph = PageRankGraph.from_edges(EDGES)
+
+        self.assertEqual(graph.out_degrees.tolist(), [2, 1, 3, 1])
+        self.assertEqual(graph.in_degrees.tolist(), [1, 2, 2, 2])
+
+    def test_duplicate_edges(self):
+        edges = np.array([[2, 0], [0, 1], [2, 0], [1, 0], [0, 1], [2, 0]])
+        graph = PageRankGraph.from_input(edges)
+
+        self.assertEqual(graph.duplicate_edges().tolist(), [2, 4, 5])
+        self.assertEqual(graph.without_edges(graph.duplicate_edges())
+                         .edge_list().tolist(), [[2, 0], [0, 1], [1, 0]])
+
+    def test_duplicate_edges_sorted_chunks(self):
+        edges = np.array([[0, 1], [0, 1], [0, 2], [1, 0], [1, 0], [1, 0]])
+        graph = PageRankGraph.from_input(edges)
+
+        # Duplicates across chunk boundaries
+        for chunk_size in [1, 2, 4, 100]:
+            self.assertEqual(graph.duplicate_edges(chunk_size).tolist(),
+                             [1, 4, 5])
+
+    def test_dangling_vertices(self):
+        graph = PageRankGraph.from_edges([('A', 'B'), ('B', 'A'), ('D', 'B')],
+                                         labels=['A', 'B', 'C', 'D', 'E'])
+        self.assertEqual(graph.dangling_vertices().tolist(), [2, 4])
+
+        graph = graph.without_vertices(graph.dangling_vertices())
+        self.assertEqual(graph.labels, ['A', 'B', 'D'])
+        self.assertEqual(list(graph.label_edges()),
+                         [('A', 'B'), ('B', 'A'), ('D', 'B')])
+
+    def test_csr_csc(self):
+        graph = PageRankGraph.from_input(np.array([[2, 0], [0, 1], [1, 0]]))
+
+        self.assertEqual(graph.csr_offsets.tolist(), [0, 1, 2, 3])
+        self.assertEqual(graph.csr_targets.tolist(), [1, 0, 0])
+        self.assertEqual(graph.csc_offsets.tolist(), [0, 2, 3, 3])
+        self.assertEqual(graph.csc_sources.tolist(), [2, 1, 0])
+
+    def test_from_int32_array_no_copy(self):
+        edges = np.array([[0, 1], [1, 2], [2, 0]], dtype=np.int32)
+        graph = PageRankGraph.from_input(edges)
+
+        self.assertTrue(np.may_share_memory(graph.src, edges))
+        self.assertTrue(np.may_share_memory(graph.dst, edges))
+
+    def test_from_scipy_csr_no_copy(self):
+        m = scipy.sparse.csr_matrix(np.array([[0, 1, 1], [0, 0, 1], [1, 0, 0]]))
+        graph = PageRankGraph.from_input(m)
+
+        self.assertIs(graph.csr_targets, m.indices)
+        self.assertIs(graph.csr_offsets, m.indptr)
+        self.assertEqual(graph.src.tolist(), [0, 0, 1, 2])
+        self.assertEqual(graph.dst.tolist(), [1, 2, 2, 0])
+
+    def test_from_scipy_coo(self):
+        m = scipy.sparse.coo_matrix(([1, 1], ([0, 1], [1, 0])), shape=(2, 2))
+        graph = PageRankGraph.from_input(m, labels=['x', 'y'])
+
+        self.assertEqual(list(graph.label_edges()), [('x', 'y'), ('y', 'x')])
+
+    def test_with_edges(self):
+        graph = PageRankGraph.from_edges(EDGES)
+        graph.in_degrees, graph.out_degrees  # Updated, not recomputed
+
+        removed = graph.label_edge_ids([('C', 'B'), ('A', 'C')])
+        added = graph.label_edge_ids([('B', 'A'), ('D', 'A')])
+        updated = graph.with_edges(added, removed)
+
+        expected = [e for e in EDGES if e not in (('C', 'B'), ('A', 'C'))] + \
+            [('B', 'A'), ('D', 'A')]
+        self.assertEqual(list(updated.label_edges()), expected)
+        self.assertEqual(updated.labels, graph.labels)
+        self.assertEqual(updated.out_degrees.tolist(), [1, 2, 2, 2])
+        self.assertEqual(updated.in_degrees.tolist(), [3, 1, 1, 2])
+        self.assertEqual(graph.out_degrees.tolist(), [2, 1, 3, 1])
+
+        with self.assertRaises(ValueError):
+            graph.with_edges(removed=[[1, 0]])
+        with self.assertRaises(ValueError):
+            graph.label_edge_ids([('A', 'E')])
+
+    def test_label_edge_ids_unlabelled(self):
+        graph = PageRankGraph.from_input(np.array([[0, 1], [1, 0]]))
+        ids = np.array([[1, 0]])
+
+        self.assertEqual(graph.label_edge_ids(ids).tolist(), [[1, 0]])
+        self.assertEqual(graph.label_edge_ids(None).shape, (0, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from page_rank.model.tools import graph_file
+from page_rank.model.tools.graph import PageRankGraph
+from page_rank.model.tools.page_rank_engine import compute_page_rank
+
+EDGES = [
+    ('A', 'B'),
+    ('A', 'C'),
+    ('B', 'D'),
+    ('C', 'A'),
+    ('C', 'B'),
+    ('C', 'D'),
+    ('D', 'C'),
+]
+
+
+class TestGraphFile(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._path = os.path.join(self._dir,
+                                  'graph' + graph_file.GRAPH_FILE_EXT)
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _round_trip(self, graph):
+        graph_file.save_graph(self._path, graph)
+        return graph_file.open_graph(self._path)
+
+    def _assert_same_graph(self, graph, loaded):
+        self.assertEqual(loaded.n_vertices, graph.n_vertices)
+        self.assertEqual(sorted(loaded.label_edges()),
+                         sorted(graph.label_edges()))
+        for name in ['out_degrees', 'in_degrees', 'csr_offsets', 'csr_targets',
+                     'csc_offsets', 'csc_sources']:
+            self.assertEqual(getattr(loaded, name).tolist(),
+                             getattr(graph, name).tolist())
+
+    def test_string_labels(self):
+        graph = PageRankGraph.from_edges(EDGES + [(u'\xe9', 'A')])
+        loaded = self._round_trip(graph)
+
+        self._assert_same_graph(graph, loaded)
+        self.assertEqual(list(loaded.labels), graph.labels)
+        self.assertEqual(loaded.labels[-1], u'\xe9')
+        self.assertEqual(loaded.labels[1:3], ['B', 'C'])
+
+    def test_int_labels(self):
+        graph = PageRankGraph.from_edges([(10, 2 ** 40), (2 ** 40, 10)])
+        loaded = self._round_trip(graph)
+
+        self._assert_same_graph(graph, loaded)
+        self.assertEqual(list(loaded.labels), [10, 2 ** 40])
+
+    def test_no_labels(self):
+        graph = PageRankGraph.from_input(np.array([[0, 1], [1, 2], [2, 0]]))
+        loaded = self._round_trip(graph)
+
+        self._assert_same_graph(graph, loaded)
+        self.assertEqual(list(loaded.labels), [0, 1, 2])
+
+    def test_memory_mapped(self):
+        loaded = self._round_trip(PageRankGraph.from_edges(EDGES))
+
+        for a in [loaded.src, loaded.dst, loaded.csc_sources,
+                  loaded.in_degrees]:
+            self.assertIsInstance(a.base, np.memmap)
+            self.assertFalse(a.flags.writeable)
+
+    def test_page_rank(self):
+        graph = PageRankGraph.from_edges(EDGES)
+        graph_file.save_graph(self._path, graph)
+        loaded = PageRankGraph.from_input(self._path)
+
+        expected, it = compute_page_rank(graph, .85, .0375, 1e-5)
+        ranks, loaded_it = compute_page_rank(loaded, .85, .0375, 1e-5)
+        self.assertEqual(it, loaded_it)
+        self.assertTrue(np.array_equal(ranks, expected))
+
+    def test_not_a_graph_file(self):
+        with open(self._path, 'wb') as f:
+            f.write(b'\0' * 128)
+
+        with self.assertRaises(ValueError):
+            graph_file.open_graph(self._path)
+
+
+if __name__ == '__main__':
+    unittest.main()
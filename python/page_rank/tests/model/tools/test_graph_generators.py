@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+
+from page_rank.model.tools.graph import PageRankGraph
+from page_rank.model.tools.graph_generators import GENERATORS, \
+    preferential_attachment_graph, rmat_graph, uniform_graph
+
+N_VERTICES = 2000
+N_EDGES = 20000
+
+
+class TestGraphGenerators(unittest.TestCase):
+
+    def _assert_valid(self, edges, n_vertices, n_edges):
+        self.assertEqual(edges.shape, (n_edges, 2))
+        self.assertTrue(((edges >= 0) & (edges < n_vertices)).all())
+
+        graph = PageRankGraph.from_input(edges)
+        self.assertEqual(graph.n_vertices, n_vertices)
+        self.assertEqual(len(graph.duplicate_edges()), 0)
+        self.assertEqual(len(graph.dangling_vertices()), 0)
+
+    def test_valid_graphs(self):
+        for name, generator in sorted(GENERATORS.items()):
+            edges = generator(N_VERTICES, N_EDGES, seed=0)
+            self._assert_valid(edges, N_VERTICES, N_EDGES)
+
+    def test_bounds(self):
+        for name, generator in sorted(GENERATORS.items()):
+            # One edge per vertex, and complete graph with self-loops
+            self._assert_valid(generator(50, 50, seed=0), 50, 50)
+            self._assert_valid(generator(10, 100, seed=0), 10, 100)
+
+            self.assertRaises(ValueError, generator, 10, 9)
+            self.assertRaises(ValueError, generator, 10, 101)
+
+    def test_seed(self):
+        for name, generator in sorted(GENERATORS.items()):
+            edges = generator(N_VERTICES, N_EDGES, seed=42)
+            self.assertTrue(np.array_equal(
+                edges, generator(N_VERTICES, N_EDGES, seed=42)))
+            self.assertTrue(np.array_equal(edges, generator(
+                N_VERTICES, N_EDGES, seed=np.random.RandomState(42))))
+            self.assertFalse(np.array_equal(
+                edges, generator(N_VERTICES, N_EDGES, seed=43)))
+
+    def test_power_law_in_degrees(self):
+        def max_in_degree(edges):
+            return np.bincount(edges[:, 1], minlength=N_VERTICES).max()
+
+        uniform = max_in_degree(uniform_graph(N_VERTICES, N_EDGES, seed=0))
+        self.assertLess(uniform, 4 * N_EDGES // N_VERTICES)
+
+        # Hubs of the power-law models are way above the average in-degree
+        for generator in (rmat_graph, preferential_attachment_graph):
+            skewed = max_in_degree(generator(N_VERTICES, N_EDGES, seed=0))
+            self.assertGreater(skewed, 5 * uniform)
+
+
+if __name__ == '__main__':
+    unittest.main()
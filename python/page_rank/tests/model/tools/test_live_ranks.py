@@ -0,0 +1,105 @@
+import socket
+import struct
+import unittest
+
+import numpy as np
+
+from page_rank.model.tools.live_ranks import MAX_PAIRS_PER_PACKET, \
+    LiveRanksReceiver, decode_eieio_key_payload, encode_eieio_key_payload
+from page_rank.model.tools.page_rank_engine import FP_SCALE
+from page_rank.model.tools.spinnaker_emulator import SpiNNakerEmulatorAdapter
+from page_rank.tests.model.tools.test_spinnaker_emulator import \
+    _mk_random_graph
+
+
+class TestLiveRanks(unittest.TestCase):
+
+    @staticmethod
+    def _send(receiver, keys, payloads):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        for packet in encode_eieio_key_payload(keys, payloads):
+            sock.sendto(packet, receiver.address)
+        sock.close()
+
+    def test_eieio_round_trip(self):
+        keys = np.arange(70, dtype=np.uint32) + (7 << 8)
+        payloads = np.arange(70, dtype=np.uint32) * 0x01010101
+
+        packets = encode_eieio_key_payload(keys, payloads)
+        self.assertEqual(len(packets), -(-70 // MAX_PAIRS_PER_PACKET))
+        decoded = [decode_eieio_key_payload(packet) for packet in packets]
+        self.assertTrue(np.array_equal(
+            np.concatenate([k for k, _ in decoded]), keys))
+        self.assertTrue(np.array_equal(
+            np.concatenate([p for _, p in decoded]), payloads))
+
+    def test_eieio_key_prefix(self):
+        # Upper half-word prefix
+        header = 1 << 15 | 1 << 14 | 3 << 10 | 1
+        packet = struct.pack('<HHII', header, 0x12, 0x34, 5)
+        keys, payloads = decode_eieio_key_payload(packet)
+        self.assertEqual(keys.tolist(), [0x120034])
+        self.assertEqual(payloads.tolist(), [5])
+
+        # Payload prefix not supported
+        with self.assertRaises(ValueError):
+            decode_eieio_key_payload(struct.pack('<HI', 1 << 13 | 3 << 10, 0))
+
+    def test_receiver_rows(self):
+        rows = []
+        receiver = LiveRanksReceiver(
+            [2, 0, 1], rank_order=[2, 0, 1],
+            callback=lambda it, ranks: rows.append((it, ranks)))
+        receiver.set_key_map(np.array([30, 10, 20]), np.array([2, 0, 1]))
+
+        # Ranks of 6 iterations, the tag wrapping around, vertex 2 missing
+        #   iteration 1
+        ranks = [(.25, .5, .25), (.1, .6, .3), (.2, .4, .4), (.3, .3, .4),
+                 (.4, .2, .4), (.5, .2, .3)]
+        for iteration, row in enumerate(ranks):
+            payloads = (np.array(row) * FP_SCALE).astype(np.int64) // \
+                [2, 1, 1] & ~3 | iteration & 3
+            keys = [10, 20, 30]
+            if iteration == 1:
+                keys, payloads = keys[:2], payloads[:2]
+            self._send(receiver, keys, payloads)
+        receiver.close()
+
+        received = list(receiver.rows())
+        self.assertEqual([it for it, _ in received], list(range(6)))
+        self.assertEqual([it for it, _ in rows], list(range(6)))
+
+        # Input order, each rank known to `out_degree * 4' units
+        expected = np.array(ranks)[:, [2, 0, 1]]
+        expected[1, 0] = np.nan
+        self.assertTrue(np.allclose([row for _, row in received], expected,
+                                    rtol=0, atol=9. / FP_SCALE,
+                                    equal_nan=True))
+
+    def test_simulation_stream_ranks(self):
+        from page_rank.model.tools.simulation import PageRankSimulation
+
+        graph = _mk_random_graph(400, 2000, seed=3)
+
+        rows = []
+        adapter = SpiNNakerEmulatorAdapter()
+        with PageRankSimulation(3., graph, use_cache=False,
+                                vertex_order='rcm',
+                                spinnaker_adapter=adapter) as s:
+            receiver = s.stream_ranks(
+                callback=lambda it, ranks: rows.append(it))
+            s.run(atoms_per_core=100)
+            ranks = adapter.extract_ranks()[:, s._rank_order]
+        received = list(receiver.rows())
+
+        # One row per tick, as recorded
+        self.assertEqual(rows, list(range(30)))
+        self.assertEqual(len(received), 30)
+        tol = (graph.out_degrees.max() * 4 + 1.) / FP_SCALE
+        for iteration, row in received:
+            self.assertTrue(np.allclose(row, ranks[iteration], rtol=0,
+                                        atol=tol))
+
+
+if __name__ == '__main__':
+    unittest.main()
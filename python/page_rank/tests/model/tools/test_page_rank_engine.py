@@ -0,0 +1,131 @@
+import unittest
+
+import networkx as nx
+import numpy as np
+
+import page_rank.model.tools.page_rank_engine as engine
+from page_rank.model.tools.fixed_point import FXnum
+from page_rank.model.tools.graph import PageRankGraph
+from page_rank.model.tools.utils import PageRankNoConvergence, \
+    compute_page_rank, to_fp
+
+
+def _mk_random_edges(n_vertices, n_edges, seed):
+    rng = np.random.RandomState(seed)
+
+    # One outgoing edge per vertex, no sink (the scalar engine divides by 0)
+    edges = set(zip(range(n_vertices),
+                    rng.randint(n_vertices, size=n_vertices)))
+    while len(edges) < n_edges:
+        edges.add(tuple(rng.randint(n_vertices, size=2)))
+    return sorted(edges)
+
+
+class TestFixedPointHelpers(unittest.TestCase):
+
+    @staticmethod
+    def _fx(scaled_value):
+        return FXnum(family=to_fp(0).family, scaled_value=int(scaled_value))
+
+    def test_mul_matches_fxnum(self):
+        rng = np.random.RandomState(0)
+        a = rng.randint(0, 2 ** 33, size=1000)
+        b = rng.randint(0, 2 ** 33, size=1000)
+
+        expected = [(self._fx(x) * self._fx(y)).scaledval
+                    for x, y in zip(a, b)]
+        self.assertEqual(engine.fp_mul(a, b).tolist(), expected)
+
+    def test_mul_bound(self):
+        # Largest documented operands, |a * b| < 2 ** 79
+        a, b = 2 ** 32 - 1, 2 ** 47 - 1
+
+        expected = (self._fx(a) * self._fx(b)).scaledval
+        self.assertEqual(engine.fp_mul([a], [b]).tolist(), [expected])
+        self.assertEqual(engine.fp_mul([b], [a]).tolist(), [expected])
+
+    def test_div_count_matches_fxnum(self):
+        rng = np.random.RandomState(1)
+        a = rng.randint(0, 2 ** 32, size=1000)
+        counts = rng.randint(1, 300, size=1000)
+
+        expected = [(self._fx(x) / to_fp(int(c))).scaledval
+                    for x, c in zip(a, counts)]
+        self.assertEqual(engine.fp_div_count(a, counts).tolist(), expected)
+
+
+class TestComputePageRank(unittest.TestCase):
+
+    def _assert_matches_scalar_engine(self, edges, d=.85, tol=1e-5,
+                                      teleport=None, rank_init=None):
+        g = nx.DiGraph()
+        g.add_edges_from(edges)
+        labels = sorted(g.nodes())
+        n = len(labels)
+        d = float(to_fp(d))
+        d_sum = float(to_fp((1. - d) / n))
+        if teleport is not None:
+            d_sum = engine.fp_to_float(engine.fp_scaled(
+                (1. - d) * np.asarray(teleport)))
+
+        expected, expected_it = compute_page_rank(g, labels, d, d_sum, tol,
+                                                  rank_init=rank_init)
+
+        graph = PageRankGraph.from_edges(edges, labels)
+        computed, it = engine.compute_page_rank(graph, d, d_sum, tol,
+                                                rank_init=rank_init)
+
+        self.assertEqual(it, expected_it)
+        self.assertTrue(np.array_equal(computed, expected))
+
+    def test_simple_4_vertices(self):
+        self._assert_matches_scalar_engine([
+            ('A', 'B'), ('A', 'C'), ('B', 'D'), ('C', 'A'), ('C', 'B'),
+            ('C', 'D'), ('D', 'C'),
+        ])
+
+    def test_no_damping(self):
+        self._assert_matches_scalar_engine([
+            ('A', 'B'), ('A', 'C'), ('B', 'D'), ('C', 'A'), ('C', 'B'),
+            ('C', 'D'), ('D', 'C'),
+        ], d=1 - 10e-10)
+
+    def test_random_graph(self):
+        self._assert_matches_scalar_engine(_mk_random_edges(200, 1000, seed=42))
+
+    def test_personalized(self):
+        edges = _mk_random_edges(200, 1000, seed=3)
+        teleport = np.zeros(200)
+        teleport[[0, 17, 42]] = 1. / 3
+
+        self._assert_matches_scalar_engine(edges, teleport=teleport)
+
+    def test_warm_start(self):
+        def ranks(edges, rank_init=None):
+            graph = PageRankGraph.from_edges(edges, labels=range(2000))
+            return engine.compute_page_rank(graph, .85, .15 / 2000, 1e-5,
+                                            rank_init=rank_init)
+
+        # A few edges changed
+        edges = _mk_random_edges(2000, 10000, seed=4)
+        updated = edges[:-5] + [(0, 1), (1, 2), (2, 3)]
+        previous, _ = ranks(edges)
+        _, cold_it = ranks(updated)
+        _, warm_it = ranks(updated, rank_init=previous)
+        self.assertLess(warm_it, cold_it / 2)
+
+        # Same warm start in the scalar engine
+        edges = _mk_random_edges(200, 1000, seed=4)
+        previous, _ = engine.compute_page_rank(
+            PageRankGraph.from_edges(edges), .85, .15 / 200, 1e-5)
+        self._assert_matches_scalar_engine(edges[:-5] + [(0, 1), (1, 2)],
+                                           rank_init=previous)
+
+    def test_no_convergence(self):
+        graph = PageRankGraph.from_input(np.array(_mk_random_edges(50, 200, 7)))
+        with self.assertRaises(PageRankNoConvergence):
+            engine.compute_page_rank(graph, .85, .15 / 50, 1e-100, max_iter=10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import unittest
+
+import numpy as np
+
+from page_rank.model.tools.graph import PageRankGraph
+from page_rank.model.tools.graph_generators import rmat_graph
+from page_rank.model.tools.partitioning import VERTEX_ORDERS, \
+    balanced_slices, core_loads, label_propagation_order, load_report, \
+    traffic_report
+
+
+def _mk_planted_graph(n_blocks, block_size, seed):
+    """Blocks of densely connected vertices, with shuffled ids."""
+    rng = np.random.RandomState(seed)
+    n = n_blocks * block_size
+    src = np.repeat(np.arange(n), 10)
+    dst = src // block_size * block_size + rng.randint(block_size,
+                                                       size=len(src))
+    dst[rng.random_sample(len(src)) < .05] = rng.randint(n)
+    keys = np.unique(src.astype(np.int64) << 32 | dst)
+    graph = PageRankGraph(keys >> 32, keys & 0xffffffff, n)
+    return graph.permuted(rng.permutation(n))
+
+
+class TestPartitioning(unittest.TestCase):
+
+    def test_permuted(self):
+        graph = PageRankGraph.from_edges([('A', 'B'), ('B', 'C'), ('C', 'A'),
+                                          ('C', 'B')])
+        permuted = graph.permuted([2, 0, 1])
+
+        self.assertEqual(permuted.labels, ['C', 'A', 'B'])
+        self.assertEqual(sorted(permuted.label_edges()),
+                         sorted(graph.label_edges()))
+        self.assertEqual(permuted.in_degrees.tolist(), [1, 1, 2])
+
+    def test_orders_are_permutations(self):
+        graph = _mk_planted_graph(8, 50, seed=0)
+        for name, order in sorted(VERTEX_ORDERS.items()):
+            self.assertEqual(sorted(order(graph).tolist()),
+                             list(range(graph.n_vertices)))
+
+    def test_orders_reduce_traffic(self):
+        graph = _mk_planted_graph(8, 50, seed=0)
+        before = traffic_report(graph, atoms_per_core=50)
+
+        after = traffic_report(graph.permuted(label_propagation_order(graph)),
+                               atoms_per_core=50)
+        self.assertLess(after['cut_edges'], before['cut_edges'] / 2)
+        self.assertLess(after['packets'], before['packets'] / 2)
+
+    def test_traffic_report(self):
+        # 0 -> 1 within core #0, 0 -> 2 and 0 -> 3 to core #1 on chip #1
+        edges = np.array([[0, 1], [0, 2], [0, 3], [1, 0], [2, 3], [3, 2]])
+        report = traffic_report(PageRankGraph.from_input(edges),
+                                atoms_per_core=2, cores_per_chip=1)
+
+        self.assertEqual(report['cut_edges'], 2)
+        self.assertEqual(report['chip_cut_edges'], 2)
+        self.assertEqual(report['packets'], 5)
+        self.assertEqual(report['chip_packets'], 1)
+        self.assertEqual(report['chip_in_packets'].tolist(), [0, 1])
+        self.assertEqual(report['chip_out_packets'].tolist(), [1, 0])
+
+    def test_balanced_slices(self):
+        graph = PageRankGraph.from_input(rmat_graph(2000, 20000, seed=0))
+        slices = balanced_slices(graph, n_cores=20, max_atoms=200)
+
+        self.assertEqual(len(slices), 21)
+        self.assertEqual((slices[0], slices[-1]), (0, 2000))
+        self.assertTrue((np.diff(slices) <= 200).all())
+
+        fixed = load_report(core_loads(graph, atoms_per_core=100))
+        balanced = load_report(core_loads(graph, core_slices=slices))
+        self.assertLess(balanced['predicted_imbalance'], 1.1)
+        self.assertLess(balanced['predicted_imbalance'],
+                        fixed['predicted_imbalance'])
+
+        self.assertRaises(ValueError, balanced_slices, graph, 9, 200)
+
+    def test_simulation_balance_load(self):
+        from page_rank.model.tools.simulation import PageRankSimulation
+        from page_rank.model.tools.spinnaker_emulator import \
+            SpiNNakerEmulatorAdapter
+
+        graph = PageRankGraph.from_input(rmat_graph(1000, 10000, seed=1))
+        built = []
+
+        class Adapter(SpiNNakerEmulatorAdapter):
+            def build_page_rank_graph(self, graph, **kwargs):
+                built.append(kwargs)
+                SpiNNakerEmulatorAdapter.build_page_rank_graph(
+                    self, graph, **kwargs)
+
+        def run(balance_load):
+            with PageRankSimulation(2., graph, spinnaker_adapter=Adapter(),
+                                    use_cache=False) as sim:
+                sim.run(atoms_per_core=100, balance_load=balance_load)
+                return sim._extract_sim_ranks()[0], sim.core_load_report()
+
+        ranks, report = run(False)
+        balanced_ranks, balanced_report = run(True)
+
+        # Cores are capped to fit the largest balanced slice, not split again
+        self.assertEqual(built[0]['atoms_per_core'], 100)
+        largest = np.diff(built[1]['core_slices']).max()
+        self.assertGreater(largest, 100)
+        self.assertGreaterEqual(built[1]['atoms_per_core'], largest)
+
+        # Without packet loss, the slicing does not change the results
+        self.assertTrue(np.array_equal(balanced_ranks, ranks))
+        self.assertEqual(len(balanced_report['actual']), 10)
+        self.assertLess(balanced_report['actual_imbalance'],
+                        report['actual_imbalance'])
+
+    def test_simulation_ranks_in_input_order(self):
+        from page_rank.model.tools.simulation import PageRankSimulation
+        from page_rank.model.tools.spinnaker_emulator import \
+            SpiNNakerEmulatorAdapter
+
+        graph = _mk_planted_graph(4, 100, seed=1)
+
+        def ranks(vertex_order):
+            with PageRankSimulation(
+                    2., graph, spinnaker_adapter=SpiNNakerEmulatorAdapter(),
+                    vertex_order=vertex_order, use_cache=False) as sim:
+                sim.run(atoms_per_core=100)
+                return sim._extract_sim_ranks()[0]
+
+        expected = ranks(None)
+        for name in sorted(VERTEX_ORDERS):
+            self.assertTrue(np.array_equal(ranks(name), expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
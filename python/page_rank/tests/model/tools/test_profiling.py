@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from page_rank.model.tools.profiling import PhaseProfiler, append_metrics, \
+    read_metrics
+from page_rank.model.tools.spinnaker_emulator import SpiNNakerEmulatorAdapter
+from page_rank.tests.model.tools.test_spinnaker_emulator import \
+    _mk_random_graph
+
+
+class TestPhaseProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def test_phases(self):
+        profiler = PhaseProfiler()
+        for _ in range(2):
+            with profiler.phase('run'):
+                with profiler.phase('step'):
+                    time.sleep(.01)
+                profiler.add('simulator', .5)
+        with profiler.phase('verify'):
+            np.ones(1 << 20).sum()
+
+        report = profiler.report(n_vertices=3)
+        phases = {phase['name']: phase for phase in report['phases']}
+        self.assertEqual([phase['name'] for phase in report['phases']],
+                         ['run', 'run.step', 'run.simulator', 'verify'])
+        self.assertEqual(report['n_vertices'], 3)
+
+        self.assertEqual(phases['run']['calls'], 2)
+        self.assertGreaterEqual(phases['run.step']['wall_time'], .02)
+        self.assertGreaterEqual(phases['run']['wall_time'],
+                                phases['run.step']['wall_time'])
+        self.assertEqual(phases['run.simulator']['wall_time'], 1.)
+        self.assertAlmostEqual(report['wall_time'],
+                               phases['run']['wall_time'] +
+                               phases['verify']['wall_time'])
+        if report['peak_rss'] is not None:
+            self.assertGreaterEqual(report['peak_rss'],
+                                    phases['verify']['peak_rss'])
+
+        profiler.reset()
+        self.assertEqual(profiler.report()['phases'], [])
+
+    def test_disabled(self):
+        profiler = PhaseProfiler(enabled=False)
+        with profiler.phase('run'):
+            profiler.add('simulator', .5)
+        self.assertEqual(profiler.report()['phases'], [])
+
+    def test_metrics_file(self):
+        path = os.path.join(self._dir, 'metrics.jsonl')
+        profiler = PhaseProfiler()
+        for call in ['run', 'run_damping_sweep']:
+            with profiler.phase('run'):
+                pass
+            append_metrics(path, profiler.report(call=call))
+
+        reports = read_metrics(path)
+        self.assertEqual([r['call'] for r in reports],
+                         ['run', 'run_damping_sweep'])
+        self.assertEqual(reports[1]['phases'][0]['calls'], 2)
+
+    def test_simulation_profile(self):
+        from page_rank.model.tools.simulation import PageRankSimulation
+
+        path = os.path.join(self._dir, 'metrics.jsonl')
+        graph = _mk_random_graph(300, 1500, seed=2)
+        with PageRankSimulation(
+                4., graph, use_cache=False, metrics_file=path,
+                spinnaker_adapter=SpiNNakerEmulatorAdapter()) as s:
+            self.assertIsNone(s.profile())
+            s.run(verify=True, diff_only=True)
+
+            profile = s.profile()
+            self.assertEqual(profile['call'], 'run')
+            self.assertEqual(profile['n_edges'], graph.n_edges)
+            self.assertEqual(
+                [phase['name'] for phase in profile['phases']],
+                ['setup', 'build', 'build.routes', 'build.state', 'run',
+                 'extract', 'extract.convert', 'verify'])
+
+            # Runs of a batch are profiled as one
+            s.run_damping_sweep([.8, .85])
+            profile = s.profile()
+            phases = {phase['name']: phase for phase in profile['phases']}
+            self.assertEqual(profile['call'], 'run_damping_sweep')
+            self.assertEqual(phases['run']['calls'], 2)
+            self.assertEqual(phases['reload']['calls'], 1)
+
+        self.assertEqual([r['call'] for r in read_metrics(path)],
+                         ['run', 'run_damping_sweep'])
+
+
+if __name__ == '__main__':
+    unittest.main()
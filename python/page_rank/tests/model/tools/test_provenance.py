@@ -0,0 +1,150 @@
+import unittest
+from collections import namedtuple
+
+import numpy as np
+
+from page_rank.model.tools.provenance import CORE_METRICS, ROUTER_METRICS, \
+    ProvenanceWarning, core_table, hottest_routers, most_overflowing_cores, \
+    provenance_warnings, router_table, sum_items
+from page_rank.model.tools.spinnaker_emulator import SpiNNakerEmulatorAdapter
+from page_rank.model.tools.utils import to_fp
+from page_rank.tests.model.tools.test_spinnaker_emulator import \
+    _mk_random_graph
+
+# Stand-ins of spinn_front_end_common's ProvenanceDataItem and Placement
+Item = namedtuple('Item', 'names value')
+Placement = namedtuple('Placement', 'x y p')
+
+
+def _router_items(x, y, **values):
+    return [Item(['router_provenance', 'router_at_chip_%d_%d' % (x, y), name],
+                 str(value)) for name, value in values.items()]
+
+
+class TestProvenance(unittest.TestCase):
+
+    def test_router_table(self):
+        items = _router_items(1, 0, Local_Multicast_Packets=10,
+                              Dropped_Multicast_Packets=2) + \
+            _router_items(0, 1, External_Multicast_Packets=30,
+                          Reinjected=4) + \
+            _router_items(0, 0, Local_Multicast_Packets=5) + \
+            [Item(['router_provenance', 'total_dropped_packets'], '2')]
+
+        routers = router_table(items)
+        self.assertEqual(list(routers.dtype.names),
+                         ['x', 'y'] + list(ROUTER_METRICS))
+        self.assertEqual(routers[['x', 'y']].tolist(),
+                         [(0, 0), (0, 1), (1, 0)])
+        self.assertEqual(routers['local_multicast_packets'].tolist(),
+                         [5, 0, 10])
+        self.assertEqual(routers['dropped_multicast_packets'].tolist(),
+                         [0, 0, 2])
+
+        hottest = hottest_routers(routers, n=2)
+        self.assertEqual(hottest[['x', 'y']].tolist(), [(0, 1), (1, 0)])
+
+        self.assertEqual(
+            sum_items(items, ['total_dropped_packets', 'Reinjected',
+                              'Local_Multicast_Packets', 'Unknown']),
+            dict(total_dropped_packets=2, Reinjected=4,
+                 Local_Multicast_Packets=15, Unknown=0))
+
+    def test_core_table(self):
+        def items(events, overflows):
+            return [Item(['vertex', 'Total_pre_synaptic_events'], events),
+                    Item(['vertex', 'Times_the_input_buffer_lost_packets'],
+                         overflows),
+                    Item(['vertex', 'Last_timer_tic_the_core_ran_to'], 99),
+                    Item(['vertex', 'Times_synaptic_weights_have_saturated'],
+                         0)]
+
+        cores = core_table([(Placement(0, 0, 2), items(100, 0)),
+                            (Placement(0, 0, 1), items(80, 3)),
+                            (Placement(1, 0, 1), items(120, 7))])
+        self.assertEqual(list(cores.dtype.names),
+                         ['x', 'y', 'p'] + list(CORE_METRICS))
+        self.assertEqual(cores['pre_synaptic_events'].tolist(),
+                         [80, 100, 120])
+        self.assertEqual(cores['timer_tick'].tolist(), [99] * 3)
+        self.assertEqual(cores['timer_overruns'].tolist(), [0] * 3)
+
+        overflowing = most_overflowing_cores(cores)
+        self.assertEqual(overflowing[['x', 'y', 'p']].tolist(),
+                         [(1, 0, 1), (0, 0, 1)])
+        self.assertEqual(len(most_overflowing_cores(cores, n=1)), 1)
+        self.assertEqual(len(core_table([])), 0)
+
+        routers = router_table(_router_items(
+            1, 1, Local_Multicast_Packets=8, Dropped_Multicast_Packets=2))
+        self.assertEqual(provenance_warnings(routers, cores), [
+            ProvenanceWarning('dropped_packets', (1, 1), 2),
+            ProvenanceWarning('buffer_overflows', (0, 0, 1), 3),
+            ProvenanceWarning('buffer_overflows', (1, 0, 1), 7),
+        ])
+        self.assertEqual(provenance_warnings(router_table([]),
+                                             core_table([])), [])
+
+    def test_emulator_provenance(self):
+        graph = _mk_random_graph(400, 4000, seed=3)
+        adapter = SpiNNakerEmulatorAdapter(packet_drop_rate=.01,
+                                           packets_per_ms=10, seed=0,
+                                           cores_per_chip=2)
+        adapter.simulation_setup(timestep=.1, time_scale_factor=10)
+        adapter.build_page_rank_graph(graph, atoms_per_core=50,
+                                      page_rank_kwargs=dict(
+                                          damping_factor=float(to_fp(.85)),
+                                          teleport=float(to_fp(.15 / 400))))
+        adapter.simulation_run(20 * .1)
+
+        prov = adapter.extract_provenance()
+        routers, cores = prov['routers'], prov['cores']
+        self.assertEqual(len(routers), 4)
+        self.assertEqual(cores[['x', 'y', 'p']].tolist(),
+                         [(chip, 0, p) for chip in range(4) for p in (1, 2)])
+        self.assertEqual(cores['timer_tick'].tolist(), [19] * 8)
+        self.assertTrue(np.array_equal(cores['pre_synaptic_events'],
+                                       adapter.pre_synaptic_events))
+
+        totals = adapter.extract_router_provenance()
+        self.assertEqual(routers['local_multicast_packets'].sum(),
+                         totals['total_multi_cast_sent_packets'])
+        self.assertGreater(routers['external_multicast_packets'].sum(), 0)
+        self.assertEqual(routers['dropped_multicast_packets'].sum() +
+                         cores['input_buffer_overflows'].sum(),
+                         totals['total_dropped_packets'])
+        self.assertGreater(len(most_overflowing_cores(cores)), 0)
+
+        # Warnings are read without tearing the simulation down
+        warnings = adapter.extract_provenance_warnings()
+        self.assertLessEqual(
+            {'dropped_packets', 'buffer_overflows', 'iteration_resets'},
+            set(w.kind for w in warnings))
+        self.assertEqual(sum(w.count for w in warnings
+                             if w.kind == 'buffer_overflows'),
+                         cores['input_buffer_overflows'].sum())
+        self.assertTrue(adapter.has_provenance_warnings())
+
+        adapter.simulation_run(5 * .1)
+        self.assertEqual(adapter.extract_ranks().shape, (25, 400))
+
+    def test_simulation_fail_on_warning(self):
+        from page_rank.model.tools.simulation import PageRankSimulation
+        from page_rank.model.tools.utils import FailedOnWarningError
+
+        graph = _mk_random_graph(300, 3000, seed=4)
+        adapter = SpiNNakerEmulatorAdapter(packets_per_ms=10, seed=0)
+        with self.assertRaises(FailedOnWarningError):
+            with PageRankSimulation(1., graph, use_cache=False,
+                                    fail_on_warning=True,
+                                    spinnaker_adapter=adapter) as s:
+                s.run(verify=False)
+                self.assertTrue(s.provenance_warnings())
+
+                # Runs again after the check, with other parameters
+                s.run_damping_sweep([.8], verify=False)
+        self.assertIsNone(adapter._graph)
+
+
+if __name__ == '__main__':
+    unittest.main()
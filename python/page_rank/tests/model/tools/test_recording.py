@@ -0,0 +1,131 @@
+import unittest
+
+import numpy as np
+
+from page_rank.model.tools.recording import as_recording_policy, \
+    decode_ranks_records, encode_ranks_record, is_lossless, \
+    ranks_from_records, recorded_ticks
+from page_rank.model.tools.spinnaker_emulator import SpiNNakerEmulatorAdapter
+from page_rank.model.tools.utils import to_fp
+from page_rank.tests.model.tools.test_spinnaker_emulator import \
+    _mk_random_graph
+
+
+class TestRecording(unittest.TestCase):
+
+    @staticmethod
+    def _run(graph, recording_policy, n_ticks=40, **kwargs):
+        adapter = SpiNNakerEmulatorAdapter(**kwargs)
+        adapter.simulation_setup(timestep=.1, time_scale_factor=10)
+        adapter.build_page_rank_graph(
+            graph, atoms_per_core=50, recording_policy=recording_policy,
+            page_rank_kwargs=dict(
+                damping_factor=float(to_fp(.85)),
+                teleport=float(to_fp(.15 / graph.n_vertices))))
+        adapter.simulation_run(n_ticks * .1)
+        return adapter
+
+    def test_as_recording_policy(self):
+        self.assertEqual(as_recording_policy(None), ('all', 1))
+        self.assertEqual(as_recording_policy('changed'), ('changed', 1))
+        self.assertEqual(as_recording_policy(5), ('interval', 5))
+        self.assertEqual(as_recording_policy(('interval', 3)), ('interval', 3))
+        self.assertTrue(is_lossless('iterations'))
+        self.assertFalse(is_lossless('final'))
+
+        with self.assertRaises(ValueError):
+            as_recording_policy('sometimes')
+        with self.assertRaises(ValueError):
+            as_recording_policy(0)
+
+    def test_changed_records(self):
+        states = np.array([[1, 2, 3], [1, 5, 3], [1, 5, 3], [7, 5, 0]],
+                          dtype=np.uint32)
+        data = b''.join(
+            encode_ranks_record(time, row, row != states[max(time - 1, 0)]
+                                if time else np.ones(3, dtype=bool))
+            for time, row in enumerate(states))
+
+        times, rows = decode_ranks_records(data, 3, 'changed')
+        self.assertEqual(times.tolist(), [0, 1, 2, 3])
+        self.assertEqual(rows.tolist(), states.tolist())
+
+        # Only changes are stored: time, bitmap and 3 + 1 + 0 + 2 ranks
+        self.assertEqual(len(data), 4 * (4 * 2 + 6))
+
+    def test_ranks_from_records(self):
+        states = np.array([[1 << 31, 1 << 30], [1 << 29, 1 << 28]])
+        data = b''.join(encode_ranks_record(time, row)
+                        for time, row in zip([0, 3], states))
+
+        ranks = ranks_from_records([(0, 2, data)], policy='iterations')
+        self.assertEqual(ranks.tolist(), [[.5, .25]] * 3 +
+                         [[2 ** -3, 2 ** -4]])
+
+        ranks = ranks_from_records([(0, 2, data)], policy=2)
+        self.assertEqual(recorded_ticks(ranks).tolist(), [0, 3])
+        self.assertTrue(np.isnan(ranks[1:3]).all())
+
+    def test_emulator_lossless(self):
+        graph = _mk_random_graph(300, 1500, seed=2)
+        expected = self._run(graph, None, packet_drop_rate=.01, seed=1)
+
+        for policy in ['iterations', 'changed']:
+            adapter = self._run(graph, policy, packet_drop_rate=.01, seed=1)
+            self.assertTrue(np.array_equal(adapter.extract_ranks(raw=True),
+                                           expected.extract_ranks(raw=True)))
+            self.assertLess(adapter.extract_recording_size(),
+                            expected.extract_recording_size())
+
+    def test_emulator_lossy(self):
+        graph = _mk_random_graph(300, 1500, seed=2)
+        expected = self._run(graph, None).extract_ranks()
+
+        adapter = self._run(graph, 4)
+        ranks = adapter.extract_ranks()
+        ticks = recorded_ticks(ranks)
+        self.assertEqual(ticks.tolist(), list(range(0, 40, 4)) + [39])
+        self.assertTrue(np.array_equal(ranks[ticks], expected[ticks]))
+
+        adapter = self._run(graph, 'final')
+        ranks = adapter.extract_ranks()
+        self.assertEqual(recorded_ticks(ranks).tolist(), [39])
+        self.assertTrue(np.array_equal(ranks[-1], expected[-1]))
+        self.assertEqual(adapter.extract_recording_size(),
+                         6 * 4 + 300 * 4)
+
+    def test_simulation_recording_policy(self):
+        from page_rank.model.tools.simulation import PageRankSimulation
+
+        graph = _mk_random_graph(300, 1500, seed=2)
+
+        def sim(policy, adapter=None):
+            return PageRankSimulation(
+                4., graph, use_cache=False, recording_policy=policy,
+                spinnaker_adapter=adapter or SpiNNakerEmulatorAdapter())
+
+        adapter = SpiNNakerEmulatorAdapter()
+        with sim(None, adapter) as s:
+            s.run()
+            ranks, it = s._extract_sim_ranks()
+            all_ranks = adapter.extract_ranks()
+        with sim('changed') as s:
+            self.assertTrue(s.run(verify=True))
+            self.assertTrue(np.array_equal(s._extract_sim_ranks()[0], ranks))
+            self.assertEqual(s._extract_sim_ranks()[1], it)
+
+        # Convergence is only known to the interval
+        with sim(5) as s:
+            s.run()
+            converged_ranks, converged_it = s._extract_sim_ranks()
+            self.assertEqual(converged_it % 5, 0)
+            self.assertGreaterEqual(converged_it, it)
+            self.assertTrue(np.array_equal(converged_ranks[-1],
+                                           all_ranks[converged_it]))
+
+            with self.assertRaises(ValueError):
+                s.run_to_convergence()
+
+
+if __name__ == '__main__':
+    unittest.main()
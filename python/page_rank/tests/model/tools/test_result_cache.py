@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from page_rank.model.tools.graph import PageRankGraph
+from page_rank.model.tools.result_cache import ResultCache, cache_key, \
+    graph_fingerprint
+from page_rank.model.tools.utils import CACHE_DIR_ENV_VAR
+from page_rank.tests.model.tools.utils import SpiNNakerTestAdapter
+
+EDGES = [
+    ('A', 'B'),
+    ('A', 'C'),
+    ('B', 'D'),
+    ('C', 'A'),
+    ('C', 'B'),
+    ('C', 'D'),
+    ('D', 'C'),
+]
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def test_fingerprint(self):
+        graph = PageRankGraph.from_edges(EDGES)
+        relabeled = PageRankGraph.from_edges(
+            [(a.lower(), b.lower()) for a, b in EDGES])
+        other = PageRankGraph.from_edges(EDGES[:-1] + [('D', 'A')])
+
+        self.assertEqual(graph_fingerprint(graph), graph_fingerprint(relabeled))
+        self.assertNotEqual(graph_fingerprint(graph), graph_fingerprint(other))
+
+        key = cache_key(graph_fingerprint(graph), damping=.85, tol=1e-5)
+        self.assertEqual(key, cache_key(graph_fingerprint(relabeled),
+                                        tol=1e-5, damping=.85))
+        self.assertNotEqual(key, cache_key(graph_fingerprint(graph),
+                                           damping=.9, tol=1e-5))
+
+    def test_get_put(self):
+        cache = ResultCache(self._dir)
+        self.assertIsNone(cache.get('key'))
+
+        ranks = np.array([.1, .2, .7])
+        cache.put('key', ranks=ranks, n_iter=12)
+        cached = cache.get('key')
+
+        self.assertTrue(np.array_equal(cached['ranks'], ranks))
+        self.assertEqual(cached['n_iter'], 12)
+        self.assertIsInstance(cached['n_iter'], int)
+
+    def test_lru_eviction(self):
+        values = dict(ranks=np.zeros(1000))
+        cache = ResultCache(self._dir)
+        cache.put('a', **values)
+        entry_size = os.path.getsize(os.path.join(self._dir, 'a.npz'))
+
+        cache = ResultCache(self._dir, max_bytes=2 * entry_size)
+        cache.put('b', **values)
+        os.utime(os.path.join(self._dir, 'a.npz'), (0, 0))
+        os.utime(os.path.join(self._dir, 'b.npz'), (1, 1))
+
+        # Reading `a' makes `b' the least recently used
+        self.assertIsNotNone(cache.get('a'))
+        cache.put('c', **values)
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+
+    def test_simulation_reference_ranks(self):
+        from page_rank.model.tools.simulation import PageRankSimulation
+
+        os.environ[CACHE_DIR_ENV_VAR] = self._dir
+        try:
+            def run(use_cache):
+                adpt = SpiNNakerTestAdapter(
+                    ranks=np.array([[0.13867, 0.19761, 0.35709, 0.30664]]))
+                with PageRankSimulation(2.1, EDGES, spinnaker_adapter=adpt,
+                                        use_cache=use_cache) as sim:
+                    return sim.run(verify=True)
+
+            results_dir = os.path.join(self._dir, 'results')
+            self.assertTrue(run(use_cache=False))
+            self.assertFalse(os.path.exists(results_dir))
+
+            self.assertTrue(run(use_cache=True))
+            self.assertEqual(len(os.listdir(results_dir)), 1)
+            self.assertTrue(run(use_cache=True))
+            self.assertEqual(len(os.listdir(results_dir)), 1)
+        finally:
+            del os.environ[CACHE_DIR_ENV_VAR]
+
+
+if __name__ == '__main__':
+    unittest.main()
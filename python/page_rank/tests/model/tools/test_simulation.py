@@ -28,13 +28,95 @@ class TestPageRankSimulation(unittest.TestCase):
             ('D', 'C'),
         ]
 
-        # SpiNNaker adapter
-        expected_ranks = np.array([[0.13867, 0.35709, 0.19761, 0.30664]])
+        # SpiNNaker adapter, ranks of the labels in sorted order
+        expected_ranks = np.array([[0.13867, 0.19761, 0.35709, 0.30664]])
         adpt = SpiNNakerTestAdapter(ranks=expected_ranks)
 
         with PageRankSimulation(run_time, edges, spinnaker_adapter=adpt) as sim:
             self.assertTrue(sim.run(verify=True))
 
+    def test_invalid_graph(self):
+        from page_rank.model.tools.simulation import PageRankSimulation
+        from page_rank.model.tools.utils import InvalidGraphError
+
+        adpt = SpiNNakerTestAdapter()
+        edges = [('A', 'B'), ('B', 'A'), ('A', 'B')]
+        with self.assertRaises(InvalidGraphError) as ctx:
+            PageRankSimulation(.1, edges, spinnaker_adapter=adpt)
+        self.assertEqual(ctx.exception.duplicate_edges.tolist(), [2])
+        self.assertIn("('A', 'B')", str(ctx.exception))
+
+        with self.assertRaises(InvalidGraphError) as ctx:
+            PageRankSimulation(.1, edges[:2], labels=['A', 'B', 'C'],
+                               spinnaker_adapter=adpt)
+        self.assertEqual(ctx.exception.dangling_vertices.tolist(), [2])
+
+    def test_invalid_teleport(self):
+        from page_rank.model.tools.simulation import PageRankSimulation
+
+        adpt = SpiNNakerTestAdapter()
+        edges = [('A', 'B'), ('B', 'A')]
+        for teleport in ([1.], [-1., 2.], [0., 0.], {'C': 1.}):
+            with self.assertRaises(ValueError):
+                PageRankSimulation(.1, edges, teleport=teleport,
+                                   spinnaker_adapter=adpt)
+
+        sim = PageRankSimulation(.1, edges, teleport={'B': 3.},
+                                 spinnaker_adapter=adpt)
+        self.assertEqual(sim._teleport.tolist(), [0., 1.])
+
+    def _extract(self, recorded_ranks):
+        from page_rank.model.tools.simulation import PageRankSimulation
+
+        edges = [('A', 'B'), ('B', 'A')]
+        adpt = SpiNNakerTestAdapter(ranks=recorded_ranks)
+
+        with PageRankSimulation(.5, edges, spinnaker_adapter=adpt) as sim:
+            sim.run()
+            ranks, convergence = sim._extract_sim_ranks()
+            return sim, ranks, convergence
+
+    def test_convergence(self):
+        recorded_ranks = np.array([
+            [.5, .5],
+            [.2, .8],
+            [.3, .7],
+            [.3, .7 + 1e-6],
+            [.3, .7 + 2e-6],
+        ])
+        expected_ranks = recorded_ranks.copy()
+        expected_ranks[4] = expected_ranks[3]
+
+        sim, ranks, convergence = self._extract(recorded_ranks)
+
+        self.assertEqual(convergence, 3)
+        self.assertIs(ranks, recorded_ranks)
+        self.assertTrue(np.array_equal(ranks, expected_ranks))
+        self.assertTrue(np.allclose(sim.convergence_errors(),
+                                    [.6, .2, 1e-6, 1e-6]))
+        self.assertEqual(sim.vertex_convergence_iterations().tolist(), [3, 3])
+
+    def test_convergence_non_monotone(self):
+        # A stalls for 2 ticks before moving again
+        sim, _, convergence = self._extract(np.array([
+            [.5, .5],
+            [.5, .3],
+            [.5, .5],
+            [.1, .5],
+            [.1, .5],
+        ]))
+
+        self.assertEqual(convergence, 4)
+        self.assertEqual(sim.vertex_convergence_iterations().tolist(), [4, 3])
+
+    def test_convergence_single_tick(self):
+        sim, ranks, convergence = self._extract(np.array([[.5, .5]]))
+
+        self.assertEqual(convergence, 1)
+        self.assertEqual(ranks.shape, (1, 2))
+        self.assertEqual(len(sim.convergence_errors()), 0)
+        self.assertEqual(sim.vertex_convergence_iterations().tolist(), [1, 1])
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
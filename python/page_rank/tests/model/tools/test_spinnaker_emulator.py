@@ -0,0 +1,290 @@
+import os
+import unittest
+
+import numpy as np
+
+from page_rank.model.tools.graph import PageRankGraph
+from page_rank.model.tools.page_rank_engine import compute_page_rank
+from page_rank.model.tools.spinnaker_emulator import SENT_PACKET, \
+    SpiNNakerEmulatorAdapter
+from page_rank.model.tools.utils import to_fp
+
+EDGES = [
+    ('A', 'B'),
+    ('A', 'C'),
+    ('B', 'D'),
+    ('C', 'A'),
+    ('C', 'B'),
+    ('C', 'D'),
+    ('D', 'C'),
+]
+
+
+def _mk_random_graph(n_vertices, n_edges, seed):
+    rng = np.random.RandomState(seed)
+
+    # One outgoing edge per vertex, no dangling vertex
+    src = np.concatenate((np.arange(n_vertices),
+                          rng.randint(n_vertices, size=n_edges - n_vertices)))
+    dst = rng.randint(n_vertices, size=n_edges)
+    keys = np.unique(src.astype(np.int64) << 32 | dst)
+    return PageRankGraph(keys >> 32, keys & 0xffffffff, n_vertices)
+
+
+class TestSpiNNakerEmulatorAdapter(unittest.TestCase):
+
+    @staticmethod
+    def _page_rank_kwargs(graph, damping=.85):
+        return dict(
+            damping_factor=float(to_fp(damping)),
+            teleport=float(to_fp((1. - damping) / graph.n_vertices))
+        )
+
+    def _run(self, graph, n_ticks, atoms_per_core=None, page_rank_kwargs=None,
+             **kwargs):
+        adapter = SpiNNakerEmulatorAdapter(**kwargs)
+        adapter.simulation_setup(timestep=.1, time_scale_factor=10)
+        adapter.build_page_rank_graph(
+            graph, atoms_per_core=atoms_per_core,
+            page_rank_kwargs=page_rank_kwargs or self._page_rank_kwargs(graph))
+        adapter.simulation_run(n_ticks * .1)
+        return adapter
+
+    def _assert_matches_engine(self, graph, atoms_per_core=None,
+                               page_rank_kwargs=None):
+        kwargs = page_rank_kwargs or self._page_rank_kwargs(graph)
+        adapter = self._run(graph, 30, atoms_per_core, kwargs)
+        ranks = adapter.extract_ranks()
+
+        expected, it = compute_page_rank(graph, kwargs['damping_factor'],
+                                         kwargs['teleport'], tol=1e-5)
+
+        # Without packet loss, an iteration completes at every tick
+        self.assertEqual(ranks.shape, (30, graph.n_vertices))
+        self.assertTrue(np.array_equal(ranks[it], expected))
+        self.assertFalse(adapter.has_provenance_warnings())
+
+    def test_single_core(self):
+        self._assert_matches_engine(PageRankGraph.from_edges(EDGES))
+
+    def test_multiple_cores(self):
+        graph = _mk_random_graph(200, 1000, seed=42)
+        adapter = self._run(graph, 1, atoms_per_core=64)
+
+        self.assertEqual(adapter.n_cores, 4)
+        self.assertEqual(adapter.pre_synaptic_events.sum(), graph.n_edges)
+        self._assert_matches_engine(graph, atoms_per_core=64)
+
+    def test_personalized_teleport(self):
+        graph = _mk_random_graph(200, 1000, seed=42)
+        teleport = np.zeros(graph.n_vertices)
+        teleport[:10] = float(to_fp(.15 / 10))
+        kwargs = dict(damping_factor=float(to_fp(.85)), teleport=teleport)
+
+        self._assert_matches_engine(graph, atoms_per_core=64,
+                                    page_rank_kwargs=kwargs)
+
+    def test_reload_parameters(self):
+        graph = _mk_random_graph(200, 1000, seed=42)
+        teleport = np.linspace(0, 1, graph.n_vertices)
+        kwargs = dict(damping_factor=float(to_fp(.85)),
+                      teleport=float(to_fp(.15)) * teleport / teleport.sum())
+        expected = self._run(graph, 20, 64, kwargs).extract_ranks()
+
+        # Same mapping, restarted from the first tick
+        adapter = self._run(graph, 25, 64)
+        adapter.reload_page_rank_parameters(kwargs)
+        adapter.simulation_run(20 * .1)
+        self.assertTrue(np.array_equal(adapter.extract_ranks(), expected))
+
+    def test_chip_wide_semaphore(self):
+        # A -> B on core #0, C <-> D on core #1: core #0 is done after one
+        #   tick, but waits for core #1 where the packet to D is dropped
+        edges = np.array([[0, 1], [1, 0], [2, 3], [3, 2]])
+        graph = PageRankGraph.from_input(edges)
+
+        def advanced(cores_per_chip):
+            adapter = self._run(graph, 1, atoms_per_core=2,
+                                cores_per_chip=cores_per_chip)
+            adapter._iter_state[3] = SENT_PACKET  # C's packet lost
+            adapter.simulation_run(.1)
+            return adapter._curr_iter.tolist(), adapter.chip_of_core.tolist()
+
+        self.assertEqual(advanced(cores_per_chip=1), ([1, 0], [0, 1]))
+        self.assertEqual(advanced(cores_per_chip=2), ([0, 0], [0, 0]))
+
+    def test_raw_ranks(self):
+        adapter = self._run(PageRankGraph.from_edges(EDGES), 5)
+        raw = adapter.extract_ranks(raw=True)
+
+        self.assertEqual(raw.dtype, np.uint32)
+        self.assertTrue(np.array_equal(raw / 2. ** 32, adapter.extract_ranks()))
+
+    def test_resume_run(self):
+        graph = _mk_random_graph(100, 500, seed=0)
+        expected = self._run(graph, 20).extract_ranks()
+
+        adapter = self._run(graph, 12)
+        adapter.simulation_run(8 * .1)
+        self.assertTrue(np.array_equal(adapter.extract_ranks(), expected))
+
+    def test_packet_drops_reset_iterations(self):
+        graph = _mk_random_graph(200, 1000, seed=42)
+        adapter = self._run(graph, 100, atoms_per_core=50,
+                            packet_drop_rate=.01, seed=1)
+
+        prov = adapter.extract_router_provenance(['total_dropped_packets',
+                                                  'Dumped_from_a_processor',
+                                                  'iteration_resets'])
+        self.assertGreater(prov['total_dropped_packets'], 0)
+        self.assertEqual(prov['Dumped_from_a_processor'], 0)
+        self.assertGreater(adapter.iteration_resets.sum(), 0)
+        self.assertEqual(prov['iteration_resets'],
+                         adapter.iteration_resets.sum())
+        self.assertTrue(adapter.has_provenance_warnings())
+
+    def test_simulation_backend(self):
+        from page_rank.model.tools.simulation import BACKEND_ENV_VAR, \
+            PageRankSimulation
+
+        os.environ[BACKEND_ENV_VAR] = 'emulator'
+        try:
+            with PageRankSimulation(2.1, EDGES) as sim:
+                self.assertTrue(sim.run(verify=True))
+        finally:
+            del os.environ[BACKEND_ENV_VAR]
+
+    def test_simulation_personalized(self):
+        from page_rank.model.tools.simulation import PageRankSimulation
+
+        graph = _mk_random_graph(300, 1500, seed=5)
+        teleports = [None, {0: 1.}, np.arange(graph.n_vertices)]
+        with PageRankSimulation(3., graph, vertex_order='label_propagation',
+                                spinnaker_adapter=SpiNNakerEmulatorAdapter(),
+                                use_cache=False) as sim:
+            ranks, correct = sim.run_personalized(teleports, verify=True,
+                                                  atoms_per_core=64)
+
+        self.assertEqual(ranks.shape, (3, graph.n_vertices))
+        self.assertEqual(correct.tolist(), [True] * 3)
+        self.assertTrue(np.allclose(ranks.sum(axis=1), 1, atol=1e-3))
+        # Vertex 0 gets all the teleports of the 2nd run
+        self.assertGreater(ranks[1, 0], 10 * ranks[0, 0])
+
+    def test_simulation_update_edges(self):
+        from page_rank.model.tools.simulation import PageRankSimulation
+
+        graph = _mk_random_graph(2000, 10000, seed=5)
+        edges = graph.edge_list()
+        with PageRankSimulation(3., graph, vertex_order='rcm',
+                                spinnaker_adapter=SpiNNakerEmulatorAdapter(),
+                                use_cache=False) as sim:
+            sim.run(atoms_per_core=200)
+            cold_it = sim._extract_sim_ranks()[1]
+
+            # 0.1% of the edges moved
+            added = np.array([[0, 1], [1, 2], [2, 3], [3, 4], [4, 5],
+                              [5, 6], [6, 7]])
+            added = added[~(graph.edge_list()[:, None] == added).all(
+                axis=2).any(axis=0)]
+            self.assertTrue(sim.update_edges(added, edges[:len(added)],
+                                             verify=True))
+            warm_it = sim._extract_sim_ranks()[1]
+            self.assertEqual(sim._graph.n_edges, graph.n_edges)
+        self.assertLess(warm_it, cold_it / 2)
+
+    def test_simulation_run_to_convergence(self):
+        from page_rank.model.tools.simulation import PageRankSimulation
+
+        graph = _mk_random_graph(300, 1500, seed=5)
+
+        def sim():
+            return PageRankSimulation(
+                10., graph, use_cache=False,
+                spinnaker_adapter=SpiNNakerEmulatorAdapter())
+
+        with sim() as s:
+            s.run()
+            ranks, it = s._extract_sim_ranks()
+
+        with sim() as s:
+            self.assertTrue(s.run_to_convergence(verify=True,
+                                                 chunk_iterations=3))
+            report = s.convergence_report()
+            converged_ranks, converged_it = s._extract_sim_ranks()
+
+        # Stopped within the chunk of the convergence, out of 100 ticks
+        self.assertTrue(report['converged'])
+        self.assertEqual(converged_it, it)
+        self.assertEqual(report['iterations'], -(-(it + 1) // 3) * 3)
+        self.assertEqual(report['saved_iterations'], 100 - report['iterations'])
+        self.assertTrue(np.array_equal(converged_ranks[-1], ranks[-1]))
+
+        # Iteration budget exhausted
+        with sim() as s:
+            s.run_to_convergence(chunk_iterations=3, max_iterations=2)
+            report = s.convergence_report()
+        self.assertFalse(report['converged'])
+        self.assertEqual(report['iterations'], 2)
+
+    def test_simulation_damping_sweep(self):
+        from page_rank.model.tools.simulation import PageRankSimulation
+
+        graph = _mk_random_graph(300, 1500, seed=5)
+        dampings = [.5, .85, .6]
+
+        def sim(**kwargs):
+            return PageRankSimulation(
+                3., graph, use_cache=False,
+                spinnaker_adapter=SpiNNakerEmulatorAdapter(), **kwargs)
+
+        with sim() as s:
+            ranks, correct = s.run_damping_sweep(dampings, verify=True)
+        self.assertEqual(ranks.shape, (3, graph.n_vertices))
+        self.assertEqual(correct.tolist(), [True] * 3)
+
+        # Same ranks as separate runs
+        for damping, r in zip(dampings, ranks):
+            with sim(damping=damping) as s:
+                s.run()
+                self.assertTrue(np.array_equal(s._extract_sim_ranks()[0][-1],
+                                               r))
+
+        with sim() as s:
+            self.assertRaises(ValueError, s.run_damping_sweep, [.5, 1.])
+
+    def test_changed_records_after_reload(self):
+        from page_rank.model.tools.simulation import PageRankSimulation
+
+        graph = _mk_random_graph(300, 1500, seed=6)
+        dampings = [.5, .85, .6]
+
+        # Each reload restarts from a record of all the ranks
+        def run(policy):
+            adapter = SpiNNakerEmulatorAdapter()
+            adapter.simulation_setup(timestep=.1, time_scale_factor=10)
+            adapter.build_page_rank_graph(
+                graph, page_rank_kwargs=self._page_rank_kwargs(graph),
+                recording_policy=policy)
+            adapter.simulation_run(30 * .1)
+            adapter.reload_page_rank_parameters(
+                self._page_rank_kwargs(graph, damping=.6))
+            adapter.simulation_run(30 * .1)
+            return adapter.extract_ranks(raw=True)
+
+        self.assertTrue(np.array_equal(run('changed'), run(None)))
+
+        def sweep(policy):
+            with PageRankSimulation(
+                    3., graph, use_cache=False, recording_policy=policy,
+                    spinnaker_adapter=SpiNNakerEmulatorAdapter()) as s:
+                return s.run_damping_sweep(dampings, verify=True)
+
+        ranks, correct = sweep('changed')
+        expected, _ = sweep(None)
+        self.assertEqual(correct.tolist(), [True] * 3)
+        self.assertTrue(np.array_equal(ranks, expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
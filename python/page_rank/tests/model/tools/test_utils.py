@@ -3,6 +3,8 @@ import sys
 import tempfile
 import unittest
 
+import numpy as np
+
 import page_rank.model.tools.utils as utils
 
 
@@ -68,5 +70,29 @@ class TestInstallRequirements(unittest.TestCase):
         self.assertEqual(tqdm.__version__, '4.23.3')
 
 
+class TestRanksFromRecordings(unittest.TestCase):
+
+    @staticmethod
+    def _recording(n_ticks, states):
+        # timed_state_t rows: uint32 time, then the state of each vertex
+        rows = np.column_stack((np.arange(n_ticks), states))
+        return rows.astype('<u4').tobytes()
+
+    def test_scatter_cores(self):
+        core_0 = np.array([[1 << 31, 1 << 30], [1 << 29, 3 << 30]])
+        core_1 = np.array([[1 << 28], [1 << 27], [1 << 26]])  # extra tick
+        recordings = [(2, 1, self._recording(3, core_1)),
+                      (0, 2, self._recording(2, core_0))]
+
+        ranks = utils.ranks_from_recordings(recordings)
+        self.assertEqual(ranks.dtype, np.float64)
+        self.assertEqual(ranks.tolist(), [[.5, .25, 2 ** -4],
+                                          [2 ** -3, .75, 2 ** -5]])
+
+        ranks = utils.ranks_from_recordings(recordings, raw=True)
+        self.assertEqual(ranks.dtype, np.uint32)
+        self.assertEqual(ranks[:, :2].tolist(), core_0.tolist())
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
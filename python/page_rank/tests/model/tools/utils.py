@@ -32,10 +32,13 @@ class SpiNNakerTestAdapter(SpiNNakerAdapterInterface):
     def build_page_rank_graph(self, *args, **kwargs):
         pass
 
+    def reload_page_rank_parameters(self, page_rank_kwargs=None):
+        pass
+
     def simulation_run(self, *args, **kwargs):
         pass
 
-    def extract_ranks(self):
+    def extract_ranks(self, raw=False):
         """Extract the per-iteration ranks computed during the simulation.
 
         :return: <np.array> ranks